@@ -0,0 +1,194 @@
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from simulation import FPS, SpaceDodgerSim
+
+# Headless batch runner for balance and soak testing: plays many seeded games with bot
+# policies across a process pool and summarises how they went. Games are independent,
+# so throughput scales with the number of worker processes.
+
+
+# Policies map (sim, rng) to the inputs for the next tick
+def idle(sim, rng):
+    return []
+
+
+def autofire(sim, rng):
+    return [('fire',)]
+
+
+def random_play(sim, rng):
+    inputs = [('drag', rng.randint(0, sim.screen_width), rng.randint(sim.screen_height // 2, sim.screen_height))]
+    if rng.random() < 0.3:
+        inputs.append((rng.choice(['fire', 'fire', 'fire', 'switch_gun', 'dash', 'emp', 'overcharge']),))
+    return inputs
+
+
+def dodger(sim, rng):
+    # Fire constantly, sidestep the closest asteroid bearing down on the ship, EMP when cornered
+    inputs = [('fire',)]
+    px, py = sim.player_pos
+    home_x, home_y = sim.screen_width / 2, sim.screen_height * 0.8
+    nearest = sim.asteroid_index().nearest(px, py)
+    if nearest >= 0:
+        ax, ay = sim.asteroids.pos[nearest].tolist()
+        reach = sim.asteroids.size[nearest] + sim.player_size
+        if ay < py + reach and abs(ax - px) < reach * 1.5 and py - ay < reach * 4:
+            if (ax - px) ** 2 + (ay - py) ** 2 < reach ** 2 and sim.cooldown('emp') <= 0:
+                inputs.append(('emp',))
+            side = -1 if ax > px else 1
+            if not 0 < px + side * reach * 2 < sim.screen_width:
+                side = -side
+            return inputs + [('drag', int(px + side * reach * 4), int(py))]
+    return inputs + [('drag', int(home_x), int(home_y))]
+
+
+POLICIES = {'idle': idle, 'autofire': autofire, 'random': random_play, 'dodger': dodger}
+# Sim attributes a run starts from or keeps reading; the rest is run state that reset() or
+# step() overwrites, so overriding it would do nothing
+SIM_SETTINGS = ('asteroid_spawn_rate', 'star_spawn_rate', 'power_up_spawn_rate', 'black_hole_spawn_rate',
+                'lives', 'player_size')
+
+
+def parse_overrides(pairs):
+    # 'name=value' tuning knobs; see settings() for the names
+    overrides = {}
+    for pair in pairs or []:
+        name, _, value = pair.partition('=')
+        overrides[name] = float(value) if '.' in value else int(value)
+    return overrides
+
+
+def settings(sim):
+    # Every name apply_overrides() accepts: SIM_SETTINGS, upgrades.<key>, boss_settings.<key>
+    # and gun_settings.<gun>.<key>
+    names = list(SIM_SETTINGS)
+    for table in ('upgrades', 'boss_settings'):
+        names += [f'{table}.{key}' for key in getattr(sim, table)]
+    names += [f'gun_settings.{gun}.{key}' for gun, table in sim.gun_settings.items() for key in table]
+    return sorted(names)
+
+
+def apply_overrides(sim, overrides):
+    valid = settings(sim)
+    for name, value in overrides.items():
+        if name not in valid:
+            raise ValueError(f"unknown setting {name!r}; valid settings are: {', '.join(valid)}")
+        first, *path = name.split('.')
+        if not path:
+            setattr(sim, name, value)
+            continue
+        table = getattr(sim, first)
+        for key in path[:-1]:
+            table = table[key]
+        table[path[-1]] = value
+
+
+def play(seed, policy, max_ticks, endless_mode, overrides, width, height):
+    sim = SpaceDodgerSim(width, height, endless_mode=endless_mode, seed=seed)
+    apply_overrides(sim, overrides)
+    rng = random.Random(seed)
+    decide = POLICIES[policy]
+    start = time.perf_counter()
+    while not sim.game_over and sim.frame_count < max_ticks:
+        sim.step(decide(sim, rng))
+    duration = time.perf_counter() - start
+    return {'seed': seed, 'policy': policy, 'ticks': sim.frame_count, 'survived': not sim.game_over,
+            'score': sim.score, 'credits': sim.credits, 'asteroids_destroyed': sim.asteroids_destroyed,
+            'bosses_spawned': sim.bosses_spawned, 'bosses_defeated': sim.bosses_defeated,
+            'tick_us': duration / max(sim.frame_count, 1) * 1e6}
+
+
+def play_chunk(jobs):
+    # One task per chunk of games keeps inter-process traffic small
+    return [play(*job) for job in jobs]
+
+
+def summarize(games):
+    ticks = np.array([game['ticks'] for game in games])
+    score = np.array([game['score'] for game in games])
+    spawned = sum(game['bosses_spawned'] for game in games)
+    defeated = sum(game['bosses_defeated'] for game in games)
+    tick_us = np.array([game['tick_us'] for game in games])
+    return {
+        'games': len(games),
+        'survival_s': {'mean': float(ticks.mean() / FPS), 'p10': float(np.percentile(ticks, 10) / FPS),
+                       'p50': float(np.percentile(ticks, 50) / FPS), 'p90': float(np.percentile(ticks, 90) / FPS)},
+        'timed_out': sum(game['survived'] for game in games),
+        'score': {'mean': float(score.mean()), 'p50': float(np.percentile(score, 50)), 'max': int(score.max())},
+        'credits_mean': float(np.mean([game['credits'] for game in games])),
+        'asteroids_destroyed_mean': float(np.mean([game['asteroids_destroyed'] for game in games])),
+        'boss_kill_rate': defeated / spawned if spawned else None,
+        'games_with_boss_kill': sum(game['bosses_defeated'] > 0 for game in games) / len(games),
+        'tick_us': {'mean': float(tick_us.mean()), 'p95': float(np.percentile(tick_us, 95))},
+    }
+
+
+def run_batch(games, policies, workers, seed=0, max_ticks=36000, endless_mode=False, overrides=None,
+              width=1080, height=2400, chunk=None):
+    jobs = [(seed + i, policy, max_ticks, endless_mode, overrides or {}, width, height)
+            for policy in policies for i in range(games)]
+    chunk = chunk or max(1, len(jobs) // (workers * 8))
+    chunks = [jobs[i:i + chunk] for i in range(0, len(jobs), chunk)]
+    if workers == 1:
+        results = [play_chunk(part) for part in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(play_chunk, chunks))
+    return [game for result in results for game in result]
+
+
+def print_report(summary):
+    for policy, stats in summary['policies'].items():
+        survival, score = stats['survival_s'], stats['score']
+        kill_rate = 'n/a' if stats['boss_kill_rate'] is None else f"{stats['boss_kill_rate']:.0%}"
+        print(f"{policy}: {stats['games']} games")
+        print(f"  survival   mean {survival['mean']:.1f}s  p10 {survival['p10']:.1f}s  "
+              f"p50 {survival['p50']:.1f}s  p90 {survival['p90']:.1f}s  (timed out {stats['timed_out']})")
+        print(f"  score      mean {score['mean']:.0f}  p50 {score['p50']:.0f}  max {score['max']}")
+        print(f"  credits    mean {stats['credits_mean']:.0f}  asteroids destroyed {stats['asteroids_destroyed_mean']:.1f}")
+        print(f"  boss       kill rate {kill_rate}  games with a kill {stats['games_with_boss_kill']:.0%}")
+        print(f"  tick cost  mean {stats['tick_us']['mean']:.0f}us  p95 {stats['tick_us']['p95']:.0f}us")
+    run = summary['run']
+    print(f"{run['ticks']} ticks in {run['seconds']:.1f}s on {run['workers']} workers "
+          f"({run['ticks'] / max(run['seconds'], 1e-9):.0f} ticks/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play many headless games with bot policies and summarise them")
+    parser.add_argument('--games', type=int, default=1000, help="games per policy")
+    parser.add_argument('--policy', action='append', choices=sorted(POLICIES), help="repeatable; default dodger")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0, help="first seed; game i uses seed + i")
+    parser.add_argument('--max-ticks', type=int, default=36000, help="stop a game that is still alive after this")
+    parser.add_argument('--endless', action='store_true')
+    parser.add_argument('--set', action='append', metavar='NAME=VALUE',
+                        help="override a setting, e.g. asteroid_spawn_rate=40, upgrades.projectile_speed=1.4, "
+                             "boss_settings.health=20 or gun_settings.plasma.damage=3")
+    parser.add_argument('--json', metavar='PATH', help="also write the summary and per-game results")
+    args = parser.parse_args()
+
+    policies = args.policy or ['dodger']
+    try:
+        overrides = parse_overrides(args.set)
+        apply_overrides(SpaceDodgerSim(1080, 2400), overrides)  # Fail fast on a bad name
+    except ValueError as e:
+        parser.error(str(e))
+    start = time.perf_counter()
+    games = run_batch(args.games, policies, args.workers, args.seed, args.max_ticks, args.endless, overrides)
+    seconds = time.perf_counter() - start
+    summary = {
+        'policies': {policy: summarize([game for game in games if game['policy'] == policy]) for policy in policies},
+        'run': {'workers': args.workers, 'seconds': seconds, 'ticks': sum(game['ticks'] for game in games),
+                'seed': args.seed, 'max_ticks': args.max_ticks, 'endless': args.endless, 'overrides': overrides},
+    }
+    print_report(summary)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'summary': summary, 'games': games}, f, indent=2)
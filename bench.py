@@ -0,0 +1,246 @@
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from quality import TIERS
+from simulation import HOMING, LASER, SpaceDodgerSim
+
+# Scripted stress scenarios. Each one tops its population back up before every tick, so the
+# numbers describe a steady state rather than a field that empties out as the run goes on.
+
+SIM_PHASES = ['step', 'run_scheduled', 'update_entities', 'apply_forces',
+              'update_projectiles', 'steer_homing', 'update_boss', 'update_progress']
+RENDER_PHASES = ['update_effects', 'draw_world', 'draw_background', 'draw_player', 'draw_particles', 'draw_asteroids',
+                 'draw_stars', 'draw_power_ups', 'draw_black_holes', 'draw_boss', 'draw_projectiles', 'upscale', 'draw_hud']
+PERCENTILES = (50, 95, 99)
+
+
+def fill_asteroids(sim, rng, count):
+    a = sim.asteroids
+    missing = count - a.count
+    if missing <= 0:
+        return
+    w, h = sim.screen_width, sim.screen_height
+    size = rng.integers(int(h * 0.03), int(h * 0.08), missing)
+    speed = rng.uniform(2, 4, missing)
+    pos = np.column_stack((rng.uniform(0, w, missing), rng.uniform(-h * 0.1, h * 0.6, missing)))
+    a.extend(missing, pos=pos, vel=np.column_stack((np.zeros(missing), speed)), size=size, speed=speed)
+    sim.grid_stale = True
+
+
+def fill_projectiles(sim, rng, count, kind=LASER, color=(255, 255, 255)):
+    p = sim.projectiles
+    missing = count - p.count
+    if missing <= 0:
+        return
+    w, h = sim.screen_width, sim.screen_height
+    pos = np.column_stack((rng.uniform(0, w, missing), rng.uniform(h * 0.3, h, missing)))
+    p.extend(missing, pos=pos, vel=(0, -5), speed=5, size=5, damage=1, kind=kind, color=color)
+
+
+def asteroid_field(sim, rng):
+    fill_asteroids(sim, rng, 500)
+    fill_projectiles(sim, rng, 200)
+    return []
+
+
+def boss_phase_3(sim, rng):
+    if not sim.boss_active:
+        sim.spawn_boss()
+    sim.boss.update(phase=3, health=1000)
+    sim.boss['pos'][:] = sim.screen_width // 2, sim.screen_height * 0.3
+    fill_asteroids(sim, rng, 50)
+    return [('fire',)]
+
+
+def black_holes(sim, rng):
+    h = sim.black_holes
+    if h.count < 3:
+        h.clear()
+        for dx in (-40, 0, 40):
+            h.add(sim.screen_width // 2 + dx, sim.screen_height * 0.4, size=40, life=300)
+    h.pos[:3, 1] = sim.screen_height * 0.4
+    h.life[:3] = 300
+    fill_asteroids(sim, rng, 200)
+    return []
+
+
+def homing_spam(sim, rng):
+    sim.current_gun = 'homing'
+    sim.shoot_ready = sim.frame_count
+    sim.clone_active = True
+    fill_asteroids(sim, rng, 300)
+    fill_projectiles(sim, rng, 100, kind=HOMING, color=(0, 255, 0))
+    p = sim.projectiles
+    untargeted = np.flatnonzero((p.kind[:p.count] == HOMING) & (p.target[:p.count] < 0))
+    if untargeted.size and sim.asteroids.count:
+        targets = rng.integers(0, sim.asteroids.count, untargeted.size)
+        p.target[untargeted] = sim.asteroids.handle[targets]
+    return [('fire',)]
+
+
+def normal_play(sim, rng):
+    # No topping up: the run's own spawns at the entity counts a player actually sees, where
+    # per-call overhead rather than per-entity work sets the pace
+    inputs = [('drag', rng.uniform(0, sim.screen_width), rng.uniform(sim.screen_height / 2, sim.screen_height))]
+    if rng.random() < 0.5:
+        inputs.append(('fire',))
+    return inputs
+
+
+SCENARIOS = {
+    'normal_play': normal_play,
+    'asteroids_500_projectiles_200': asteroid_field,
+    'boss_phase_3': boss_phase_3,
+    'black_holes_3': black_holes,
+    'homing_spam': homing_spam,
+}
+
+
+def timed(func, name, totals):
+    # Accumulates into this frame's totals, so methods called twice a frame count once
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            totals[name] += time.perf_counter() - start
+    return wrapper
+
+
+def instrument(obj, names, totals):
+    for name in names:
+        setattr(obj, name, timed(getattr(obj, name), name, totals))
+
+
+def load_renderer():
+    # The game module's filename has a space in it, so it can't be imported by name
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dodger spacecraft.py')
+    spec = importlib.util.spec_from_file_location('dodger_spacecraft', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def summarize(samples):
+    result = {}
+    for name, values in samples.items():
+        ms = np.array(values) * 1000
+        result[name] = {'frames': len(ms), 'mean_ms': round(float(ms.mean()), 4)}
+        for q, value in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+            result[name][f'p{q}_ms'] = round(float(value), 4)
+    return result
+
+
+def run_scenario(scenario, frames, warmup, seed, renderer=None, dirty_rects=False, quality='high', render_scale=1.0):
+    rng = np.random.default_rng(seed)
+    if renderer is not None:
+        # No snapshot to resume and no telemetry: every run starts from the same state and does no I/O
+        game = renderer.SpaceDodgerAndroid(dirty_rects=dirty_rects, seed=seed, quality=quality, render_scale=render_scale,
+                                           snapshot_path=None, telemetry_path=None)
+        game.step_warmup(finish=True)
+        game.show_customization = False
+        sim = game.sim
+    else:
+        game = None
+        sim = SpaceDodgerSim(1080, 2400, seed=seed)
+    # Keep the player alive whatever the scenario throws at them
+    sim.invincibility = True
+    sim.lives = 1 << 30
+
+    totals = defaultdict(float)
+    instrument(sim, SIM_PHASES, totals)
+    if game is not None:
+        instrument(game, RENDER_PHASES, totals)
+    samples = defaultdict(list)
+    for frame in range(warmup + frames):
+        inputs = scenario(sim, rng)
+        totals.clear()
+        if game is None:
+            sim.step(inputs)
+        else:
+            game.pending_inputs.extend(inputs)
+            game.advance(1 / 60)
+            if game.dirty is None:
+                game.world.fill(game.bg_color)
+            else:
+                game.dirty.begin(game.screen, game.bg_color)
+            game.draw_world()
+            if game.world is not game.screen:
+                game.upscale()
+            game.draw_hud(0, 0)
+            if game.dirty is not None:
+                game.dirty.present()
+        if frame >= warmup:
+            for name, value in totals.items():
+                samples[name].append(value)
+    counts = {'asteroids': sim.asteroids.count, 'projectiles': sim.projectiles.count,
+              'black_holes': sim.black_holes.count}
+    if game is not None:
+        counts['sprite_evictions'] = game.sprites.evictions
+    phases = summarize(samples)
+    return {'entities': counts, 'phases': phases, 'ticks_per_s': round(1000 / phases['step']['mean_ms'])}
+
+
+def compare(results, baseline):
+    # Print p95 changes against an earlier results file
+    for name, scenario in results['scenarios'].items():
+        old = baseline.get('scenarios', {}).get(name)
+        if old is None:
+            continue
+        print(name)
+        if 'ticks_per_s' in old:
+            change = (scenario['ticks_per_s'] / old['ticks_per_s'] - 1) * 100
+            print(f"  {'ticks/s':<26} {old['ticks_per_s']:8d} -> {scenario['ticks_per_s']:8d} ({change:+.1f}%)")
+        for phase, stats in scenario['phases'].items():
+            before = old['phases'].get(phase)
+            if before is None or not before['p95_ms']:
+                continue
+            change = (stats['p95_ms'] / before['p95_ms'] - 1) * 100
+            print(f"  {phase:<26} p95 {before['p95_ms']:8.3f} -> {stats['p95_ms']:8.3f} ms ({change:+.1f}%)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the update and render hot paths")
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--warmup', type=int, default=60, help="frames run before timing starts")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help="run only these (repeatable)")
+    parser.add_argument('--sim-only', action='store_true', help="time the simulation without a display")
+    parser.add_argument('--dirty-rects', action='store_true')
+    parser.add_argument('--quality', choices=[tier['name'] for tier in TIERS], default='high')
+    parser.add_argument('--render-scale', type=float, default=1.0, help="world render scale (needs the renderer)")
+    parser.add_argument('--output', default='bench.json')
+    parser.add_argument('--compare', metavar='PATH', help="earlier results to compare against")
+    args = parser.parse_args()
+
+    renderer = None if args.sim_only else load_renderer()
+    results = {
+        'meta': {'frames': args.frames, 'warmup': args.warmup, 'seed': args.seed, 'sim_only': args.sim_only,
+                 'dirty_rects': args.dirty_rects, 'quality': args.quality, 'render_scale': args.render_scale,
+                 'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine()},
+        'scenarios': {},
+    }
+    if renderer is not None:
+        results['meta']['pygame'] = renderer.pygame.version.ver
+    for name in args.scenario or list(SCENARIOS):
+        result = results['scenarios'][name] = run_scenario(SCENARIOS[name], args.frames, args.warmup, args.seed,
+                                                           renderer, args.dirty_rects, args.quality, args.render_scale)
+        print(name, result['entities'], f"{result['ticks_per_s']} ticks/s")
+        for phase, stats in result['phases'].items():
+            print(f"  {phase:<26} p50 {stats['p50_ms']:8.3f}  p95 {stats['p95_ms']:8.3f}  p99 {stats['p99_ms']:8.3f} ms")
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f"wrote {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
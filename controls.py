@@ -0,0 +1,121 @@
+import pygame
+
+# Input layer: turns the raw event queue into commands for the game. Taps resolve through a
+# table of screen regions built once per display size, drags are coalesced to the latest
+# position each frame, and touch fingers are tracked individually so one finger can steer
+# while another fires.
+
+EVENTS = [pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION,
+          pygame.FINGERDOWN, pygame.FINGERUP, pygame.FINGERMOTION, pygame.WINDOWEXPOSED,
+          pygame.APP_WILLENTERBACKGROUND, pygame.WINDOWMINIMIZED]
+MOUSE = 'mouse'  # Finger id used for the mouse pointer
+
+
+class Controls:
+    def __init__(self, width, height, upgrade_count):
+        self.width = width
+        self.height = height
+        self.regions = self.build_regions(upgrade_count)
+        self.drag_finger = None
+        # Everything else is dropped by SDL before it reaches the queue
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(EVENTS)
+
+    def build_regions(self, upgrade_count):
+        # Per screen, (rect, command) pairs; the first rect containing a tap wins
+        w, h = self.width, self.height
+
+        def area(x0, y0, x1, y1):
+            return pygame.Rect(int(x0), int(y0), int(x1) - int(x0), int(y1) - int(y0))
+
+        upgrades = []
+        for i in range(upgrade_count):
+            top = h * 0.2 + i * 50
+            if top < h * 0.5:
+                upgrades.append((area(0, top, w, min(top + 50, h * 0.5)), ('upgrade', i)))
+        return {
+            'customize': [
+                (area(0, h * 0.7, w, h * 0.75), ('start', False)),
+                (area(0, h * 0.75, w, h + 1), ('start', True)),
+                (area(0, h * 0.4, w * 0.2, h * 0.6), ('shape', 'triangle')),
+                (area(w * 0.2, h * 0.4, w * 0.4, h * 0.6), ('shape', 'circle')),
+                (area(0, h * 0.2, w * 0.2, h * 0.4), ('color', (0, 255, 0))),
+                (area(w * 0.2, h * 0.2, w * 0.4, h * 0.4), ('color', (255, 0, 0))),
+                (area(w * 0.4, h * 0.2, w * 0.6, h * 0.4), ('color', (0, 0, 255))),
+            ],
+            'game_over': [(area(0, h * 0.8, w, h + 1), ('restart',))] + upgrades,
+            'paused': [(area(w * 0.75, 0, w + 1, h * 0.1), ('resume',))],
+            'playing': [
+                (area(w * 0.75, 0, w + 1, h * 0.1), ('pause',)),
+                (area(0, 0, w // 3, h * 0.1), ('dash',)),
+                (area(w // 3, 0, 2 * w // 3, h * 0.1), ('emp',)),
+                (area(2 * w // 3, 0, w * 0.75, h * 0.1), ('overcharge',)),
+                (area(0, h * 0.1, w + 1, h * 0.2), ('switch_gun',)),
+            ],
+        }
+
+    def hit(self, screen, pos):
+        for rect, command in self.regions[screen]:
+            if rect.collidepoint(pos):
+                return command
+        return None
+
+    def press(self, screen, finger, pos, sim, commands):
+        command = self.hit(screen, pos)
+        if command is not None:
+            commands.append(command)
+        elif screen == 'playing':
+            # Outside the buttons: tapping ahead of the ship fires, touching it starts a drag
+            if pos[1] < sim.player_pos[1]:
+                commands.append(('fire',))
+            elif self.drag_finger is None and sim.is_touching_player(pos):
+                self.drag_finger = finger
+
+    def release(self, finger):
+        if finger == self.drag_finger:
+            self.drag_finger = None
+
+    def poll(self, screen, sim, wait_ms=0):
+        # Drain the queue; returns this frame's commands with at most one trailing drag.
+        # With wait_ms, first sleeps until an event arrives or the timeout passes.
+        events = []
+        if wait_ms:
+            first = pygame.event.wait(wait_ms)
+            if first.type != pygame.NOEVENT:
+                events.append(first)
+        events += pygame.event.get()
+        commands = []
+        drag = None
+        for event in events:
+            kind = event.type
+            if kind == pygame.QUIT:
+                commands.append(('quit',))
+            elif kind in (pygame.APP_WILLENTERBACKGROUND, pygame.WINDOWMINIMIZED):
+                # The app may be killed from here on without further notice
+                commands.append(('suspend',))
+            elif kind == pygame.WINDOWEXPOSED:
+                # The system threw away what was on screen, e.g. coming back from the background
+                commands.append(('redraw',))
+            elif kind == pygame.KEYDOWN:
+                if event.key == pygame.K_F3:
+                    commands.append(('toggle_profiler',))
+            elif kind in (pygame.FINGERDOWN, pygame.FINGERMOTION, pygame.FINGERUP):
+                pos = (event.x * self.width, event.y * self.height)
+                if kind == pygame.FINGERDOWN:
+                    self.press(screen, event.finger_id, pos, sim, commands)
+                elif kind == pygame.FINGERUP:
+                    self.release(event.finger_id)
+                elif event.finger_id == self.drag_finger:
+                    drag = pos
+            elif getattr(event, 'touch', False):
+                # SDL's mouse emulation of a touch already handled as a finger
+                continue
+            elif kind == pygame.MOUSEBUTTONDOWN:
+                self.press(screen, MOUSE, event.pos, sim, commands)
+            elif kind == pygame.MOUSEBUTTONUP:
+                self.release(MOUSE)
+            elif kind == pygame.MOUSEMOTION and self.drag_finger == MOUSE:
+                drag = event.pos
+        if drag is not None and screen == 'playing':
+            commands.append(('drag', int(drag[0]), int(drag[1])))
+        return commands
@@ -0,0 +1,70 @@
+import numpy as np
+import pygame
+
+
+class DirtyRects:
+    # Tracks what was drawn each frame so only changed regions are erased and pushed
+    # to the display. Falls back to a full fill and flip when that would be cheaper.
+    def __init__(self, size, full_ratio=0.5, cluster_size=64):
+        self.screen_rect = pygame.Rect((0, 0), size)
+        self.full_area = full_ratio * size[0] * size[1]
+        self.cluster_size = cluster_size
+        self.drawn = []      # Everything drawn this frame: erased next frame
+        self.moving = []     # Entity rects drawn this frame
+        self.pushed = []     # Label regions whose pixels changed this frame
+        self.previous = []   # Everything drawn last frame
+        self.vacated = []    # Entity rects from last frame, which change again once erased
+        self.labels = {}
+        self.full = True
+
+    def invalidate(self):
+        self.full = True
+
+    def begin(self, surface, color, force_full=False):
+        # Erase last frame's drawing; returns True when this frame is a full redraw
+        self.full = self.full or force_full
+        if self.full:
+            surface.fill(color)
+        else:
+            for rect in self.previous:
+                surface.fill(color, rect)
+        return self.full
+
+    def add(self, rects):
+        if rects:
+            self.drawn.extend(rects)
+            self.moving.extend(rects)
+
+    def add_label(self, name, rect, changed):
+        # Redrawn every frame with identical pixels, so only pushed when the text changed
+        self.drawn.append(rect)
+        old = self.labels.get(name)
+        if changed or old != rect:
+            self.pushed.append(rect)
+            if old is not None:
+                self.pushed.append(old)
+        self.labels[name] = rect
+
+    def add_clusters(self, pos, radius):
+        # One bounding rect per occupied grid cell instead of one per particle
+        if not len(pos):
+            return
+        cells = np.floor(pos / self.cluster_size).astype(np.int64)
+        keys = cells[:, 0] * (1 << 32) + cells[:, 1]
+        order = np.argsort(keys)
+        keys, pos, radius = keys[order], pos[order], radius[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        lo = np.minimum.reduceat(pos - radius[:, None], starts)
+        hi = np.maximum.reduceat(pos + radius[:, None], starts)
+        self.add([pygame.Rect(int(x0), int(y0), int(x1 - x0) + 2, int(y1 - y0) + 2)
+                  for (x0, y0), (x1, y1) in zip(lo.tolist(), hi.tolist())])
+
+    def present(self):
+        rects = [rect.clip(self.screen_rect) for rect in self.vacated + self.moving + self.pushed]
+        if self.full or sum(rect.w * rect.h for rect in rects) > self.full_area:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+        self.previous, self.vacated = self.drawn, self.moving
+        self.drawn, self.moving, self.pushed = [], [], []
+        self.full = False
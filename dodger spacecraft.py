@@ -1,391 +1,507 @@
+import argparse
+import logging
 import pygame
 import random
+import struct
 import time
-import math
 
-pygame.init()
+import numpy as np
+
+from controls import Controls
+from dirty_rects import DirtyRects
+from entities import DISABLED
+from hud import WHITE, HudText
+from particles import ParticlePool
+from profiler import FrameProfiler, StartupTimer
+from quality import TIERS, QualityGovernor
+from replay import InputRecorder
+from simulation import FPS, POWER_UP_TYPES, SpaceDodgerSim
+from snapshot import load_state, save_state
+from sprites import SpriteCache
+from storage import AtomicWriter, ProgressStore
+from telemetry import FRAME, QUALITY_TIER, Telemetry
+
+log = logging.getLogger(__name__)
+TICK = 1 / FPS
+MAX_CATCH_UP_STEPS = 5  # Ticks simulated per rendered frame before dropping the backlog
+IDLE_WAIT_MS = 500  # Longest a menu, pause or game-over screen blocks waiting for input
+IDLE_FPS = 10  # Redraw cap on those screens, so a burst of input can't spin the CPU
+TELEMETRY_FRAMES = 60  # Frames between frame-time samples in the telemetry stream
+# Upgrade shop: label, upgrade key, step, cost
+UPGRADES = [
+    ("Projectile Speed +0.2 (100)", 'projectile_speed', 0.2, 100),
+    ("Shield Duration +2s (150)", 'shield_duration', 2, 150),
+    ("Skill Cooldown -10% (200)", 'skill_cooldown', -0.1, 200)
+]
+SHAPES = ['triangle', 'circle']
+SHIP_LOOK = struct.Struct('<B3B')  # Ship shape and color, saved with a run's snapshot
 
 class SpaceDodgerAndroid:
-    def __init__(self):
+    def __init__(self, dirty_rects=False, render_fps=60, seed=None, record_path=None, profile=False, profile_path=None,
+                 quality='auto', startup_report=False, render_scale=1.0, hud_native=True, snapshot_path="run.snapshot",
+                 telemetry_path="telemetry.bin"):
+        # Only the subsystems the game uses are started (events come with the display); audio
+        # and joystick never are, and anything the first frame doesn't need is deferred
+        self.startup = StartupTimer()
+        self.startup_report = startup_report
+        pygame.display.init()
         self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
         self.screen_info = pygame.display.Info()
         self.screen_width = self.screen_info.current_w
         self.screen_height = self.screen_info.current_h
         pygame.display.set_caption("Space Dodger")
+        # The world is drawn at render_scale into an off-screen surface and upscaled onto the
+        # display once per frame. Game and touch coordinates stay in display pixels throughout;
+        # only drawing is scaled. The HUD is drawn at display resolution after the upscale
+        # unless hud_native is off, in which case it is scaled with the world.
+        if dirty_rects and render_scale != 1:
+            raise ValueError("dirty rects need a render scale of 1")
+        self.render_scale = render_scale
+        if render_scale == 1:
+            self.world = self.screen
+        else:
+            size = (max(1, int(self.screen_width * render_scale)), max(1, int(self.screen_height * render_scale)))
+            self.world = pygame.Surface(size).convert()
+        self.hud_native = hud_native or self.world is self.screen
+        self.startup.mark('display')
         self.clock = pygame.time.Clock()
         self.running = True
+        pygame.font.init()
         self.font = pygame.font.Font(None, int(self.screen_height * 0.04))
-        
-        # Player properties
-        self.player_pos = [self.screen_width // 2, self.screen_height * 0.8]
-        self.player_size = int(self.screen_height * 0.07)
-        self.dragging = False
+        self.startup.mark('font')
+
+        # Game world lives in the simulation core; this class only renders it
+        self.sim = SpaceDodgerSim(self.screen_width, self.screen_height, seed=seed)
+        self.seed = seed
+        self.record_path = record_path
+        if record_path:
+            self.sim.recorder = InputRecorder(record_path)
+        # Cosmetic randomness has its own stream so visuals never perturb gameplay
+        self.fx_rng = random.Random()
+        self.startup.mark('simulation')
+
+        # Fixed-timestep loop: the sim advances in TICK steps, rendering interpolates between them
+        self.render_fps = render_fps
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        self.last_time = time.perf_counter()
+        self.pending_inputs = []
+
+        self.controls = Controls(self.screen_width, self.screen_height, len(UPGRADES))
+        self.startup.mark('controls')
+
+        # Player appearance
         self.player_shape = 'triangle'
         self.player_color = (0, 255, 0)
-        self.shield_active = False
-        self.shield_time = 0
-        self.player_speed = 1
-        self.credits = 0
-        
-        # Weapon system
-        self.projectiles = []
-        self.shoot_cooldown = 0
-        self.current_gun = 'laser'
-        
-        # Skills
-        self.dash_cooldown = 0
-        self.emp_cooldown = 0
-        self.overcharge_cooldown = 0
-        self.overcharge_active = False
-        self.overcharge_time = 0
-        
-        # Game objects
-        self.asteroids = []
-        self.stars = []
-        self.power_ups = []
-        self.particles = []
-        self.black_holes = []
-        self.background_stars = [(random.randint(0, self.screen_width), random.randint(0, self.screen_height), random.uniform(1, 3)) for _ in range(50)]
-        self.planets = [(random.randint(0, self.screen_width), -50, random.randint(30, 80), random.choice([(100, 100, 255), (200, 100, 50)])) for _ in range(3)]
-        self.score = 0
-        self.lives = 3
-        self.game_time = time.time()
-        self.high_score = self.load_high_score()
-        self.leaderboard = self.load_leaderboard()
-        
-        # Achievements & Missions
-        self.achievements = {'survive_5min': False, 'destroy_10': False, 'beat_boss': False}
-        self.missions = {'destroy_20_plasma': False, 'survive_2min_no_shield': False}
-        self.asteroids_destroyed = 0
-        self.score_multiplier = 1
-        self.time_without_shield = 0
-        
+
+        # Visual-only objects; filled in by the warm-up
+        self.background_stars = []
+        self.planets = []
+        # Saved progression is read once during warm-up and written in the background from then on
+        self.store = None
+        self.run_saved = False
+
         # Colors
         self.bg_color = (0, 0, 20)
         self.asteroid_color = (150, 150, 150)
         self.star_color = (255, 255, 0)
         self.shield_color = (0, 255, 255)
-        
-        # Game settings
-        self.asteroid_spawn_rate = 60
-        self.star_spawn_rate = 120
-        self.power_up_spawn_rate = 300
-        self.black_hole_spawn_rate = 600
-        self.frame_count = 0
-        self.boss_active = False
-        self.boss = None
+
+        # Screen state
+        self.shown = None  # Screen on the display, so static screens are only redrawn on change
         self.paused = False
         self.show_customization = True
-        self.endless_mode = False
         self.screen_shake = 0
-        
-        # Upgrades
-        self.upgrades = {'projectile_speed': 1.0, 'shield_duration': 5, 'skill_cooldown': 1.0}
-        
-        # New Power-Up States
-        self.invincibility = False
-        self.time_slow = False
-        self.clone_active = False
-        
-        # Optimization flags
-        self.max_particles = 200  # Limit particle count for performance
 
-    def load_high_score(self):
-        try:
-            with open("highscore.txt", "r") as f:
-                return int(f.read())
-        except:
-            return 0
-
-    def save_high_score(self):
-        if self.score > self.high_score:
-            self.high_score = self.score
-            with open("highscore.txt", "w") as f:
-                f.write(str(self.high_score))
-
-    def load_leaderboard(self):
+        # Optimization flags
+        self.max_particles = 200  # Particle pool capacity; the quality tier sets the live budget within it
+        self.particles = ParticlePool(self.max_particles, rng=np.random.default_rng(self.fx_rng.getrandbits(64)))
+        self.startup.mark('particles')
+        # Visual detail tier; with 'auto' the governor trades detail for frame time
+        fixed = [tier['name'] for tier in TIERS].index(quality) if quality != 'auto' else 0
+        self.quality = QualityGovernor(1000 / render_fps, tier=fixed, adaptive=quality == 'auto')
+        self.sprites = SpriteCache(scale=render_scale)
+        self.hud = HudText(self.font)
+        self.world_hud = self.hud if self.hud_native else HudText(pygame.font.Font(None, int(self.screen_height * render_scale * 0.04)))
+        # Optional renderer that only erases and pushes regions that changed
+        self.dirty = DirtyRects((self.screen_width, self.screen_height)) if dirty_rects else None
+        self.apply_quality()
+
+        # Frame profiler: None unless enabled, so every lap in the loop is a skipped `if`
+        self.profiler = None
+        if profile or profile_path:
+            self.profiler = self.sim.profiler = FrameProfiler()
+            self.profile_path = profile_path
+            self.show_profiler = True
+            self.profiler_summary = None
+            self.profiler_refresh = 0
+            self.profiler_hud = None  # Its font is only loaded once the overlay is shown
+
+        # Gameplay events and a frame-time sample every TELEMETRY_FRAMES frames, written in the background
+        self.telemetry = self.sim.telemetry = Telemetry(telemetry_path) if telemetry_path else None
+        self.frames_drawn = 0
+
+        # Warm-up runs a slice per frame behind the customization screen and is finished
+        # outright if the player starts before it is done
+        self.warmup = self.warm_up()
+        self.warmup_time = 0.0
+        self.warmup_frames = 0
+        self.startup.mark('renderer state')
+
+        # The run in progress is snapshotted on pause, suspend and quit; one left over from
+        # last time is resumed, paused, instead of showing the start screen. None turns this off.
+        self.snapshots = AtomicWriter(snapshot_path, "snapshot-writer") if snapshot_path else None
+        self.resume_snapshot()
+
+    def in_run(self):
+        return not self.show_customization and not self.sim.game_over
+
+    def save_snapshot(self):
+        if self.snapshots is None:
+            return
+        look = SHIP_LOOK.pack(SHAPES.index(self.player_shape), *self.player_color)
+        self.snapshots.save(save_state(self.sim, look))
+
+    def resume_snapshot(self):
+        data = self.snapshots.read() if self.snapshots is not None else None
+        if data is None:
+            return
+        # Saved progress goes in first so the snapshot's newer credits and upgrades win
+        self.step_warmup(finish=True)
         try:
-            with open("leaderboard.txt", "r") as f:
-                return sorted([int(line.strip()) for line in f.readlines()], reverse=True)[:5]
-        except:
-            return [0, 0, 0, 0, 0]
-
-    def save_leaderboard(self):
-        self.leaderboard.append(self.score)
-        self.leaderboard = sorted(self.leaderboard, reverse=True)[:5]
-        with open("leaderboard.txt", "w") as f:
-            for score in self.leaderboard:
-                f.write(f"{score}\n")
-
-    def spawn_asteroid(self):
-        size = random.randint(int(self.screen_height * 0.03), int(self.screen_height * 0.08))
-        x = random.randint(0, self.screen_width - size)
-        self.asteroids.append({
-            'pos': [x, -size], 
-            'size': size, 
-            'speed': random.uniform(2, 4), 
-            'disabled': False,
-            'trail': []  # For fire trail effect
-        })
-
-    def spawn_star(self):
-        size = int(self.screen_height * 0.02)
-        x = random.randint(0, self.screen_width - size)
-        self.stars.append({'pos': [x, -size], 'size': size, 'speed': 3})
-
-    def spawn_power_up(self):
-        size = int(self.screen_height * 0.03)
-        x = random.randint(0, self.screen_width - size)
-        types = ['shield', 'speed', 'multiplier', 'time_slow', 'invincibility', 'clone']
-        self.power_ups.append({'pos': [x, -size], 'size': size, 'speed': 2, 'type': random.choice(types)})
-
-    def spawn_black_hole(self):
-        size = random.randint(30, 50)
-        x = random.randint(size, self.screen_width - size)
-        self.black_holes.append({'pos': [x, -size], 'size': size, 'duration': 300})
-
-    def spawn_boss(self):
-        self.boss = {'pos': [self.screen_width // 2, -100], 'size': 100, 'speed': 1, 'health': 10, 'phase': 1}
-        self.boss_active = True
-
-    def spawn_projectile(self):
-        if self.shoot_cooldown <= 0:
-            speed_boost = self.upgrades['projectile_speed']
-            proj_pos = [self.player_pos[0], self.player_pos[1] - self.player_size]
-            if self.current_gun == 'laser':
-                damage = 2 if self.overcharge_active else 1
-                self.projectiles.append({'pos': proj_pos.copy(), 'speed': 5 * speed_boost, 'size': 5, 'damage': damage, 'color': (255, 255, 255)})
-                self.shoot_cooldown = 10 if self.overcharge_active else 20
-            elif self.current_gun == 'plasma':
-                damage = 4 if self.overcharge_active else 2
-                self.projectiles.append({'pos': proj_pos.copy(), 'speed': 8 * speed_boost, 'size': 10, 'damage': damage, 'color': (255, 0, 255)})
-                self.shoot_cooldown = 15 if self.overcharge_active else 30
-            elif self.current_gun == 'homing':
-                damage = 3 if self.overcharge_active else 1
-                target = min(self.asteroids, key=lambda a: ((a['pos'][0] - proj_pos[0])**2 + (a['pos'][1] - proj_pos[1])**2)**0.5) if self.asteroids else None
-                self.projectiles.append({'pos': proj_pos.copy(), 'speed': 6 * speed_boost, 'size': 7, 'damage': damage, 'color': (0, 255, 0), 'target': target})
-                self.shoot_cooldown = 25
-            elif self.current_gun == 'spread':
-                damage = 1 if self.overcharge_active else 0.5
-                for angle in [-20, 0, 20]:
-                    self.projectiles.append({'pos': proj_pos.copy(), 'speed': 5 * speed_boost, 'size': 5, 'damage': damage, 'color': (255, 255, 0), 'angle': angle})
-                self.shoot_cooldown = 20
-            elif self.current_gun == 'gravity':
-                self.projectiles.append({'pos': proj_pos.copy(), 'speed': 4 * speed_boost, 'size': 15, 'damage': 0, 'color': (150, 0, 255), 'effect': 'push'})
-                self.shoot_cooldown = 40
-
-    def update_projectiles(self):
-        for proj in self.projectiles[:]:
-            if proj.get('angle'):
-                proj['pos'][0] += proj['speed'] * (proj['angle'] / 20)
-                proj['pos'][1] -= proj['speed']
-            elif proj.get('target'):
-                if proj['target'] in self.asteroids:
-                    dx = proj['target']['pos'][0] - proj['pos'][0]
-                    dy = proj['target']['pos'][1] - proj['pos'][1]
-                    dist = max(1, (dx**2 + dy**2)**0.5)  # Avoid division by zero
-                    proj['pos'][0] += proj['speed'] * dx / dist
-                    proj['pos'][1] += proj['speed'] * dy / dist
-                else:
-                    proj['pos'][1] -= proj['speed']
-            else:
-                proj['pos'][1] -= proj['speed']
-
-            if proj['pos'][1] < 0:
-                self.projectiles.remove(proj)
-                continue
-
-            if proj.get('effect') == 'push':
-                for asteroid in self.asteroids:
-                    dist = ((proj['pos'][0] - asteroid['pos'][0])**2 + (proj['pos'][1] - asteroid['pos'][1])**2)**0.5
-                    if dist < 100:
-                        asteroid['pos'][1] += 5
-                self.projectiles.remove(proj)
-                continue
+            look = load_state(self.sim, data)
+        except ValueError as e:
+            log.warning("Not resuming %s: %s", self.snapshots.path, e)
+            self.snapshots.discard()
+            return
+        shape, *color = SHIP_LOOK.unpack(look)
+        self.player_shape, self.player_color = SHAPES[shape], tuple(color)
+        self.sim.recorder = None  # A recording has to start at the beginning of a run
+        self.show_customization = False
+        self.paused = True
+        self.startup.mark('resume snapshot')
+
+    def warm_up(self):
+        # Saved progress first: the upgrades it restores must be in place before a run starts
+        self.store = ProgressStore()
+        self.store.apply(self.sim)
+        yield
+        fx = self.fx_rng
+        self.background_stars = [(fx.randint(0, self.screen_width), fx.randint(0, self.screen_height), fx.uniform(1, 3)) for _ in range(50)]
+        self.planets = [(fx.randint(0, self.screen_width), -50, fx.randint(30, 80), fx.choice([(100, 100, 255), (200, 100, 50)])) for _ in range(3)]
+        for char in "Score: 0123456789":
+            self.hud.glyph(char, WHITE)
+        yield
+        # Sprites for every asteroid and black hole size the simulation can spawn
+        place = self.sprites.place
+        glow = self.quality.settings['glow']
+        h = self.screen_height
+        for size in range(int(h * 0.03), int(h * 0.08) + 1):
+            place('asteroid', 0, 0, size, self.asteroid_color, glow)
+            if size % 16 == 0:
+                yield
+        for size in range(30, 51):
+            place('hole', 0, 0, size, (100, 0, 100))
+        place('disc', 0, 0, int(h * 0.02), self.star_color)
+        for shape in ('triangle', 'circle'):
+            place('ship', 0, 0, self.sim.player_size, self.player_color, shape)
+
+    def step_warmup(self, finish=False):
+        if self.warmup is None:
+            return
+        start = time.perf_counter()
+        if finish:
+            for _ in self.warmup:
+                pass
+            done = True
+        else:
+            done = next(self.warmup, StopIteration) is StopIteration
+        self.warmup_time += time.perf_counter() - start
+        self.warmup_frames += 1
+        if done:
+            self.warmup = None
+            self.startup.add('warm-up', self.warmup_time, self.warmup_frames)
+            self.report_startup()
+
+    def report_startup(self):
+        # Printed once the first frame is up and the warm-up is done, whichever comes last;
+        # resuming a snapshot finishes the warm-up before anything has been shown
+        if self.startup_report and self.warmup is None and self.startup.first_frame is not None:
+            print(self.startup.report())
+            self.startup_report = False
+
+    def reset(self):
+        # Back to the start screen for a new run. The display, fonts, sprite and text caches,
+        # background and loaded scores are kept; the sim keeps credits and upgrades.
+        if self.sim.recorder is not None:
+            self.sim.recorder.close(self.sim)
+        self.sim.reset(self.seed)
+        if self.record_path:
+            self.sim.recorder = InputRecorder(self.record_path)
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        self.last_time = time.perf_counter()
+        self.pending_inputs = []
+        self.controls.drag_finger = None
+        self.paused = False
+        self.show_customization = True
+        self.screen_shake = 0
+        self.run_saved = False
+        self.particles.clear()
+        if self.dirty is not None:
+            self.dirty.invalidate()
+
+    def apply_quality(self):
+        self.particles.set_limit(self.quality.settings['particles'])
+        if self.dirty is not None:
+            self.dirty.invalidate()
+
+    def handle_sim_event(self, event):
+        kind, x, y = event
+        if kind == 'asteroid_destroyed':
+            # Enhanced explosion with fire effect
+            self.particles.emit_fire(x, y, 10, 3, 8, 2)
+            self.screen_shake = 5
+        elif kind == 'boss_hit':
+            self.particles.emit_fire(x, y, 15, 5, 10, 3)
+            self.screen_shake = 10
+        elif kind == 'star_collected':
+            self.particles.emit(x, y, 5, 5, 1, self.star_color)
+        elif kind == 'player_hit':
+            self.particles.emit(x, y, 5, 5, 2, (255, 0, 0))
+
+    def update_effects(self):
+        # Engine exhaust for the ship and its clone
+        px, py = self.sim.player_pos
+        exhaust_y = py + self.sim.player_size//2
+        self.particles.emit_trail(px, exhaust_y, 0, 2, 3, (255, 100, 0))
+        if self.sim.clone_active:
+            self.particles.emit_trail(px + 50, exhaust_y, 0, 2, 3, (255, 100, 0))
+        self.particles.update()
 
-            for asteroid in self.asteroids[:]:
-                if ((proj['pos'][0] - asteroid['pos'][0])**2 + (proj['pos'][1] - asteroid['pos'][1])**2)**0.5 < asteroid['size'] and not asteroid['disabled']:
-                    self.projectiles.remove(proj)
-                    # Enhanced explosion with fire effect
-                    self.particles.extend([
-                        {'pos': asteroid['pos'].copy(), 'size': random.randint(3, 8), 'color': (255, random.randint(50, 150), 0), 'speed': [random.uniform(-2, 2), random.uniform(-2, 2)]}
-                        for _ in range(10)
-                    ])
-                    self.screen_shake = 5
-                    self.asteroids.remove(asteroid)
-                    self.score += (5 if proj['damage'] <= 1 else 10) * self.score_multiplier
-                    self.asteroids_destroyed += 1
-                    if self.current_gun == 'plasma' and self.asteroids_destroyed >= 20:
-                        self.missions['destroy_20_plasma'] = True
-                    if self.asteroids_destroyed >= 10:
-                        self.achievements['destroy_10'] = True
-                    break
-            else:  # Only check boss if no asteroid hit
-                if self.boss_active and ((proj['pos'][0] - self.boss['pos'][0])**2 + (proj['pos'][1] - self.boss['pos'][1])**2)**0.5 < self.boss['size']:
-                    self.projectiles.remove(proj)
-                    self.particles.extend([
-                        {'pos': self.boss['pos'].copy(), 'size': random.randint(5, 10), 'color': (255, random.randint(50, 150), 0), 'speed': [random.uniform(-3, 3), random.uniform(-3, 3)]}
-                        for _ in range(15)
-                    ])
-                    self.screen_shake = 10
-                    self.boss['health'] -= proj['damage']
-                    if self.boss['health'] <= 7 and self.boss['phase'] == 1:
-                        self.boss['phase'] = 2
-                        self.boss['speed'] = 2
-                    elif self.boss['health'] <= 3 and self.boss['phase'] == 2:
-                        self.boss['phase'] = 3
-                    if self.boss['health'] <= 0:
-                        self.score += 50 * self.score_multiplier
-                        self.boss_active = False
-                        self.achievements['beat_boss'] = True
-
-    def update_boss(self):
-        if self.boss_active:
-            if self.boss['phase'] == 3 and self.frame_count % 20 == 0:
-                self.projectiles.append({'pos': self.boss['pos'].copy(), 'speed': 5, 'size': 5, 'damage': 1, 'color': (255, 0, 0)})
+        for i, (x, y, speed) in enumerate(self.background_stars):
+            self.background_stars[i] = (x, y + speed, speed)
+            if y > self.screen_height:
+                self.background_stars[i] = (x, -2, speed)
+        for i, (x, y, size, color) in enumerate(self.planets):
+            self.planets[i] = (x, y + 0.5, size, color)
+            if y > self.screen_height + size:
+                self.planets[i] = (self.fx_rng.randint(0, self.screen_width), -size, size, color)
+
+    def advance(self, frame_time):
+        self.accumulator += frame_time
+        steps = 0
+        inputs = self.pending_inputs
+        # Taps go to the first tick only; the latest drag target steers every tick of the frame,
+        # so the ship covers the same ground per second whatever the render rate
+        drag = [command for command in inputs if command[0] == 'drag'][-1:]
+        while self.accumulator >= TICK and steps < MAX_CATCH_UP_STEPS and not self.sim.game_over:
+            for sim_event in self.sim.step(inputs):
+                self.handle_sim_event(sim_event)
+            inputs = drag
+            self.update_effects()
+            self.accumulator -= TICK
+            steps += 1
+        if steps:
+            self.pending_inputs = []
+        if steps == MAX_CATCH_UP_STEPS:
+            # Too far behind: drop the backlog rather than spiral
+            self.accumulator = min(self.accumulator, TICK)
+        self.alpha = min(self.accumulator / TICK, 1.0)
+
+    def lerp_point(self, prev, pos):
+        return prev[0] + (pos[0] - prev[0]) * self.alpha, prev[1] + (pos[1] - prev[1]) * self.alpha
+
+    def track(self, rects):
+        if self.dirty is not None:
+            self.dirty.add(rects)
 
     def draw_projectiles(self):
-        for proj in self.projectiles:
-            pygame.draw.rect(self.screen, proj['color'], (proj['pos'][0] - proj['size']//2, proj['pos'][1], proj['size'], proj['size'] * 2))
-            # Add glow effect
-            pygame.draw.circle(self.screen, (255, 255, 255, 50), (int(proj['pos'][0]), int(proj['pos'][1])), proj['size'] + 2, 1)
-
-    def draw_player(self):
-        if self.player_shape == 'triangle':
-            points = [
-                (self.player_pos[0], self.player_pos[1] - self.player_size//2),
-                (self.player_pos[0] - self.player_size//2, self.player_pos[1] + self.player_size//2),
-                (self.player_pos[0] + self.player_size//2, self.player_pos[1] + self.player_size//2)
-            ]
-            pygame.draw.polygon(self.screen, self.player_color, points)
-            pygame.draw.circle(self.screen, (255, 255, 255), (int(self.player_pos[0]), int(self.player_pos[1] - self.player_size//4)), 5)
-        elif self.player_shape == 'circle':
-            pygame.draw.circle(self.screen, self.player_color, (int(self.player_pos[0]), int(self.player_pos[1])), self.player_size//2)
-            pygame.draw.circle(self.screen, (255, 255, 255), (int(self.player_pos[0]), int(self.player_pos[1] - self.player_size//4)), 5)
-        if self.shield_active:
-            pygame.draw.circle(self.screen, self.shield_color, (int(self.player_pos[0]), int(self.player_pos[1])), self.player_size//2 + 5, 2)
-        self.particles.append({'pos': [self.player_pos[0], self.player_pos[1] + self.player_size//2], 'size': 3, 'color': (255, 100, 0), 'speed': [0, 2]})
-
-    def draw_asteroid(self, asteroid):
-        # Add trail effect
-        asteroid['trail'].append(asteroid['pos'].copy())
-        if len(asteroid['trail']) > 5:
-            asteroid['trail'].pop(0)
-        for i, pos in enumerate(asteroid['trail']):
-            alpha = (i + 1) * 20
-            pygame.draw.circle(self.screen, (255, 100, 0, alpha), (int(pos[0]), int(pos[1])), int(asteroid['size'] * (0.5 - i * 0.1)))
-        
-        color = (100, 100, 100) if asteroid['disabled'] else self.asteroid_color
-        pygame.draw.circle(self.screen, color, (int(asteroid['pos'][0]), int(asteroid['pos'][1])), asteroid['size'])
-        # Add glow effect
-        pygame.draw.circle(self.screen, (255, 150, 0, 50), (int(asteroid['pos'][0]), int(asteroid['pos'][1])), asteroid['size'] + 2, 1)
-
-    def draw_star(self, star):
-        pygame.draw.circle(self.screen, self.star_color, (int(star['pos'][0]), int(star['pos'][1])), star['size'])
-
-    def draw_power_up(self, power_up):
+        p = self.sim.projectiles
+        n = p.count
+        place = self.sprites.place
+        glow = self.quality.settings['glow']
+        self.track(self.world.blits([place('bolt', x, y, size, tuple(color), glow)
+                                      for (x, y), size, color in zip(p.lerp(self.alpha).tolist(), p.size[:n].astype(int).tolist(), p.color[:n].tolist())],
+                                      doreturn=self.dirty is not None))
+
+    def draw_player(self, offset_x=0):
+        x, y = self.lerp_point(self.sim.player_prev, self.sim.player_pos)
+        x += offset_x
+        player_size = self.sim.player_size
+        self.track([self.world.blit(*self.sprites.place('ship', x, y, player_size, self.player_color, self.player_shape))])
+        if self.sim.shield_active:
+            self.track([self.world.blit(*self.sprites.place('ring', x, y, player_size//2 + 5, self.shield_color, (2, 255)))])
+
+    def draw_asteroids(self):
+        a = self.sim.asteroids
+        n = a.count
+        disabled = (a.flags[:n] & DISABLED) != 0
+        # Trail effect: retrace the last few frames of movement
+        steps = a.vel[:n] * np.where(disabled, 0.0, self.sim.speed_factor)[:, None]
+        place = self.sprites.place
+        quality = self.quality.settings
+        trail, glow = range(5 - quality['trail'], 5), quality['glow']
+        blits = []
+        for (x, y), (sx, sy), size, off in zip(a.lerp(self.alpha).tolist(), steps.tolist(), a.size[:n].astype(int).tolist(), disabled.tolist()):
+            for i in trail:
+                radius = int(size * (0.5 - i * 0.1))
+                if radius > 0:
+                    back = 4 - i
+                    blits.append(place('disc', x - sx * back, y - sy * back, radius, (255, 100, 0), (i + 1) * 20))
+            # Body with its glow ring
+            blits.append(place('asteroid', x, y, size, (100, 100, 100) if off else self.asteroid_color, glow))
+        self.track(self.world.blits(blits, doreturn=self.dirty is not None))
+
+    def draw_stars(self):
+        s = self.sim.stars
+        place = self.sprites.place
+        self.track(self.world.blits([place('disc', x, y, size, self.star_color)
+                                      for (x, y), size in zip(s.lerp(self.alpha).tolist(), s.size[:s.count].astype(int).tolist())],
+                                      doreturn=self.dirty is not None))
+
+    def draw_power_ups(self):
         colors = {'shield': self.shield_color, 'speed': (255, 165, 0), 'multiplier': (255, 0, 255), 'time_slow': (0, 0, 255), 'invincibility': (255, 255, 255), 'clone': (150, 150, 150)}
-        pygame.draw.circle(self.screen, colors[power_up['type']], (int(power_up['pos'][0]), int(power_up['pos'][1])), power_up['size'])
-
-    def draw_black_hole(self, black_hole):
-        pygame.draw.circle(self.screen, (0, 0, 0), (int(black_hole['pos'][0]), int(black_hole['pos'][1])), black_hole['size'])
-        pygame.draw.circle(self.screen, (100, 0, 100), (int(black_hole['pos'][0]), int(black_hole['pos'][1])), black_hole['size'], 2)
+        u = self.sim.power_ups
+        place = self.sprites.place
+        self.track(self.world.blits([place('disc', x, y, size, colors[POWER_UP_TYPES[kind]])
+                                      for (x, y), size, kind in zip(u.lerp(self.alpha).tolist(), u.size[:u.count].astype(int).tolist(), u.kind[:u.count].tolist())],
+                                      doreturn=self.dirty is not None))
+
+    def draw_black_holes(self):
+        h = self.sim.black_holes
+        place = self.sprites.place
+        self.track(self.world.blits([place('hole', x, y, size, (100, 0, 100))
+                                      for (x, y), size in zip(h.lerp(self.alpha).tolist(), h.size[:h.count].astype(int).tolist())],
+                                      doreturn=self.dirty is not None))
 
     def draw_boss(self):
-        pygame.draw.circle(self.screen, (255, 0, 0), (int(self.boss['pos'][0]), int(self.boss['pos'][1])), self.boss['size'])
-        health_text = self.font.render(f"HP: {self.boss['health']}", True, (255, 255, 255))
-        self.screen.blit(health_text, (self.boss['pos'][0] - 20, self.boss['pos'][1] - self.boss['size'] - 20))
+        boss = self.sim.boss
+        x, y = self.lerp_point(self.sim.boss_prev, boss['pos'])
+        self.track([self.world.blit(*self.sprites.place('disc', x, y, boss['size'], (255, 0, 0)))])
 
     def draw_particles(self):
-        if len(self.particles) > self.max_particles:
-            self.particles = self.particles[-self.max_particles:]  # Limit particles
-        for particle in self.particles[:]:
-            particle['pos'][0] += particle['speed'][0]
-            particle['pos'][1] += particle['speed'][1]
-            particle['size'] -= 0.2
-            if particle['size'] <= 0:
-                self.particles.remove(particle)
-                continue
-            pygame.draw.circle(self.screen, particle['color'], (int(particle['pos'][0]), int(particle['pos'][1])), int(particle['size']))
+        ps = self.particles
+        n = ps.count
+        scale = self.render_scale
+        for (x, y), size, color in zip((ps.pos[:n] * scale).tolist(), (ps.size[:n] * scale).astype(int).tolist(), ps.color[:n].tolist()):
+            pygame.draw.circle(self.world, color, (int(x), int(y)), size)
+        if self.dirty is not None:
+            self.dirty.add_clusters(ps.pos[:n], ps.size[:n])
 
     def draw_background(self):
-        for i, (x, y, speed) in enumerate(self.background_stars):
-            pygame.draw.circle(self.screen, (255, 255, 255), (int(x), int(y)), 2)
-            self.background_stars[i] = (x, y + speed, speed)
-            if y > self.screen_height:
-                self.background_stars[i] = (x, -2, speed)
-        for i, (x, y, size, color) in enumerate(self.planets):
-            pygame.draw.circle(self.screen, color, (int(x), int(y)), size)
-            self.planets[i] = (x, y + 0.5, size, color)
-            if y > self.screen_height + size:
-                self.planets[i] = (random.randint(0, self.screen_width), -size, size, color)
-
-    def check_collision(self, obj, is_star=False, is_power_up=False):
-        obj_x, obj_y = obj['pos']
-        obj_size = obj['size']
-        px, py = self.player_pos
-        distance = ((px - obj_x) ** 2 + (py - obj_y) ** 2) ** 0.5
-        if distance < (self.player_size/2 + obj_size):
-            if is_star:
-                self.score += 10 * self.score_multiplier
-                self.particles.extend([{'pos': [px, py], 'size': 5, 'color': self.star_color, 'speed': [random.uniform(-1, 1), random.uniform(-1, 1)]} for _ in range(5)])
-                return True
-            elif is_power_up:
-                if obj['type'] == 'shield':
-                    self.shield_active = True
-                    self.shield_time = time.time()
-                elif obj['type'] == 'speed':
-                    self.player_speed = 2
-                    self.speed_time = time.time()
-                elif obj['type'] == 'multiplier':
-                    self.score_multiplier = 2
-                    self.multiplier_time = time.time()
-                elif obj['type'] == 'time_slow':
-                    self.time_slow = True
-                    self.time_slow_time = time.time()
-                elif obj['type'] == 'invincibility':
-                    self.invincibility = True
-                    self.invincibility_time = time.time()
-                elif obj['type'] == 'clone':
-                    self.clone_active = True
-                    self.clone_time = time.time()
-                return True
-            elif not self.shield_active and not self.invincibility and not obj.get('disabled', False):
-                self.lives -= 1
-                self.particles.extend([{'pos': [px, py], 'size': 5, 'color': (255, 0, 0), 'speed': [random.uniform(-2, 2), random.uniform(-2, 2)]} for _ in range(5)])
-                return True
-        return False
-
-    def apply_black_hole_effect(self):
-        for bh in self.black_holes[:]:
-            bh['pos'][1] += 1
-            bh['duration'] -= 1
-            if bh['duration'] <= 0:
-                self.black_holes.remove(bh)
-                continue
-            for obj in self.asteroids + ([self.boss] if self.boss_active else []):
-                if obj:
-                    dx = bh['pos'][0] - obj['pos'][0]
-                    dy = bh['pos'][1] - obj['pos'][1]
-                    dist = max(1, (dx**2 + dy**2)**0.5)
-                    strength = 3 / dist
-                    obj['pos'][0] += dx * strength
-                    obj['pos'][1] += dy * strength
-            dx = bh['pos'][0] - self.player_pos[0]
-            dy = bh['pos'][1] - self.player_pos[1]
-            dist = max(1, (dx**2 + dy**2)**0.5)
-            strength = 2 / dist
-            self.player_pos[0] += dx * strength
-            self.player_pos[1] += dy * strength
-
-    def is_touching_player(self, touch_pos):
-        px, py = self.player_pos
-        tx, ty = touch_pos
-        return ((px - tx) ** 2 + (py - ty) ** 2) ** 0.5 < self.player_size
+        rects = []
+        quality = self.quality.settings
+        scale = self.render_scale
+        for x, y, _ in self.background_stars[:quality['stars']]:
+            rects.append(pygame.draw.circle(self.world, (255, 255, 255), (int(x * scale), int(y * scale)), max(1, int(2 * scale))))
+        for x, y, size, color in self.planets[:quality['planets']]:
+            rects.append(pygame.draw.circle(self.world, color, (int(x * scale), int(y * scale)), int(size * scale)))
+        self.track(rects)
+
+    def draw_world(self):
+        self.draw_background()
+        self.draw_player()
+        if self.sim.clone_active:
+            self.draw_player(offset_x=50)
+        self.draw_particles()
+        self.draw_asteroids()
+        self.draw_stars()
+        self.draw_power_ups()
+        self.draw_black_holes()
+        if self.sim.boss_active:
+            self.draw_boss()
+        self.draw_projectiles()
+        self.sprites.end_frame()
+
+    def upscale(self):
+        pygame.transform.scale(self.world, (self.screen_width, self.screen_height), self.screen)
+
+    def draw_hud(self, shake_x, shake_y):
+        # Laid out in display pixels; scaled down when the HUD is drawn into the world surface
+        sim = self.sim
+        if self.hud_native:
+            target, scale, hud = self.screen, 1, self.hud
+        else:
+            target, scale, hud = self.world, self.render_scale, self.world_hud
+        text = hud.text
+        elapsed = sim.elapsed()
+        rows = [10] + [int(self.screen_height * row) for row in (0.08, 0.16, 0.24, 0.32, 0.40, 0.48)]
+        labels = [
+            ('score', text('score', "Score: {}", sim.score, glyphs=True), (10, rows[0])),
+            ('lives', text('lives', "Lives: {}", sim.lives), (10, rows[1])),
+            ('time', text('time', "Time: {:02d}:{:02d}", elapsed // 60, elapsed % 60, glyphs=True), (10, rows[2])),
+            ('gun', text('gun', "Gun: {}", sim.current_gun.capitalize()), (10, rows[3])),
+            ('skills', text('skills', "Dash: {} | EMP: {} | Over: {}", sim.cooldown('dash')//60, sim.cooldown('emp')//60, sim.cooldown('overcharge')//60, glyphs=True), (10, rows[4])),
+            ('high', text('high', "High: {}", self.store.high_score), (10, rows[5])),
+            ('mode', text('mode', "Endless Mode" if sim.endless_mode else "Normal Mode"), (10, rows[6])),
+        ]
+
+        if sim.boss_active:
+            boss = sim.boss
+            x, y = self.lerp_point(sim.boss_prev, boss['pos'])
+            labels.append(('boss_hp', text('boss_hp', "HP: {:g}", boss['health']), (x - 20, y - boss['size'] - 20)))
+
+        if self.paused:
+            labels.append(('pause', text('pause', "PAUSED - Tap Here to Resume"), (self.screen_width//4, self.screen_height//2)))
+        else:
+            labels.append(('pause', text('pause', "Pause"), (self.screen_width * 0.85, 10)))
+
+        if sim.game_over:
+            labels.append(('game_over', text('game_over', "GAME OVER - Select Upgrades", color=(255, 0, 0)), (self.screen_width//4, self.screen_height//2)))
+            labels.append(('achievements', text('achievements', "Achievements & Missions:"), (self.screen_width//4, self.screen_height * 0.6)))
+            y_offset = 0
+            for name, unlocked in {**sim.achievements, **sim.missions}.items():
+                labels.append((name, text(name, "{}: {}", name, 'Yes' if unlocked else 'No'), (self.screen_width//4, self.screen_height * 0.65 + y_offset)))
+                y_offset += 30
+
+        rects = target.blits([(surface, (int((x + shake_x) * scale), int((y + shake_y) * scale))) for _, surface, (x, y) in labels])
+        if self.dirty is not None:
+            for (name, _, _), rect in zip(labels, rects):
+                self.dirty.add_label(name, rect, name in hud.dirty)
+        hud.clear_dirty()
+
+    def draw_profiler(self):
+        prof = self.profiler
+        self.profiler_refresh -= 1
+        if self.profiler_refresh <= 0:
+            # Refresh the numbers a few times a second so they stay readable
+            self.profiler_summary = prof.summary()
+            self.profiler_refresh = 15
+        summary = self.profiler_summary
+        if summary is None:
+            return
+        if self.profiler_hud is None:
+            self.profiler_hud = HudText(pygame.font.Font(None, int(self.screen_height * 0.02)))
+        counts = summary['counts']
+        lines = [
+            ('frame', "Frame {:.1f} ms  p50 {:.1f}  p95 {:.1f}  p99 {:.1f}",
+             round(summary['frame_ms'], 1), round(summary['p50'], 1), round(summary['p95'], 1), round(summary['p99'], 1)),
+            ('quality', "Quality: {}", self.quality.name),
+            ('counts', "Asteroids {}  Shots {}  Particles {}  Holes {}", counts.get('asteroids', 0),
+             counts.get('projectiles', 0), counts.get('particles', 0), counts.get('black_holes', 0)),
+            ('sprites', "Sprites {} of {}  Evicted {}", counts.get('sprites', 0), self.sprites.capacity,
+             counts.get('sprite_evictions', 0)),
+        ]
+        lines += [(name, name + ": {:.2f} ms", round(ms, 2)) for name, ms in summary['phases'].items()]
+        x, y = 10, int(self.screen_height * 0.56)
+        rects = []
+        for name, fmt, *values in lines:
+            surface = self.profiler_hud.text(name, fmt, *values, color=(0, 255, 0))
+            rects.append(self.screen.blit(surface, (x, y)))
+            y += surface.get_height()
+        # Frame-time histogram over the profiler's window, one bar per millisecond
+        peak = max(1, int(prof.histogram.max()))
+        for i, frames in enumerate(prof.histogram.tolist()):
+            if frames:
+                height = max(1, frames * 60 // peak)
+                rects.append(pygame.draw.rect(self.screen, (0, 255, 0) if i < 17 else (255, 80, 0),
+                                              (x + i * 5, y + 64 - height, 4, height)))
+        self.track(rects)
 
     def draw_customization(self):
         self.screen.fill(self.bg_color)
-        title = self.font.render("Customize Your Ship", True, (255, 255, 255))
+        title = self.hud.text('customize_title', "Customize Your Ship")
         self.screen.blit(title, (self.screen_width//4, self.screen_height * 0.1))
         colors = [(0, 255, 0), (255, 0, 0), (0, 0, 255)]
         shapes = ['triangle', 'circle']
@@ -393,276 +509,227 @@ class SpaceDodgerAndroid:
             pygame.draw.rect(self.screen, color, (self.screen_width * 0.2 * (i + 1), self.screen_height * 0.3, 50, 50))
         for i, shape in enumerate(shapes):
             if shape == 'triangle':
-                pygame.draw.polygon(self.screen, self.player_color, 
+                pygame.draw.polygon(self.screen, self.player_color,
                                   [(self.screen_width * 0.2 * (i + 1), self.screen_height * 0.5 - 25),
                                    (self.screen_width * 0.2 * (i + 1) - 25, self.screen_height * 0.5 + 25),
                                    (self.screen_width * 0.2 * (i + 1) + 25, self.screen_height * 0.5 + 25)])
             else:
-                pygame.draw.circle(self.screen, self.player_color, 
+                pygame.draw.circle(self.screen, self.player_color,
                                  (int(self.screen_width * 0.2 * (i + 1)), int(self.screen_height * 0.5)), 25)
-        start_text = self.font.render("Tap to Start", True, (255, 255, 255))
+        start_text = self.hud.text('start', "Tap to Start")
         self.screen.blit(start_text, (self.screen_width//3, self.screen_height * 0.7))
-        endless_text = self.font.render("Endless Mode", True, (255, 255, 255))
+        endless_text = self.hud.text('endless', "Endless Mode")
         self.screen.blit(endless_text, (self.screen_width//3, self.screen_height * 0.8))
 
     def draw_upgrades(self):
         self.screen.fill(self.bg_color)
-        title = self.font.render(f"Upgrades (Credits: {self.credits})", True, (255, 255, 255))
+        title = self.hud.text('upgrades_title', "Upgrades (Credits: {})", self.sim.credits)
         self.screen.blit(title, (self.screen_width//4, self.screen_height * 0.1))
-        upgrades = [
-            ("Projectile Speed +0.2 (100)", 'projectile_speed', 0.2, 100),
-            ("Shield Duration +2s (150)", 'shield_duration', 2, 150),
-            ("Skill Cooldown -10% (200)", 'skill_cooldown', -0.1, 200)
-        ]
-        for i, (text, key, value, cost) in enumerate(upgrades):
-            upgrade_text = self.font.render(text, True, (255, 255, 255) if self.credits >= cost else (100, 100, 100))
+        for i, (text, key, _, cost) in enumerate(UPGRADES):
+            upgrade_text = self.hud.text(key, text, color=(255, 255, 255) if self.sim.credits >= cost else (100, 100, 100))
             self.screen.blit(upgrade_text, (self.screen_width//4, self.screen_height * 0.2 + i * 50))
-        back_text = self.font.render("Tap to Continue", True, (255, 255, 255))
+        back_text = self.hud.text('continue', "Tap to Continue")
         self.screen.blit(back_text, (self.screen_width//3, self.screen_height * 0.8))
 
+    def handle_command(self, command, inputs):
+        action = command[0]
+        if action == 'quit':
+            self.running = False
+            if self.in_run():
+                self.save_snapshot()
+        elif action == 'suspend':
+            if self.in_run():
+                self.paused = True
+                self.save_snapshot()
+        elif action == 'redraw':
+            self.shown = None
+        elif action == 'toggle_profiler':
+            if self.profiler:
+                self.show_profiler = not self.show_profiler
+                if self.dirty is not None:
+                    self.dirty.invalidate()
+        elif action == 'start':
+            self.step_warmup(finish=True)
+            self.show_customization = False
+            self.sim.endless_mode = command[1]
+        elif action == 'shape':
+            self.player_shape = command[1]
+        elif action == 'color':
+            self.player_color = command[1]
+        elif action == 'restart':
+            self.reset()
+        elif action == 'upgrade':
+            _, key, value, cost = UPGRADES[command[1]]
+            if self.sim.credits >= cost:
+                self.sim.upgrades[key] += value
+                self.sim.credits -= cost
+                self.store.update_progress(self.sim)
+        elif action == 'pause':
+            self.paused = True
+            self.save_snapshot()
+        elif action == 'resume':
+            self.paused = False
+        else:
+            # Everything else is gameplay input for the simulation
+            inputs.append(command)
+
+    def current_screen(self):
+        if self.show_customization:
+            return 'customize'
+        if self.sim.game_over:
+            return 'game_over'
+        return 'paused' if self.paused else 'playing'
+
+    def render(self, prof):
+        shake_x = self.fx_rng.randint(-self.screen_shake, self.screen_shake) if self.screen_shake > 0 else 0
+        shake_y = self.fx_rng.randint(-self.screen_shake, self.screen_shake) if self.screen_shake > 0 else 0
+        if self.dirty is None:
+            self.world.fill(self.bg_color)
+        else:
+            # Shake moves the HUD every frame, so redraw everything while it lasts
+            self.dirty.begin(self.screen, self.bg_color, force_full=self.screen_shake > 0)
+        self.screen_shake = max(0, self.screen_shake - 1)
+
+        self.draw_world()
+        if not self.hud_native:
+            self.draw_hud(shake_x, shake_y)
+        if prof:
+            prof.lap('draw')
+        if self.world is not self.screen:
+            self.upscale()
+            if prof:
+                prof.lap('upscale')
+        if self.hud_native:
+            self.draw_hud(shake_x, shake_y)
+        if prof and self.show_profiler:
+            self.draw_profiler()
+        if prof:
+            prof.lap('hud')
+
+        if self.dirty is None:
+            pygame.display.flip()
+        else:
+            self.dirty.present()
+        if prof:
+            prof.lap('present')
+
     def run(self):
         while self.running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    x, y = event.pos
-                    if self.show_customization:
-                        if y > self.screen_height * 0.7 and y < self.screen_height * 0.75:
-                            self.show_customization = False
-                            self.endless_mode = False
-                        elif y > self.screen_height * 0.75:
-                            self.show_customization = False
-                            self.endless_mode = True
-                        elif y > self.screen_height * 0.4 and y < self.screen_height * 0.6:
-                            if x < self.screen_width * 0.2:
-                                self.player_shape = 'triangle'
-                            elif x < self.screen_width * 0.4:
-                                self.player_shape = 'circle'
-                        elif y > self.screen_height * 0.2 and y < self.screen_height * 0.4:
-                            if x < self.screen_width * 0.2:
-                                self.player_color = (0, 255, 0)
-                            elif x < self.screen_width * 0.4:
-                                self.player_color = (255, 0, 0)
-                            elif x < self.screen_width * 0.6:
-                                self.player_color = (0, 0, 255)
-                    elif self.lives <= 0:
-                        if y > self.screen_height * 0.8:
-                            self.save_leaderboard()
-                            self.__init__()
-                        elif y > self.screen_height * 0.2 and y < self.screen_height * 0.5:
-                            upgrades = [
-                                ('projectile_speed', 0.2, 100),
-                                ('shield_duration', 2, 150),
-                                ('skill_cooldown', -0.1, 200)
-                            ]
-                            i = (y - int(self.screen_height * 0.2)) // 50
-                            if i < len(upgrades):
-                                key, value, cost = upgrades[i]
-                                if self.credits >= cost:
-                                    self.upgrades[key] += value
-                                    self.credits -= cost
-                    elif self.paused:
-                        if x > self.screen_width * 0.75 and y < self.screen_height * 0.1:
-                            self.paused = False
-                    elif x > self.screen_width * 0.75 and y < self.screen_height * 0.1:
-                        self.paused = True
-                    elif not self.paused and self.lives > 0:
-                        if y < self.screen_height * 0.1:
-                            if x < self.screen_width // 3 and self.dash_cooldown <= 0:
-                                self.player_pos[0] += 100 * (-1 if self.player_pos[0] > self.screen_width//2 else 1)
-                                self.dash_cooldown = int(600 * self.upgrades['skill_cooldown'])
-                            elif self.screen_width // 3 <= x < 2 * self.screen_width // 3 and self.emp_cooldown <= 0:
-                                for asteroid in self.asteroids:
-                                    if ((asteroid['pos'][0] - self.player_pos[0]) ** 2 + (asteroid['pos'][1] - self.player_pos[1]) ** 2) ** 0.5 < 200:
-                                        asteroid['disabled'] = True
-                                self.emp_cooldown = int(900 * self.upgrades['skill_cooldown'])
-                            elif x >= 2 * self.screen_width // 3 and self.overcharge_cooldown <= 0:
-                                self.overcharge_active = True
-                                self.overcharge_time = time.time()
-                                self.overcharge_cooldown = int(1200 * self.upgrades['skill_cooldown'])
-                        elif y < self.screen_height * 0.2:
-                            guns = ['laser', 'plasma', 'homing', 'spread', 'gravity']
-                            self.current_gun = guns[(guns.index(self.current_gun) + 1) % len(guns)]
-                        elif y < self.player_pos[1]:
-                            self.spawn_projectile()
-                        elif self.is_touching_player(event.pos):
-                            self.dragging = True
-                if event.type == pygame.MOUSEBUTTONUP:
-                    self.dragging = False
-                if event.type == pygame.MOUSEMOTION and self.dragging and self.lives > 0 and not self.paused:
-                    new_pos = list(event.pos)
-                    self.player_pos[0] += (new_pos[0] - self.player_pos[0]) * self.player_speed * 0.1
-                    self.player_pos[1] += (new_pos[1] - self.player_pos[1]) * self.player_speed * 0.1
-
-            if self.show_customization:
-                self.draw_customization()
-                pygame.display.flip()
-                continue
-
-            if self.lives <= 0:
-                self.draw_upgrades()
-                pygame.display.flip()
+            now = time.perf_counter()
+            frame_time = min(now - self.last_time, 0.25)
+            self.last_time = now
+            sim = self.sim
+            prof = self.profiler
+            inputs = []
+            screen = self.current_screen()
+            # Static screens block on the event queue instead of spinning, once warm-up is done and
+            # the screen is up (a resumed run starts on the pause screen with warm-up already done)
+            wait = IDLE_WAIT_MS if screen != 'playing' and screen == self.shown and self.warmup is None else 0
+            commands = self.controls.poll(screen, sim, wait)
+            for command in commands:
+                self.handle_command(command, inputs)
+            if prof:
+                prof.lap('events')
+
+            screen = self.current_screen()
+            if screen != 'playing':
+                if sim.game_over and not self.run_saved:
+                    self.store.record_run(sim)
+                    if self.snapshots is not None:
+                        self.snapshots.discard()
+                    self.run_saved = True
+                if sim.game_over and sim.recorder is not None:
+                    sim.recorder.close(sim)
+                # Nothing on these screens moves: redraw only when input arrived or the screen changed
+                if commands or screen != self.shown:
+                    if screen == 'customize':
+                        self.draw_customization()
+                        pygame.display.flip()
+                    elif screen == 'game_over':
+                        self.draw_upgrades()
+                        pygame.display.flip()
+                    else:
+                        if self.dirty is not None:
+                            self.dirty.invalidate()
+                        self.render(None)
+                    self.shown = screen
+                    if self.startup.first_frame is None:
+                        self.startup.frame_presented()
+                        self.report_startup()
+                self.step_warmup()
+                if self.dirty is not None:
+                    self.dirty.invalidate()
+                self.accumulator = 0.0
+                if prof:
+                    prof.discard()
+                self.clock.tick(self.render_fps if self.warmup is not None else IDLE_FPS)
+                # The time spent here must not be simulated once play resumes
+                self.last_time = time.perf_counter()
                 continue
 
-            if not self.paused:
-                speed_factor = 0.5 if self.time_slow else 1.0
-                if self.frame_count % (1800 // (2 if self.endless_mode else 1)) == 0:
-                    self.asteroid_spawn_rate = max(20, self.asteroid_spawn_rate - (5 if self.endless_mode else 2))
-
-                # Smooth boundary checking
-                self.player_pos[0] = max(-self.player_size//2, min(self.screen_width + self.player_size//2, self.player_pos[0]))
-                self.player_pos[1] = max(self.player_size//2, min(self.screen_height - self.player_size//2, self.player_pos[1]))
-
-                self.frame_count += 1
-                if self.frame_count % int(self.asteroid_spawn_rate * speed_factor) == 0:
-                    self.spawn_asteroid()
-                if self.frame_count % int(self.star_spawn_rate * speed_factor) == 0:
-                    self.spawn_star()
-                if self.frame_count % int(self.power_up_spawn_rate * speed_factor) == 0:
-                    self.spawn_power_up()
-                if self.frame_count % int(self.black_hole_spawn_rate * speed_factor) == 0:
-                    self.spawn_black_hole()
-                if self.frame_count % (3600 if not self.endless_mode else 1800) == 0 and not self.boss_active:
-                    self.spawn_boss()
-
-                # Timer updates
-                current_time = time.time()
-                if self.shield_active and current_time - self.shield_time > self.upgrades['shield_duration']:
-                    self.shield_active = False
-                if hasattr(self, 'speed_time') and current_time - self.speed_time > 5:
-                    self.player_speed = 1
-                if hasattr(self, 'multiplier_time') and current_time - self.multiplier_time > 10:
-                    self.score_multiplier = 1
-                if hasattr(self, 'time_slow_time') and current_time - self.time_slow_time > 5:
-                    self.time_slow = False
-                if hasattr(self, 'invincibility_time') and current_time - self.invincibility_time > 3:
-                    self.invincibility = False
-                if hasattr(self, 'clone_time') and current_time - self.clone_time > 5:
-                    self.clone_active = False
-                if self.overcharge_active and current_time - self.overcharge_time > 5:
-                    self.overcharge_active = False
-                self.dash_cooldown = max(0, self.dash_cooldown - 1)
-                self.emp_cooldown = max(0, self.emp_cooldown - 1)
-                self.overcharge_cooldown = max(0, self.overcharge_cooldown - 1)
-
-                # Update game objects
-                for asteroid in self.asteroids[:]:
-                    if not asteroid['disabled']:
-                        asteroid['pos'][1] += asteroid['speed'] * speed_factor
-                    if asteroid['pos'][1] > self.screen_height + asteroid['size']:
-                        self.asteroids.remove(asteroid)
-                    elif self.check_collision(asteroid):
-                        self.asteroids.remove(asteroid)
-
-                for star in self.stars[:]:
-                    star['pos'][1] += star['speed'] * speed_factor
-                    if star['pos'][1] > self.screen_height + star['size']:
-                        self.stars.remove(star)
-                    elif self.check_collision(star, is_star=True):
-                        self.stars.remove(star)
-
-                for power_up in self.power_ups[:]:
-                    power_up['pos'][1] += power_up['speed'] * speed_factor
-                    if power_up['pos'][1] > self.screen_height + power_up['size']:
-                        self.power_ups.remove(power_up)
-                    elif self.check_collision(power_up, is_power_up=True):
-                        self.power_ups.remove(power_up)
-
-                if self.boss_active:
-                    self.boss['pos'][1] += self.boss['speed'] * speed_factor
-                    if self.boss['pos'][1] > self.screen_height + self.boss['size']:
-                        self.boss_active = False
-                    elif self.check_collision(self.boss):
-                        self.boss['health'] -= 1
-                        if self.boss['health'] <= 0:
-                            self.score += 50 * self.score_multiplier
-                            self.boss_active = False
-                            self.achievements['beat_boss'] = True
-
-                self.apply_black_hole_effect()
-                self.shoot_cooldown = max(0, self.shoot_cooldown - 1)
-                self.update_projectiles()
-                self.update_boss()
-
-                elapsed = int(current_time - self.game_time)
-                if elapsed >= 300 and not self.achievements['survive_5min']:
-                    self.achievements['survive_5min'] = True
-                if not self.shield_active:
-                    self.time_without_shield += 1
-                    if self.time_without_shield >= 120 * 60 and not self.missions['survive_2min_no_shield']:
-                        self.missions['survive_2min_no_shield'] = True
-                self.credits += self.score // 100
-
-            # Rendering
-            self.screen.fill(self.bg_color)
-            shake_x = random.randint(-self.screen_shake, self.screen_shake) if self.screen_shake > 0 else 0
-            shake_y = random.randint(-self.screen_shake, self.screen_shake) if self.screen_shake > 0 else 0
-            self.screen_shake = max(0, self.screen_shake - 1)
-            
-            self.draw_background()
-            self.draw_player()
-            if self.clone_active:
-                temp_pos = self.player_pos.copy()
-                self.player_pos[0] += 50
-                self.draw_player()
-                self.spawn_projectile()
-                self.player_pos = temp_pos
-            self.draw_particles()
-            for asteroid in self.asteroids:
-                self.draw_asteroid(asteroid)
-            for star in self.stars:
-                self.draw_star(star)
-            for power_up in self.power_ups:
-                self.draw_power_up(power_up)
-            for bh in self.black_holes:
-                self.draw_black_hole(bh)
-            if self.boss_active:
-                self.draw_boss()
-            self.draw_projectiles()
-
-            # UI
-            elapsed = int(time.time() - self.game_time)
-            minutes = elapsed // 60
-            seconds = elapsed % 60
-            score_text = self.font.render(f"Score: {self.score}", True, (255, 255, 255))
-            lives_text = self.font.render(f"Lives: {self.lives}", True, (255, 255, 255))
-            time_text = self.font.render(f"Time: {minutes:02d}:{seconds:02d}", True, (255, 255, 255))
-            gun_text = self.font.render(f"Gun: {self.current_gun.capitalize()}", True, (255, 255, 255))
-            skills_text = self.font.render(f"Dash: {self.dash_cooldown//60} | EMP: {self.emp_cooldown//60} | Over: {self.overcharge_cooldown//60}", True, (255, 255, 255))
-            high_score_text = self.font.render(f"High: {self.high_score}", True, (255, 255, 255))
-            mode_text = self.font.render("Endless Mode" if self.endless_mode else "Normal Mode", True, (255, 255, 255))
-            self.screen.blit(score_text, (10 + shake_x, 10 + shake_y))
-            self.screen.blit(lives_text, (10 + shake_x, int(self.screen_height * 0.08) + shake_y))
-            self.screen.blit(time_text, (10 + shake_x, int(self.screen_height * 0.16) + shake_y))
-            self.screen.blit(gun_text, (10 + shake_x, int(self.screen_height * 0.24) + shake_y))
-            self.screen.blit(skills_text, (10 + shake_x, int(self.screen_height * 0.32) + shake_y))
-            self.screen.blit(high_score_text, (10 + shake_x, int(self.screen_height * 0.40) + shake_y))
-            self.screen.blit(mode_text, (10 + shake_x, int(self.screen_height * 0.48) + shake_y))
-
-            if self.paused:
-                pause_text = self.font.render("PAUSED - Tap Here to Resume", True, (255, 255, 255))
-                self.screen.blit(pause_text, (self.screen_width//4 + shake_x, self.screen_height//2 + shake_y))
-            else:
-                pause_button = self.font.render("Pause", True, (255, 255, 255))
-                self.screen.blit(pause_button, (self.screen_width * 0.85 + shake_x, 10 + shake_y))
-
-            if self.lives <= 0:
-                game_over_text = self.font.render("GAME OVER - Select Upgrades", True, (255, 0, 0))
-                self.screen.blit(game_over_text, (self.screen_width//4 + shake_x, self.screen_height//2 + shake_y))
-                ach_text = self.font.render("Achievements & Missions:", True, (255, 255, 255))
-                self.screen.blit(ach_text, (self.screen_width//4 + shake_x, self.screen_height * 0.6 + shake_y))
-                y_offset = 0
-                for name, unlocked in {**self.achievements, **self.missions}.items():
-                    text = self.font.render(f"{name}: {'Yes' if unlocked else 'No'}", True, (255, 255, 255))
-                    self.screen.blit(text, (self.screen_width//4 + shake_x, self.screen_height * 0.65 + y_offset + shake_y))
-                    y_offset += 30
-
-            pygame.display.flip()
-            self.clock.tick(60)  # Consistent 60 FPS
-
+            self.shown = screen
+            self.pending_inputs.extend(inputs)
+            self.advance(frame_time)
+            if prof:
+                prof.lap('effects')
+            self.render(prof)
+            work_ms = (time.perf_counter() - now) * 1000
+            tel = self.telemetry
+            if self.quality.update(work_ms):
+                self.apply_quality()
+                if tel:
+                    tel.log(sim.frame_count, QUALITY_TIER, self.quality.tier)
+            self.frames_drawn += 1
+            if tel and self.frames_drawn % TELEMETRY_FRAMES == 0:
+                tel.log(sim.frame_count, FRAME, self.quality.tier, work_ms, frame_time * 1000)
+            self.clock.tick(self.render_fps)
+            if prof:
+                prof.lap('wait')
+                prof.end_frame({'asteroids': sim.asteroids.count, 'projectiles': sim.projectiles.count,
+                                'particles': self.particles.count, 'black_holes': sim.black_holes.count,
+                                'quality': self.quality.tier, 'sprites': len(self.sprites),
+                                'sprite_evictions': self.sprites.evictions})
+
+        self.step_warmup(finish=True)
+        if self.sim.recorder is not None:
+            self.sim.recorder.close(self.sim)
+        if self.profiler and self.profile_path:
+            self.profiler.export(self.profile_path)
+        if not self.run_saved:
+            self.store.update_progress(self.sim)
+        self.store.close()
+        if self.snapshots is not None:
+            self.snapshots.close()
+        if self.telemetry:
+            self.telemetry.close()
         pygame.quit()
 
 if __name__ == "__main__":
-    game = SpaceDodgerAndroid()
-    game.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Space Dodger")
+    parser.add_argument('--dirty-rects', action='store_true', help="only redraw regions that changed")
+    parser.add_argument('--fps', type=int, default=60, help="render rate; the simulation always ticks at 60 Hz")
+    parser.add_argument('--seed', type=int, help="gameplay RNG seed")
+    parser.add_argument('--record', metavar='PATH', help="record the run's inputs for replay.py")
+    parser.add_argument('--quality', choices=['auto'] + [tier['name'] for tier in TIERS], default='auto',
+                        help="visual detail; 'auto' steps down when frames run over budget")
+    parser.add_argument('--profile', action='store_true', help="time each frame phase; F3 toggles the overlay")
+    parser.add_argument('--profile-out', metavar='PATH', help="write the profiler timeline on exit (.json or .csv)")
+    parser.add_argument('--render-scale', type=float, default=1.0,
+                        help="draw the world at this fraction of the display resolution, e.g. 0.75 or 0.5")
+    parser.add_argument('--scaled-hud', action='store_true', help="draw the HUD at the render scale too")
+    parser.add_argument('--startup-report', action='store_true', help="print where time to first frame went")
+    parser.add_argument('--snapshot', metavar='PATH', default="run.snapshot",
+                        help="where a paused or suspended run is saved and resumed from")
+    parser.add_argument('--telemetry', metavar='PATH', default="telemetry.bin", help="gameplay telemetry file")
+    parser.add_argument('--no-telemetry', action='store_true')
+    args = parser.parse_args()
+    if not 0 < args.render_scale <= 1:
+        parser.error("--render-scale must be in (0, 1]")
+    if args.dirty_rects and args.render_scale != 1:
+        parser.error("--dirty-rects needs --render-scale 1")
+    game = SpaceDodgerAndroid(dirty_rects=args.dirty_rects, render_fps=args.fps, seed=args.seed, record_path=args.record,
+                              profile=args.profile, profile_path=args.profile_out, quality=args.quality,
+                              startup_report=args.startup_report, render_scale=args.render_scale,
+                              hud_native=not args.scaled_hud, snapshot_path=args.snapshot,
+                              telemetry_path=None if args.no_telemetry else args.telemetry)
+    game.run()
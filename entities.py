@@ -0,0 +1,171 @@
+import numpy as np
+
+# Flag bits
+DISABLED = 1  # Asteroid knocked out by EMP: doesn't move or hurt
+
+# Handles pack a slot index in the low 32 bits and that slot's generation above it. A slot's
+# generation is bumped whenever its entity is removed, so stale handles stop resolving.
+INDEX_BITS = 32
+INDEX_MASK = (1 << INDEX_BITS) - 1
+
+
+def new_column(capacity, width=None, dtype=np.float64):
+    return np.zeros((capacity, width) if width else (capacity,), dtype)
+
+
+class EntityStore:
+    # Struct-of-arrays storage: one preallocated column per property, live rows packed in [0, count)
+    COLUMNS = ('pos', 'prev', 'vel', 'speed', 'size', 'damage', 'life', 'flags', 'kind', 'target', 'handle', 'color')
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.count = 0
+        self.pos = new_column(capacity, 2)
+        self.prev = new_column(capacity, 2)  # Position at the start of the current tick, for interpolation
+        self.vel = new_column(capacity, 2)
+        self.speed = new_column(capacity)
+        self.size = new_column(capacity)
+        self.damage = new_column(capacity)
+        self.life = new_column(capacity)
+        self.flags = new_column(capacity, dtype=np.uint8)
+        self.kind = new_column(capacity, dtype=np.int8)
+        self.target = new_column(capacity, dtype=np.int64)  # Handle of a tracked entity, -1 for none
+        self.handle = new_column(capacity, dtype=np.int64)  # This row's own handle
+        self.color = new_column(capacity, 3, np.uint8)
+        # Handle registry, indexed by slot: current row, current generation, and a stack of free slots
+        self.slot_row = np.full(capacity, -1, np.int64)
+        self.generation = np.zeros(capacity, np.int64)
+        self.free_slots = np.zeros(capacity, np.int64)
+        self.free_count = 0
+        self.slots_used = 0
+
+    def __len__(self):
+        return self.count
+
+    def reserve(self, needed):
+        if needed <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for name in self.COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        # Live entities never outnumber rows, so the slot arrays grow with them
+        self.slot_row = np.concatenate([self.slot_row, np.full(capacity - self.capacity, -1, np.int64)])
+        self.generation = np.concatenate([self.generation, np.zeros(capacity - self.capacity, np.int64)])
+        self.free_slots = np.concatenate([self.free_slots, np.zeros(capacity - self.capacity, np.int64)])
+        self.capacity = capacity
+
+    def allocate(self, start, count):
+        # Hand out handles for rows [start, start + count), reusing freed slots first
+        reused = min(count, self.free_count)
+        slots = self.free_slots[self.free_count - reused:self.free_count][::-1]
+        self.free_count -= reused
+        fresh = np.arange(self.slots_used, self.slots_used + count - reused)
+        self.slots_used += count - reused
+        slots = np.concatenate([slots, fresh])
+        self.slot_row[slots] = np.arange(start, start + count)
+        self.handle[start:start + count] = (self.generation[slots] << INDEX_BITS) | slots
+
+    def resolve(self, handles):
+        # Row of each handle, or -1 where the entity is gone (or the handle is -1)
+        handles = np.asarray(handles, np.int64)
+        slots = handles & INDEX_MASK
+        valid = (handles >= 0) & (slots < self.slots_used)
+        slots = np.where(valid, slots, 0)
+        valid &= self.generation[slots] == handles >> INDEX_BITS
+        return np.where(valid, self.slot_row[slots], -1)
+
+    def add(self, x, y, vx=0.0, vy=0.0, size=0, speed=0.0, damage=0, life=0, kind=0, flags=0, target=-1, color=(0, 0, 0)):
+        self.reserve(self.count + 1)
+        i = self.count
+        self.pos[i] = self.prev[i] = (x, y)
+        self.vel[i] = (vx, vy)
+        self.speed[i] = speed
+        self.size[i] = size
+        self.damage[i] = damage
+        self.life[i] = life
+        self.flags[i] = flags
+        self.kind[i] = kind
+        self.target[i] = target
+        self.color[i] = color
+        self.allocate(i, 1)
+        self.count += 1
+        return i
+
+    def extend(self, count, **columns):
+        # Batch add; every value may be a scalar or an array with one entry per new row
+        self.reserve(self.count + count)
+        start, end = self.count, self.count + count
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            if name == 'handle':
+                continue
+            if name in columns:
+                column[start:end] = columns[name]
+            elif name == 'prev' and 'pos' in columns:
+                column[start:end] = columns['pos']
+            else:
+                column[start:end] = -1 if name == 'target' else 0
+        self.allocate(start, count)
+        self.count = end
+        return start
+
+    def store_previous(self):
+        self.prev[:self.count] = self.pos[:self.count]
+
+    def lerp(self, alpha):
+        # Render positions between the last two ticks
+        n = self.count
+        if alpha >= 1:
+            return self.pos[:n]
+        return self.prev[:n] + (self.pos[:n] - self.prev[:n]) * alpha
+
+    def move(self, scale=1.0):
+        n = self.count
+        if np.ndim(scale):
+            self.pos[:n] += self.vel[:n] * scale[:, None]
+        else:
+            self.pos[:n] += self.vel[:n] * scale
+
+    def remove(self, mask):
+        # Order-preserving compaction of every row where mask is True
+        n = self.count
+        if not n:
+            return
+        keep = ~mask[:n]
+        kept = int(np.count_nonzero(keep))
+        if kept == n:
+            return
+        # Retire the removed rows' slots, invalidating every handle to them
+        gone = self.handle[:n][~keep] & INDEX_MASK
+        self.generation[gone] += 1
+        self.slot_row[gone] = -1
+        self.free_slots[self.free_count:self.free_count + gone.size] = gone
+        self.free_count += gone.size
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            column[:kept] = column[:n][keep]
+        self.count = kept
+        self.slot_row[self.handle[:kept] & INDEX_MASK] = np.arange(kept)
+
+    def remove_at(self, indices):
+        mask = np.zeros(self.count, bool)
+        mask[indices] = True
+        self.remove(mask)
+
+    def below(self, limit):
+        # Rows whose top edge has left the bottom of the screen
+        n = self.count
+        return self.pos[:n, 1] > limit + self.size[:n]
+
+    def distance_sq(self, x, y):
+        n = self.count
+        d = self.pos[:n] - (x, y)
+        return np.einsum('ij,ij->i', d, d)
+
+    def clear(self):
+        self.remove(np.ones(self.count, bool))
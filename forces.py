@@ -0,0 +1,105 @@
+import math
+
+import numpy as np
+
+# Bodies a field source can act on
+ASTEROID, BOSS, PLAYER = range(3)
+ALL_BODIES = (ASTEROID, BOSS, PLAYER)
+
+
+class ForceField:
+    # Sources registered for one tick (black holes, gravity bursts, EMP pulses) whose summed
+    # effect is applied to a batch of bodies in one pass. A source pulls bodies towards it by a
+    # fixed step, pushes them by a fixed vector, and/or sets flag bits on them, for every body
+    # of the kinds it affects within its radius. Given a SpatialGrid over the bodies, sources
+    # with a radius only look at the grid cells they touch.
+    def __init__(self, capacity=16):
+        self.count = 0
+        self.pos = np.zeros((capacity, 2))
+        self.radius = np.zeros(capacity)
+        self.pull = np.zeros((capacity, len(ALL_BODIES)))  # Step towards the source, per body kind
+        self.push = np.zeros((capacity, 2))
+        self.flags = np.zeros(capacity, np.uint8)
+        self.affects = np.zeros((capacity, len(ALL_BODIES)), bool)
+
+    def __len__(self):
+        return self.count
+
+    def add(self, x, y, radius=np.inf, pull=0.0, push=(0, 0), flags=0, bodies=ALL_BODIES):
+        # pull is one step for every body kind or a tuple with one per kind
+        if self.count == len(self.radius):
+            grow = len(self.radius)
+            for name in ('pos', 'radius', 'pull', 'push', 'flags', 'affects'):
+                column = getattr(self, name)
+                setattr(self, name, np.concatenate([column, np.zeros_like(column[:grow])]))
+        i = self.count
+        self.pos[i] = (x, y)
+        self.radius[i] = radius
+        self.pull[i] = pull
+        self.push[i] = push
+        self.flags[i] = flags
+        self.affects[i] = False
+        self.affects[i, list(bodies)] = True
+        self.count += 1
+
+    def clear(self):
+        self.count = 0
+
+    def bounded(self, body):
+        # Whether any source with a radius acts on bodies of this kind
+        return bool(np.isfinite(self.radius[:self.count][self.affects[:self.count, body]]).any())
+
+    def sample(self, points, body, grid=None):
+        # (displacement, flags) for each of points (n, 2) as bodies of the given kind. grid, a
+        # SpatialGrid built over points, limits each bounded source to the rows near it.
+        n = len(points)
+        moved = np.zeros((n, 2))
+        flags = np.zeros(n, np.uint8)
+        sources = np.flatnonzero(self.affects[:self.count, body])
+        if not sources.size or not n:
+            return moved, flags
+        unbounded = np.isinf(self.radius[sources])
+        if grid is not None and not unbounded.all():
+            self.sample_near(points, body, sources[~unbounded], grid, moved, flags)
+            sources = sources[unbounded]
+        if not sources.size:
+            return moved, flags
+        d = self.pos[sources, None] - points[None]
+        dist = np.hypot(d[..., 0], d[..., 1])
+        within = dist < self.radius[sources, None]
+        dist = np.maximum(1, dist)
+        moved += np.einsum('snk,sn->nk', d, within * (self.pull[sources, body, None] / dist))
+        moved += within.T.astype(float) @ self.push[sources]
+        marked = np.where(within, self.flags[sources, None], 0)
+        flags |= np.bitwise_or.reduce(marked, axis=0).astype(np.uint8)
+        return moved, flags
+
+    def sample_near(self, points, body, sources, grid, moved, flags):
+        # Adds the effect of bounded sources on the points inside their radius, checking only
+        # the rows the grid puts near each source
+        near = [grid.candidates(x, y, r) for (x, y), r in zip(self.pos[sources].tolist(), self.radius[sources].tolist())]
+        idx = np.concatenate(near)
+        src = np.repeat(sources, [len(rows) for rows in near])
+        d = self.pos[src] - points[idx]
+        dist = np.hypot(d[:, 0], d[:, 1])
+        within = dist < self.radius[src]
+        idx, src, d, dist = idx[within], src[within], d[within], np.maximum(1, dist[within])
+        step = d * (self.pull[src, body] / dist)[:, None] + self.push[src]
+        moved[:, 0] += np.bincount(idx, step[:, 0], len(points))
+        moved[:, 1] += np.bincount(idx, step[:, 1], len(points))
+        np.bitwise_or.at(flags, idx, self.flags[src])
+
+    def sample_point(self, x, y, body):
+        # sample() for a single body (the boss, the ship), without NumPy's per-call overhead
+        dx = dy = 0.0
+        for i in range(self.count):
+            if not self.affects[i, body]:
+                continue
+            sx, sy = self.pos[i].tolist()
+            d = math.hypot(sx - x, sy - y)
+            if d < self.radius[i]:
+                step = self.pull[i, body] / max(1, d)
+                px, py = self.push[i].tolist()
+                dx += (sx - x) * step + px
+                dy += (sy - y) * step + py
+        return dx, dy
@@ -0,0 +1,46 @@
+import pygame
+
+WHITE = (255, 255, 255)
+
+
+class HudText:
+    # Rendered text surfaces cached per label; a label is re-rasterised only when its values change.
+    # Fast-changing numeric labels are composed from cached per-character glyphs instead of font.render.
+    def __init__(self, font):
+        self.font = font
+        self.labels = {}
+        self.glyphs = {}
+        self.dirty = set()  # Labels whose surface changed since the last clear_dirty()
+
+    def text(self, name, fmt, *values, color=WHITE, glyphs=False):
+        key = (fmt, values, color)
+        cached = self.labels.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        text = fmt.format(*values) if values else fmt
+        surface = self.compose(text, color) if glyphs else self.font.render(text, True, color)
+        self.labels[name] = (key, surface)
+        self.dirty.add(name)
+        return surface
+
+    def glyph(self, char, color):
+        surface = self.glyphs.get((char, color))
+        if surface is None:
+            surface = self.glyphs[(char, color)] = self.font.render(char, True, color)
+        return surface
+
+    def compose(self, text, color):
+        parts = [self.glyph(char, color) for char in text]
+        surface = pygame.Surface((sum(part.get_width() for part in parts), self.font.get_height()), pygame.SRCALPHA)
+        x = 0
+        for part in parts:
+            surface.blit(part, (x, 0))
+            x += part.get_width()
+        return surface
+
+    def clear_dirty(self):
+        self.dirty.clear()
+
+    def clear(self):
+        self.labels.clear()
+        self.dirty.clear()
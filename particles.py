@@ -0,0 +1,83 @@
+import numpy as np
+
+
+class ParticlePool:
+    # Fixed-capacity particle storage. Live particles are packed in [0, count);
+    # dead ones are swap-removed from the tail, and once the pool is full new
+    # emissions overwrite existing slots round-robin instead of growing it.
+    def __init__(self, capacity, rng=None, decay=0.2):
+        self.capacity = capacity
+        self.limit = capacity  # Live particle budget, at most capacity
+        self.decay = decay
+        self.rng = rng or np.random.default_rng()
+        self.count = 0
+        self.cursor = 0
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.size = np.zeros(capacity)
+        self.color = np.zeros((capacity, 3), np.uint8)
+
+    def __len__(self):
+        return self.count
+
+    def set_limit(self, limit):
+        # Shrinking the budget drops the newest particles beyond it
+        self.limit = max(1, min(limit, self.capacity))
+        self.count = min(self.count, self.limit)
+        self.cursor %= self.limit
+
+    def slots(self, amount):
+        amount = min(amount, self.limit)
+        free = min(amount, self.limit - self.count)
+        slots = np.arange(self.count, self.count + free)
+        self.count += free
+        if free < amount:
+            overwrite = (self.cursor + np.arange(amount - free)) % self.limit
+            self.cursor = int(overwrite[-1] + 1) % self.limit
+            slots = np.concatenate([slots, overwrite])
+        return slots
+
+    def emit(self, x, y, amount, size, spread, color):
+        # Burst of particles from one point; size and color may be scalars or per-particle arrays
+        idx = self.slots(amount)
+        amount = idx.size
+        self.pos[idx] = (x, y)
+        self.vel[idx] = self.rng.uniform(-spread, spread, (amount, 2))
+        self.size[idx] = size if np.ndim(size) == 0 else size[:amount]
+        self.color[idx] = color if np.ndim(color) == 1 else color[:amount]
+
+    def emit_fire(self, x, y, amount, min_size, max_size, spread):
+        colors = np.empty((amount, 3), np.uint8)
+        colors[:, 0] = 255
+        colors[:, 1] = self.rng.integers(50, 151, amount)
+        colors[:, 2] = 0
+        self.emit(x, y, amount, self.rng.integers(min_size, max_size + 1, amount), spread, colors)
+
+    def emit_trail(self, x, y, vx, vy, size, color):
+        i = self.slots(1)[0]
+        self.pos[i] = (x, y)
+        self.vel[i] = (vx, vy)
+        self.size[i] = size
+        self.color[i] = color
+
+    def update(self):
+        n = self.count
+        if not n:
+            return
+        self.pos[:n] += self.vel[:n]
+        self.size[:n] -= self.decay
+        dead = np.flatnonzero(self.size[:n] <= 0)
+        if not dead.size:
+            return
+        # Swap-remove: fill holes below the new count with survivors from the tail
+        live = n - dead.size
+        holes = dead[dead < live]
+        movers = live + np.flatnonzero(self.size[live:n] > 0)
+        for column in (self.pos, self.vel, self.size, self.color):
+            column[holes] = column[movers]
+        self.count = live
+        self.cursor %= max(live, 1)
+
+    def clear(self):
+        self.count = 0
+        self.cursor = 0
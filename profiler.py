@@ -0,0 +1,112 @@
+import csv
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+
+class FrameProfiler:
+    # Splits each frame into consecutive phases: lap(name) charges the time since the previous
+    # lap to name, so the phases of a frame always add up to its total. Callers hold the profiler
+    # as None when profiling is off and guard every lap with `if prof:`, which costs nothing.
+    def __init__(self, history=600, bin_ms=1.0, bins=50):
+        self.history = history
+        self.bin_ms = bin_ms
+        self.frames = deque()  # (start time, frame ms, {phase: ms}, {entity: count})
+        self.phases = []       # Phase names in the order they were first seen
+        self.histogram = np.zeros(bins, np.int64)  # Frame times over the rolling window; last bin is overflow
+        self.current = {}
+        self.frame_start = self.last = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.current[name] = self.current.get(name, 0.0) + now - self.last
+        self.last = now
+
+    def bin(self, frame_ms):
+        return min(int(frame_ms / self.bin_ms), len(self.histogram) - 1)
+
+    def end_frame(self, counts=None):
+        # Closes the current frame and starts the next one
+        now = time.perf_counter()
+        phases = {name: seconds * 1000 for name, seconds in self.current.items()}
+        for name in phases:
+            if name not in self.phases:
+                self.phases.append(name)
+        frame_ms = (now - self.frame_start) * 1000
+        self.frames.append((self.frame_start, frame_ms, phases, counts or {}))
+        self.histogram[self.bin(frame_ms)] += 1
+        if len(self.frames) > self.history:
+            self.histogram[self.bin(self.frames.popleft()[1])] -= 1
+        self.current = {}
+        self.frame_start = self.last = now
+
+    def discard(self):
+        # Drop the frame in progress, e.g. while a menu is showing
+        self.current = {}
+        self.frame_start = self.last = time.perf_counter()
+
+    def summary(self, window=60):
+        # Mean ms per phase and frame-time percentiles over the last `window` frames
+        recent = list(self.frames)[-window:]
+        if not recent:
+            return None
+        frame_ms = np.array([frame[1] for frame in recent])
+        phases = {name: sum(frame[2].get(name, 0.0) for frame in recent) / len(recent) for name in self.phases}
+        p50, p95, p99 = np.percentile(frame_ms, (50, 95, 99))
+        return {'frame_ms': float(frame_ms.mean()), 'p50': float(p50), 'p95': float(p95), 'p99': float(p99),
+                'phases': phases, 'counts': recent[-1][3]}
+
+    def export(self, path):
+        # Timeline of the rolling window: JSON for .json paths, CSV otherwise
+        count_names = sorted({name for frame in self.frames for name in frame[3]})
+        origin = self.frames[0][0] if self.frames else 0.0
+        rows = [[round(start - origin, 6), round(frame_ms, 4)] +
+                [round(phases.get(name, 0.0), 4) for name in self.phases] +
+                [counts.get(name, 0) for name in count_names]
+                for start, frame_ms, phases, counts in self.frames]
+        columns = ['t', 'frame_ms'] + [f'{name}_ms' for name in self.phases] + count_names
+        if path.endswith('.json'):
+            edges = [i * self.bin_ms for i in range(len(self.histogram))]
+            with open(path, 'w') as f:
+                json.dump({'columns': columns, 'frames': rows,
+                           'histogram': {'bin_ms': edges, 'frames': self.histogram.tolist()}}, f)
+        else:
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerows(rows)
+
+
+class StartupTimer:
+    # Wall-clock stages from launch to the first presented frame. mark(stage) charges the time
+    # since the previous mark to stage; work done after the first frame is added with add().
+    def __init__(self):
+        # Interpreter start-up and imports happen before any of our code runs; CPU time is the best
+        # measure of them available from inside the process
+        self.stages = [('interpreter and imports (cpu)', time.process_time())]
+        self.last = time.perf_counter()
+        self.first_frame = None
+        self.after = []  # (stage, seconds, frames) for deferred work
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages.append((stage, now - self.last))
+        self.last = now
+
+    def add(self, stage, seconds, frames):
+        self.after.append((stage, seconds, frames))
+
+    def frame_presented(self):
+        self.mark('first frame')
+        self.first_frame = sum(seconds for _, seconds in self.stages)
+
+    def report(self):
+        if self.first_frame is None:
+            lines = ["No frame presented yet"]
+        else:
+            lines = [f"Time to first frame: {self.first_frame * 1000:.1f} ms"]
+        lines += [f"  {stage:<32}{seconds * 1000:8.1f} ms" for stage, seconds in self.stages]
+        lines += [f"Deferred {stage}: {seconds * 1000:.1f} ms over {frames} frames" for stage, seconds, frames in self.after]
+        return "\n".join(lines)
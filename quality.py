@@ -0,0 +1,56 @@
+from collections import deque
+
+# Visual quality tiers, best first. Gameplay is identical in all of them.
+TIERS = [
+    {'name': 'high', 'trail': 5, 'glow': True, 'particles': 200, 'stars': 50, 'planets': 3},
+    {'name': 'medium', 'trail': 3, 'glow': True, 'particles': 120, 'stars': 35, 'planets': 2},
+    {'name': 'low', 'trail': 1, 'glow': False, 'particles': 60, 'stars': 20, 'planets': 1},
+    {'name': 'minimal', 'trail': 0, 'glow': False, 'particles': 20, 'stars': 10, 'planets': 0},
+]
+
+
+class QualityGovernor:
+    # Watches how long each frame's work takes (excluding the idle wait) and steps down a tier
+    # when the 90th percentile misses the budget, or back up when it sits well under it.
+    # After any change the window restarts, and stepping up needs a longer quiet stretch than
+    # stepping down, so a borderline device settles on one tier instead of flip-flopping.
+    def __init__(self, budget_ms, tier=0, adaptive=True, window=60, settle=120, recover=480,
+                 down_ratio=1.0, up_ratio=0.6):
+        self.budget_ms = budget_ms
+        self.tier = tier
+        self.adaptive = adaptive
+        self.samples = deque(maxlen=window)
+        self.settle = settle    # Frames after a change before stepping down again
+        self.recover = recover  # Frames after a change before stepping up again
+        self.down_ratio = down_ratio
+        self.up_ratio = up_ratio
+        self.since_change = 0
+        self.changes = 0
+
+    @property
+    def settings(self):
+        return TIERS[self.tier]
+
+    @property
+    def name(self):
+        return TIERS[self.tier]['name']
+
+    def update(self, work_ms):
+        # Returns True when the tier changed
+        if not self.adaptive:
+            return False
+        self.samples.append(work_ms)
+        self.since_change += 1
+        if len(self.samples) < self.samples.maxlen or self.since_change < self.settle:
+            return False
+        load = sorted(self.samples)[len(self.samples) * 9 // 10]
+        if load > self.budget_ms * self.down_ratio and self.tier < len(TIERS) - 1:
+            self.tier += 1
+        elif load < self.budget_ms * self.up_ratio and self.tier > 0 and self.since_change >= self.recover:
+            self.tier -= 1
+        else:
+            return False
+        self.samples.clear()
+        self.since_change = 0
+        self.changes += 1
+        return True
@@ -0,0 +1,131 @@
+import argparse
+import struct
+import time
+
+from simulation import SpaceDodgerSim
+
+# Recording layout: one header, then a stream of records. Each record is the number of
+# ticks since the previous record, an action code, and for drags the target position.
+MAGIC = b'SDRP'
+VERSION = 2
+# Upgrades are doubles: a float32 1.2 or 0.9 comes back as a slightly different multiplier,
+# which changes cooldowns and projectile speeds and desyncs the replay
+HEADER = struct.Struct('<4sBQHHB3d')  # magic, version, seed, width, height, endless, upgrades
+PREFIX = struct.Struct('<4sB')  # The part of the header every version shares
+RECORD = struct.Struct('<HB')
+DRAG = struct.Struct('<hh')
+DIGEST = struct.Struct('<I')
+
+ACTIONS = ['drag', 'fire', 'switch_gun', 'dash', 'emp', 'overcharge']
+WAIT, CHECKPOINT, END = 253, 254, 255
+UPGRADE_KEYS = ('projectile_speed', 'shield_duration', 'skill_cooldown')
+CHECKPOINT_INTERVAL = 600  # Ticks between state digests
+
+
+class InputRecorder:
+    def __init__(self, path=None):
+        self.path = path
+        self.buffer = bytearray()
+        self.last_tick = 0
+        self.closed = False
+
+    def write(self, tick, code, payload=b''):
+        delta = tick - self.last_tick
+        while delta > 0xFFFF:
+            self.buffer += RECORD.pack(0xFFFF, WAIT)
+            delta -= 0xFFFF
+        self.buffer += RECORD.pack(delta, code)
+        self.buffer += payload
+        self.last_tick = tick
+
+    def record(self, sim, inputs):
+        # Called by SpaceDodgerSim.step() before the tick is simulated
+        tick = sim.frame_count
+        if not self.buffer:
+            # Endless mode and upgrades are settled by the time the first tick runs
+            self.buffer += HEADER.pack(MAGIC, VERSION, sim.seed, sim.screen_width, sim.screen_height, sim.endless_mode,
+                                       *(sim.upgrades[key] for key in UPGRADE_KEYS))
+            self.last_tick = tick
+        if tick % CHECKPOINT_INTERVAL == 0:
+            self.write(tick, CHECKPOINT, DIGEST.pack(sim.state_digest()))
+        for action, *args in inputs:
+            self.write(tick, ACTIONS.index(action), DRAG.pack(*(int(v) for v in args)) if action == 'drag' else b'')
+
+    def close(self, sim):
+        if self.closed or not self.buffer:
+            return bytes(self.buffer)
+        self.write(sim.frame_count, END, DIGEST.pack(sim.state_digest()))
+        self.closed = True
+        if self.path:
+            with open(self.path, 'wb') as f:
+                f.write(self.buffer)
+        return bytes(self.buffer)
+
+
+def read_recording(data):
+    if len(data) < HEADER.size or PREFIX.unpack_from(data) != (MAGIC, VERSION):
+        raise ValueError("not a Space Dodger recording (or an unsupported version)")
+    _, _, seed, width, height, endless, *upgrades = HEADER.unpack_from(data)
+    header = {'seed': seed, 'width': width, 'height': height, 'endless_mode': bool(endless),
+              'upgrades': dict(zip(UPGRADE_KEYS, upgrades))}
+    records = []
+    offset, tick = HEADER.size, 0
+    while offset < len(data):
+        delta, code = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        tick += delta
+        payload = None
+        if code == 0:
+            payload = DRAG.unpack_from(data, offset)
+            offset += DRAG.size
+        elif code in (CHECKPOINT, END):
+            payload = DIGEST.unpack_from(data, offset)[0]
+            offset += DIGEST.size
+        if code != WAIT:
+            records.append((tick, code, payload))
+    return header, records
+
+
+def replay(data):
+    # Re-run a recording headlessly as fast as possible; returns the sim and the first desynced tick (or None)
+    header, records = read_recording(data)
+    sim = SpaceDodgerSim(header['width'], header['height'], endless_mode=header['endless_mode'], seed=header['seed'])
+    sim.upgrades.update(header['upgrades'])
+    desync = None
+    i = 0
+    while i < len(records):
+        tick = records[i][0]
+        while sim.frame_count < tick and not sim.game_over:
+            sim.step()
+        inputs = []
+        while i < len(records) and records[i][0] == tick:
+            _, code, payload = records[i]
+            if code in (CHECKPOINT, END):
+                if desync is None and payload != sim.state_digest():
+                    desync = tick
+            elif code == 0:
+                inputs.append(('drag',) + payload)
+            else:
+                inputs.append((ACTIONS[code],))
+            i += 1
+        if records[i - 1][1] == END:
+            break
+        sim.step(inputs)
+    return sim, desync
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a Space Dodger input recording headlessly")
+    parser.add_argument('recording')
+    args = parser.parse_args()
+    with open(args.recording, 'rb') as f:
+        data = f.read()
+    start = time.perf_counter()
+    sim, desync = replay(data)
+    duration = time.perf_counter() - start
+    print(f"ticks={sim.frame_count} score={sim.score} lives={sim.lives} "
+          f"ticks_per_sec={sim.frame_count / max(duration, 1e-9):.0f}")
+    if desync is not None:
+        print(f"DESYNC at tick {desync}")
+        raise SystemExit(1)
+    print("in sync")
@@ -0,0 +1,37 @@
+import heapq
+
+
+class Scheduler:
+    # Min-heap of events keyed on the tick they fire, so a tick only costs as much as
+    # the events that are actually due. Events are plain (action, args) data, which
+    # keeps the queue easy to inspect and serialise. Ties fire in scheduling order.
+    def __init__(self):
+        self.queue = []
+        self.seq = 0
+
+    def __len__(self):
+        return len(self.queue)
+
+    def schedule(self, tick, action, *args):
+        # Returns the entry, which can be passed to cancel()
+        entry = [tick, self.seq, action, args]
+        self.seq += 1
+        heapq.heappush(self.queue, entry)
+        return entry
+
+    def cancel(self, entry):
+        # Lazy removal: the entry stays queued but is skipped when it comes due
+        if entry is not None:
+            entry[2] = None
+
+    def due(self, tick):
+        # Pops every live event scheduled at or before tick, in firing order
+        queue = self.queue
+        while queue and queue[0][0] <= tick:
+            _, _, action, args = heapq.heappop(queue)
+            if action is not None:
+                yield action, args
+
+    def clear(self):
+        self.queue.clear()
+        self.seq = 0
@@ -0,0 +1,621 @@
+import argparse
+import random
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from entities import DISABLED, EntityStore
+from forces import ASTEROID, BOSS, PLAYER, ForceField
+from scheduler import Scheduler
+from spatial import SpatialGrid
+
+# Headless game core: owns the world and advances it one fixed tick per step().
+# Nothing in here touches pygame, so it can run without a display.
+
+FPS = 60  # Simulation ticks per second; all game rules are expressed in ticks
+GUNS = ['laser', 'plasma', 'homing', 'spread', 'gravity']
+POWER_UP_TYPES = ['shield', 'speed', 'multiplier', 'time_slow', 'invincibility', 'clone']
+# Projectile kinds: one per gun, plus the boss's own shots
+LASER, PLASMA, HOMING, SPREAD, GRAVITY, BOSS_SHOT = range(len(GUNS) + 1)
+PROJECTILE_COLORS = [(255, 255, 255), (255, 0, 255), (0, 255, 0), (255, 255, 0), (150, 0, 255), (255, 0, 0)]
+# Tunable defaults; each sim has its own copy (gun_settings, boss_settings) for balance runs to change.
+# Guns: shot speed before the projectile_speed upgrade, size, damage and ticks between shots,
+# the last two also while overcharged.
+GUN_SETTINGS = {
+    'laser': {'speed': 5, 'size': 5, 'damage': 1, 'overcharged_damage': 2, 'cooldown': 20, 'overcharged_cooldown': 10},
+    'plasma': {'speed': 8, 'size': 10, 'damage': 2, 'overcharged_damage': 4, 'cooldown': 30, 'overcharged_cooldown': 15},
+    'homing': {'speed': 6, 'size': 7, 'damage': 1, 'overcharged_damage': 3, 'cooldown': 25, 'overcharged_cooldown': 25},
+    'spread': {'speed': 5, 'size': 5, 'damage': 0.5, 'overcharged_damage': 1, 'cooldown': 20, 'overcharged_cooldown': 20},
+    'gravity': {'speed': 4, 'size': 15, 'damage': 0, 'overcharged_damage': 0, 'cooldown': 40, 'overcharged_cooldown': 40},
+}
+SPREAD_ANGLES = (-20, 0, 20)
+# Below this many shot/asteroid (or source/asteroid) pairs, checking every pair costs less than
+# building and querying the asteroid grid
+BRUTE_FORCE_PAIRS = 4096
+
+# Boss: starting health, size and speed; the health at which it enters phase 2 (and speeds up)
+# and phase 3 (and starts firing); its shots; and the score for beating it
+BOSS_SETTINGS = {'health': 10, 'size': 100, 'speed': 1, 'phase_2_health': 7, 'phase_2_speed': 2,
+                 'phase_3_health': 3, 'fire_interval': 20, 'shot_speed': 5, 'shot_size': 5, 'shot_damage': 1,
+                 'score': 50}
+# Timed effects: the attribute they set, its value while active and once expired, and duration in seconds
+EFFECTS = {
+    'shield': ('shield_active', True, False, None),  # Duration comes from the shield_duration upgrade
+    'speed': ('player_speed', 2, 1, 5),
+    'multiplier': ('score_multiplier', 2, 1, 10),
+    'time_slow': ('time_slow', True, False, 5),
+    'invincibility': ('invincibility', True, False, 3),
+    'clone': ('clone_active', True, False, 5),
+    'overcharge': ('overcharge_active', True, False, 5),
+}
+ACHIEVEMENTS = ('survive_5min', 'destroy_10', 'beat_boss')
+MISSIONS = ('destroy_20_plasma', 'survive_2min_no_shield')
+UNLOCKS = ACHIEVEMENTS + MISSIONS
+# Telemetry record codes (see telemetry.py): the arg each carries, then its two values
+RUN_START = 0           # endless mode; screen width, height
+RUN_END = 1             # -; score, asteroids destroyed
+ASTEROID_DESTROYED = 2  # projectile kind; asteroid x, y
+POWER_UP = 3            # POWER_UP_TYPES index; player x, y
+LIFE_LOST = 4           # 0 asteroid, 1 boss; player x, y
+BOSS_SPAWNED = 5
+BOSS_PHASE = 6          # new phase; boss health
+BOSS_DEFEATED = 7
+UNLOCK = 8              # UNLOCKS index
+
+
+class SpaceDodgerSim:
+    def __init__(self, width, height, endless_mode=False, seed=None):
+        self.screen_width = width
+        self.screen_height = height
+        self.endless_mode = endless_mode
+        self.recorder = None
+        self.profiler = None  # Optional FrameProfiler; step() laps its phases when set
+        self.telemetry = None  # Optional telemetry.Telemetry; gameplay events are logged to it when set
+        self.player_size = int(self.screen_height * 0.07)
+
+        # Progression carried from run to run
+        self.credits = 0
+        self.upgrades = {'projectile_speed': 1.0, 'shield_duration': 5, 'skill_cooldown': 1.0}
+        # Balance settings, also kept across runs
+        self.gun_settings = {gun: dict(settings) for gun, settings in GUN_SETTINGS.items()}
+        self.boss_settings = dict(BOSS_SETTINGS)
+
+        # Game objects: storage is allocated once and emptied between runs
+        self.projectiles = EntityStore()
+        self.asteroids = EntityStore()
+        self.stars = EntityStore()
+        self.power_ups = EntityStore()
+        self.black_holes = EntityStore()
+        # Broadphase over asteroids; cells as wide as the biggest asteroid
+        self.asteroid_grid = SpatialGrid(int(self.screen_height * 0.08) + 1)
+        # Spawns, boss appearances and effect expiries fire from here instead of per-frame polling
+        self.scheduler = Scheduler()
+        # Black holes, gravity bursts and EMP pulses registered each tick and applied together
+        self.field = ForceField()
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        # Start a new run in place, keeping credits, upgrades and allocated storage
+
+        # All gameplay randomness comes from this one seeded stream
+        self.seed = random.randrange(1 << 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+
+        # Player properties
+        self.player_pos = [self.screen_width // 2, self.screen_height * 0.8]
+        self.player_prev = list(self.player_pos)
+        self.shield_active = False
+        self.player_speed = 1
+
+        # Weapon system
+        self.current_gun = 'laser'
+
+        # Weapon and skill cooldowns are kept as the tick each becomes ready again
+        self.shoot_ready = 0
+        self.dash_ready = 0
+        self.emp_ready = 0
+        self.overcharge_ready = 0
+        self.overcharge_active = False
+
+        for store in (self.projectiles, self.asteroids, self.stars, self.power_ups, self.black_holes):
+            store.clear()
+        self.grid_stale = True
+        self.score = 0
+        self.lives = 3
+        self.frame_count = 0
+        self.game_time = self.now()
+
+        # Achievements & Missions
+        self.achievements = dict.fromkeys(ACHIEVEMENTS, False)
+        self.missions = dict.fromkeys(MISSIONS, False)
+        self.asteroids_destroyed = 0
+        self.bosses_spawned = 0
+        self.bosses_defeated = 0
+        self.score_multiplier = 1
+        self.time_without_shield = 0
+
+        # Game settings
+        self.asteroid_spawn_rate = 60
+        self.star_spawn_rate = 120
+        self.power_up_spawn_rate = 300
+        self.black_hole_spawn_rate = 600
+        self.boss_active = False
+        self.boss = None
+        self.boss_prev = None
+
+        # Power-up states
+        self.invincibility = False
+        self.time_slow = False
+        self.clone_active = False
+        self.speed_factor = 1.0
+        self.scheduler.clear()
+        self.field.clear()
+        self.expiries = {}  # Pending expiry event per active effect
+
+        # Things that happened this step, for the renderer (particles, shake)
+        self.events = []
+
+    def now(self):
+        # Simulation time in seconds; stands still while the game isn't stepped
+        return self.frame_count / FPS
+
+    def elapsed(self):
+        return int(self.now() - self.game_time)
+
+    @property
+    def game_over(self):
+        return self.lives <= 0
+
+    def cooldown(self, name):
+        # Ticks until a weapon or skill ('shoot', 'dash', 'emp', 'overcharge') can be used again
+        return max(0, getattr(self, name + '_ready') - self.frame_count)
+
+    def spawn_asteroid(self):
+        size = self.rng.randint(int(self.screen_height * 0.03), int(self.screen_height * 0.08))
+        x = self.rng.randint(0, self.screen_width - size)
+        speed = self.rng.uniform(2, 4)
+        self.asteroids.add(x, -size, vy=speed, size=size, speed=speed)
+        self.grid_stale = True
+
+    def spawn_star(self):
+        size = int(self.screen_height * 0.02)
+        x = self.rng.randint(0, self.screen_width - size)
+        self.stars.add(x, -size, vy=3, size=size, speed=3)
+
+    def spawn_power_up(self):
+        size = int(self.screen_height * 0.03)
+        x = self.rng.randint(0, self.screen_width - size)
+        kind = self.rng.randrange(len(POWER_UP_TYPES))
+        self.power_ups.add(x, -size, vy=2, size=size, speed=2, kind=kind)
+
+    def spawn_black_hole(self):
+        size = self.rng.randint(30, 50)
+        x = self.rng.randint(size, self.screen_width - size)
+        self.black_holes.add(x, -size, size=size, life=300)
+
+    def spawn_boss(self):
+        settings = self.boss_settings
+        self.boss = {'pos': [self.screen_width // 2, -100], 'size': settings['size'], 'speed': settings['speed'],
+                     'health': settings['health'], 'phase': 1}
+        self.boss_prev = list(self.boss['pos'])
+        self.boss_active = True
+        self.bosses_spawned += 1
+        if self.telemetry:
+            self.telemetry.log(self.frame_count, BOSS_SPAWNED)
+
+    def defeat_boss(self):
+        self.score += self.boss_settings['score'] * self.score_multiplier
+        self.boss_active = False
+        self.bosses_defeated += 1
+        if self.telemetry:
+            self.telemetry.log(self.frame_count, BOSS_DEFEATED)
+        self.unlock(self.achievements, 'beat_boss')
+
+    def unlock(self, table, name):
+        if not table[name]:
+            table[name] = True
+            if self.telemetry:
+                self.telemetry.log(self.frame_count, UNLOCK, UNLOCKS.index(name))
+
+    def asteroid_index(self):
+        if self.grid_stale:
+            self.asteroid_grid.build(self.asteroids.pos, self.asteroids.count)
+            self.grid_stale = False
+        return self.asteroid_grid
+
+    def add_projectile(self, pos, kind, speed, size, damage, color, angle=0, target=-1):
+        self.projectiles.add(pos[0], pos[1], vx=speed * angle / 20, vy=-speed, speed=speed, size=size,
+                             damage=damage, kind=kind, target=target, color=color)
+
+    def spawn_projectile(self, offset_x=0):
+        if self.cooldown('shoot') > 0:
+            return
+        gun = self.gun_settings[self.current_gun]
+        kind = GUNS.index(self.current_gun)
+        speed = gun['speed'] * self.upgrades['projectile_speed']
+        damage = gun['overcharged_damage'] if self.overcharge_active else gun['damage']
+        proj_pos = (self.player_pos[0] + offset_x, self.player_pos[1] - self.player_size)
+        target = -1
+        if kind == HOMING:
+            nearest = self.asteroid_index().nearest(*proj_pos)
+            if nearest >= 0:
+                target = int(self.asteroids.handle[nearest])
+        for angle in SPREAD_ANGLES if kind == SPREAD else (0,):
+            self.add_projectile(proj_pos, kind, speed, gun['size'], damage, PROJECTILE_COLORS[kind],
+                                angle=angle, target=target)
+        self.shoot_ready = self.frame_count + (gun['overcharged_cooldown'] if self.overcharge_active else gun['cooldown'])
+
+    def hit_boss(self, damage):
+        settings = self.boss_settings
+        self.boss['health'] -= damage
+        phase = self.boss['phase']
+        if self.boss['health'] <= settings['phase_2_health'] and self.boss['phase'] == 1:
+            self.boss['phase'] = 2
+            self.boss['speed'] = settings['phase_2_speed']
+        elif self.boss['health'] <= settings['phase_3_health'] and self.boss['phase'] == 2:
+            self.boss['phase'] = 3
+        if self.telemetry and self.boss['phase'] != phase:
+            self.telemetry.log(self.frame_count, BOSS_PHASE, self.boss['phase'], self.boss['health'])
+        if self.boss['health'] <= 0:
+            self.defeat_boss()
+
+    def steer_homing(self):
+        # Homing shots chase a live target and fly straight up once it is gone
+        p, a = self.projectiles, self.asteroids
+        homing = np.flatnonzero(p.target[:p.count] >= 0)
+        if not homing.size:
+            return
+        rows = a.resolve(p.target[homing])
+        alive = rows >= 0
+        lost = homing[~alive]
+        p.target[lost] = -1
+        p.vel[lost, 0] = 0
+        p.vel[lost, 1] = -p.speed[lost]
+        chasing, rows = homing[alive], rows[alive]
+        if chasing.size:
+            d = a.pos[rows] - p.pos[chasing]
+            dist = np.maximum(1, np.hypot(d[:, 0], d[:, 1]))  # Avoid division by zero
+            p.vel[chasing] = d * (p.speed[chasing] / dist)[:, None]
+
+    def update_projectiles(self):
+        p, a = self.projectiles, self.asteroids
+        tel = self.telemetry
+        self.steer_homing()
+        p.move()
+        p.remove(p.pos[:p.count, 1] < 0)
+
+        n, m = p.count, a.count
+        if not n:
+            return
+        spent = np.zeros(n, bool)
+        destroyed = np.zeros(m, bool)
+        if n * m <= BRUTE_FORCE_PAIRS:
+            d = p.pos[:n, None] - a.pos[None, :m]
+            shots, rocks = np.nonzero(np.einsum('ijk,ijk->ij', d, d) < a.size[:m] ** 2)
+        else:
+            shots, rocks = self.asteroid_index().overlaps(p.pos[:n], a.size)
+        live = (a.flags[rocks] & DISABLED) == 0
+        shots, rocks = shots[live], rocks[live]
+        # Pairs come sorted by shot then asteroid: each shot takes the first asteroid still standing
+        for i, j in zip(shots.tolist(), rocks.tolist()):
+            if spent[i] or destroyed[j]:
+                continue
+            destroyed[j] = spent[i] = True
+            x, y = a.pos[j].tolist()
+            self.events.append(('asteroid_destroyed', x, y))
+            if tel:
+                tel.log(self.frame_count, ASTEROID_DESTROYED, p.kind[i].item(), x, y)
+            self.score += (5 if p.damage[i] <= 1 else 10) * self.score_multiplier
+            self.asteroids_destroyed += 1
+            if self.current_gun == 'plasma' and self.asteroids_destroyed >= 20:
+                self.unlock(self.missions, 'destroy_20_plasma')
+            if self.asteroids_destroyed >= 10:
+                self.unlock(self.achievements, 'destroy_10')
+
+        # Only check boss for shots that didn't hit an asteroid
+        if self.boss_active:
+            near_boss = (p.distance_sq(*self.boss['pos']) < self.boss['size'] ** 2) & ~spent
+            for i in np.flatnonzero(near_boss):
+                if not self.boss_active:
+                    break
+                spent[i] = True
+                self.events.append(('boss_hit', self.boss['pos'][0], self.boss['pos'][1]))
+                self.hit_boss(p.damage[i].item())
+        a.remove(destroyed)
+        p.remove(spent)
+        self.grid_stale = True
+
+    def update_boss(self):
+        if self.boss_active:
+            settings = self.boss_settings
+            if self.boss['phase'] == 3 and self.frame_count % settings['fire_interval'] == 0:
+                self.add_projectile(self.boss['pos'], BOSS_SHOT, settings['shot_speed'], settings['shot_size'],
+                                    settings['shot_damage'], PROJECTILE_COLORS[BOSS_SHOT])
+
+    def touching_player(self, store):
+        px, py = self.player_pos
+        return store.distance_sq(px, py) < (self.player_size / 2 + store.size[:store.count]) ** 2
+
+    def check_collision(self, obj):
+        obj_x, obj_y = obj['pos']
+        obj_size = obj['size']
+        px, py = self.player_pos
+        distance = ((px - obj_x) ** 2 + (py - obj_y) ** 2) ** 0.5
+        if distance < (self.player_size/2 + obj_size):
+            if not self.shield_active and not self.invincibility:
+                self.lives -= 1
+                self.events.append(('player_hit', px, py))
+                if self.telemetry:
+                    self.telemetry.log(self.frame_count, LIFE_LOST, 1, px, py)
+                return True
+        return False
+
+    def activate_power_up(self, kind):
+        attr, active, _, duration = EFFECTS[kind]
+        if duration is None:
+            duration = self.upgrades['shield_duration']
+        setattr(self, attr, active)
+        # Picking the same effect up again restarts its timer. It lapses on the first tick
+        # more than `duration` seconds after this one.
+        self.scheduler.cancel(self.expiries.get(kind))
+        self.expiries[kind] = self.scheduler.schedule(self.frame_count + int(duration * FPS) + 1, 'expire', kind)
+
+    def apply_forces(self):
+        # Black holes and gravity bursts are field sources; their summed effect is applied to the
+        # asteroids, the boss and the ship in one pass. EMP pulses were applied after input.
+        holes, a, p, field = self.black_holes, self.asteroids, self.projectiles, self.field
+        if holes.count:
+            holes.pos[:holes.count, 1] += 1
+            holes.life[:holes.count] -= 1
+            holes.remove(holes.life[:holes.count] <= 0)
+            for bx, by in holes.pos[:holes.count].tolist():
+                field.add(bx, by, pull=(3, 3, 2))
+        # A gravity shot bursts where its first move takes it, unless that is off the top
+        push = np.flatnonzero(p.kind[:p.count] == GRAVITY)
+        if push.size:
+            for x, y in (p.pos[push] + p.vel[push]).tolist():
+                if y >= 0:
+                    field.add(x, y, radius=100, push=(0, 5), bodies=(ASTEROID,))
+            p.remove_at(push)
+        self.apply_field()
+
+    def apply_field(self):
+        # Sum the registered sources' effect on the asteroids, the boss and the ship, then clear them
+        a, field = self.asteroids, self.field
+        if not field.count:
+            return
+        m = a.count
+        if m:
+            grid = None
+            if m * field.count > BRUTE_FORCE_PAIRS and field.bounded(ASTEROID):
+                grid = self.asteroid_index()
+            moved, flags = field.sample(a.pos[:m], ASTEROID, grid)
+            a.pos[:m] += moved
+            a.flags[:m] |= flags
+            # An EMP only sets flags, so the grid can still be used afterwards
+            if moved.any():
+                self.grid_stale = True
+        if self.boss_active:
+            dx, dy = field.sample_point(*self.boss['pos'], BOSS)
+            self.boss['pos'][0] += dx
+            self.boss['pos'][1] += dy
+        dx, dy = field.sample_point(*self.player_pos, PLAYER)
+        self.player_pos[0] += dx
+        self.player_pos[1] += dy
+        field.clear()
+
+    def is_touching_player(self, touch_pos):
+        px, py = self.player_pos
+        tx, ty = touch_pos
+        return ((px - tx) ** 2 + (py - ty) ** 2) ** 0.5 < self.player_size
+
+    # Inputs are tuples: ('drag', x, y), ('fire',), ('switch_gun',), ('dash',), ('emp',), ('overcharge',)
+    def apply_input(self, action, *args):
+        if self.game_over:
+            return
+        if action == 'drag':
+            x, y = args
+            self.player_pos[0] += (x - self.player_pos[0]) * self.player_speed * 0.1
+            self.player_pos[1] += (y - self.player_pos[1]) * self.player_speed * 0.1
+        elif action == 'fire':
+            self.spawn_projectile()
+        elif action == 'switch_gun':
+            self.current_gun = GUNS[(GUNS.index(self.current_gun) + 1) % len(GUNS)]
+        elif action == 'dash' and self.cooldown('dash') <= 0:
+            self.player_pos[0] += 100 * (-1 if self.player_pos[0] > self.screen_width//2 else 1)
+            self.dash_ready = self.frame_count + int(600 * self.upgrades['skill_cooldown'])
+        elif action == 'emp' and self.cooldown('emp') <= 0:
+            self.field.add(*self.player_pos, radius=200, flags=DISABLED, bodies=(ASTEROID,))
+            self.emp_ready = self.frame_count + int(900 * self.upgrades['skill_cooldown'])
+        elif action == 'overcharge' and self.cooldown('overcharge') <= 0:
+            self.activate_power_up('overcharge')
+            self.overcharge_ready = self.frame_count + int(1200 * self.upgrades['skill_cooldown'])
+
+    def spawn_interval(self, kind):
+        # Spawn periods shrink with speed_factor; the next wave is always measured from the last one
+        rate = {'asteroid': self.asteroid_spawn_rate, 'star': self.star_spawn_rate,
+                'power_up': self.power_up_spawn_rate, 'black_hole': self.black_hole_spawn_rate}[kind]
+        return max(1, int(rate * self.speed_factor))
+
+    def schedule_run(self):
+        # Recurring events for a fresh run, queued on its first tick once endless mode is settled
+        schedule = self.scheduler.schedule
+        schedule(1, 'tighten')
+        for kind in ('asteroid', 'star', 'power_up', 'black_hole'):
+            schedule(self.spawn_interval(kind), 'spawn', kind)
+        schedule(self.boss_interval(), 'boss')
+        if self.telemetry:
+            self.telemetry.log(self.frame_count, RUN_START, self.endless_mode, self.screen_width, self.screen_height)
+
+    def boss_interval(self):
+        return 1800 if self.endless_mode else 3600
+
+    def run_scheduled(self):
+        schedule = self.scheduler.schedule
+        tick = self.frame_count
+        for action, args in self.scheduler.due(tick):
+            if action == 'expire':
+                kind = args[0]
+                attr, _, expired, _ = EFFECTS[kind]
+                setattr(self, attr, expired)
+                del self.expiries[kind]
+            elif action == 'spawn':
+                kind = args[0]
+                getattr(self, 'spawn_' + kind)()
+                schedule(tick + self.spawn_interval(kind), 'spawn', kind)
+            elif action == 'tighten':
+                self.asteroid_spawn_rate = max(20, self.asteroid_spawn_rate - (5 if self.endless_mode else 2))
+                schedule(tick + 1800 // (2 if self.endless_mode else 1), 'tighten')
+            elif action == 'boss':
+                if not self.boss_active:
+                    self.spawn_boss()
+                schedule(tick + self.boss_interval(), 'boss')
+
+    def update_entities(self, speed_factor):
+        px, py = self.player_pos
+        tel = self.telemetry
+
+        a = self.asteroids
+        disabled = (a.flags[:a.count] & DISABLED) != 0
+        a.move(np.where(disabled, 0.0, speed_factor) if disabled.any() else speed_factor)
+        gone = a.below(self.screen_height)
+        hit = np.zeros(a.count, bool)
+        if not self.shield_active and not self.invincibility:
+            hit = ~gone & ~disabled & self.touching_player(a)
+            for _ in range(np.count_nonzero(hit)):
+                self.lives -= 1
+                self.events.append(('player_hit', px, py))
+                if tel:
+                    tel.log(self.frame_count, LIFE_LOST, 0, px, py)
+        a.remove(gone | hit)
+        self.grid_stale = True
+
+        # Stars and power-ups are usually few or none; an empty store is skipped outright
+        s = self.stars
+        if s.count:
+            s.move(speed_factor)
+            gone = s.below(self.screen_height)
+            hit = ~gone & self.touching_player(s)
+            for _ in range(np.count_nonzero(hit)):
+                self.score += 10 * self.score_multiplier
+                self.events.append(('star_collected', px, py))
+            s.remove(gone | hit)
+
+        u = self.power_ups
+        if u.count:
+            u.move(speed_factor)
+            gone = u.below(self.screen_height)
+            hit = ~gone & self.touching_player(u)
+            for kind in u.kind[:u.count][hit].tolist():
+                self.activate_power_up(POWER_UP_TYPES[kind])
+                if tel:
+                    tel.log(self.frame_count, POWER_UP, kind, px, py)
+            u.remove(gone | hit)
+
+        if self.boss_active:
+            self.boss['pos'][1] += self.boss['speed'] * speed_factor
+            if self.boss['pos'][1] > self.screen_height + self.boss['size']:
+                self.boss_active = False
+            elif self.check_collision(self.boss):
+                self.boss['health'] -= 1
+                if self.boss['health'] <= 0:
+                    self.defeat_boss()
+
+    def update_progress(self, current_time):
+        if current_time - self.game_time >= 300:
+            self.unlock(self.achievements, 'survive_5min')
+        if not self.shield_active:
+            self.time_without_shield += 1
+            if self.time_without_shield >= 120 * 60:
+                self.unlock(self.missions, 'survive_2min_no_shield')
+        self.credits += self.score // 100
+
+    def store_previous(self):
+        for store in (self.asteroids, self.stars, self.power_ups, self.black_holes, self.projectiles):
+            store.store_previous()
+        self.player_prev[:] = self.player_pos
+        if self.boss is not None:
+            self.boss_prev[:] = self.boss['pos']
+
+    def state_digest(self):
+        # Checksum of the gameplay state, for spotting replay desyncs
+        crc = zlib.crc32(struct.pack('<2d5q', *self.player_pos, self.score, self.asteroids_destroyed,
+                                     self.lives, self.frame_count, self.cooldown('shoot')))
+        for store in (self.asteroids, self.stars, self.power_ups, self.black_holes, self.projectiles):
+            crc = zlib.crc32(store.pos[:store.count].tobytes(), crc)
+        return crc
+
+    def step(self, inputs=()):
+        self.events = []
+        if self.frame_count == 0 and not self.scheduler:
+            self.schedule_run()
+        self.store_previous()
+        if self.recorder is not None:
+            self.recorder.record(self, inputs)
+        for action in inputs:
+            self.apply_input(*action)
+        if self.game_over:
+            return self.events
+        # An EMP disarms asteroids before they move, so none in range can still hit the ship this tick
+        self.apply_field()
+        prof = self.profiler
+        if prof:
+            prof.lap('input')
+
+        speed_factor = self.speed_factor = 0.5 if self.time_slow else 1.0
+
+        # Smooth boundary checking
+        self.player_pos[0] = max(-self.player_size//2, min(self.screen_width + self.player_size//2, self.player_pos[0]))
+        self.player_pos[1] = max(self.player_size//2, min(self.screen_height - self.player_size//2, self.player_pos[1]))
+
+        self.frame_count += 1
+        current_time = self.now()
+        self.run_scheduled()
+        if prof:
+            prof.lap('spawns')
+        self.update_entities(speed_factor)
+        if prof:
+            prof.lap('entities')
+        self.apply_forces()
+        if prof:
+            prof.lap('forces')
+        self.update_projectiles()
+        if prof:
+            prof.lap('projectiles')
+        self.update_boss()
+        self.update_progress(current_time)
+        if self.clone_active:
+            self.spawn_projectile(offset_x=50)
+        if self.telemetry and self.game_over:
+            self.telemetry.log(self.frame_count, RUN_END, 0, self.score, self.asteroids_destroyed)
+        if prof:
+            prof.lap('boss')
+        return self.events
+
+
+def autofire(sim):
+    return [('fire',)]
+
+
+def run_headless(frames, width=1080, height=2400, endless_mode=False, policy=None):
+    sim = SpaceDodgerSim(width, height, endless_mode=endless_mode)
+    for _ in range(frames):
+        if sim.game_over:
+            break
+        sim.step(policy(sim) if policy else ())
+    return sim
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run Space Dodger without a display")
+    parser.add_argument('--frames', type=int, default=36000)
+    parser.add_argument('--endless', action='store_true')
+    parser.add_argument('--autofire', action='store_true')
+    args = parser.parse_args()
+    start = time.perf_counter()
+    sim = run_headless(args.frames, endless_mode=args.endless, policy=autofire if args.autofire else None)
+    duration = time.perf_counter() - start
+    print(f"frames={sim.frame_count} score={sim.score} lives={sim.lives} "
+          f"fps={sim.frame_count / max(duration, 1e-9):.0f}")
@@ -0,0 +1,159 @@
+import heapq
+import struct
+import zlib
+
+import numpy as np
+
+from simulation import EFFECTS, GUNS
+
+# Binary save state of a whole run, for suspend/resume and checkpoints. Layout: a header
+# (magic, version, CRC-32 of the body), then the body: fixed scalars, the RNG state, the
+# scheduler queue, each entity store's live rows and handle registry, and an opaque blob
+# the caller can use for its own state. Everything is little-endian.
+MAGIC = b'SDSS'
+VERSION = 1
+HEADER = struct.Struct('<4sBI')
+SCALARS = struct.Struct(
+    '<HHQqqiqiii'  # width, height, seed, frame_count, score, lives, credits, destroyed, bosses spawned/defeated
+    'dd4d'         # game_time, time_without_shield, player pos and prev
+    'B4q4dd'       # gun, shoot/dash/emp/overcharge ready ticks, spawn rates, speed_factor
+    'BddBB3d'      # effect flags, player_speed, score_multiplier, unlocks, endless, upgrades
+    'B4ddddBQH'    # boss active, pos and prev, size, speed, health, phase, scheduler seq, queue length
+)
+RNG = struct.Struct('<625I?d')
+EVENT = struct.Struct('<qQBB')
+STORE = struct.Struct('<III')
+BLOB = struct.Struct('<I')
+
+ACTIONS = ['expire', 'spawn', 'tighten', 'boss']
+ARGS = list(EFFECTS) + ['asteroid', 'star', 'power_up', 'black_hole']
+NO_ARG = 255
+FLAG_EFFECTS = ['shield_active', 'time_slow', 'invincibility', 'clone_active', 'overcharge_active']
+UPGRADE_KEYS = ('projectile_speed', 'shield_duration', 'skill_cooldown')
+STORES = ('projectiles', 'asteroids', 'stars', 'power_ups', 'black_holes')
+
+
+def bits(values):
+    return sum(1 << i for i, value in enumerate(values) if value)
+
+
+def number(value):
+    # Settings are stored as doubles; whole numbers come back as ints, as the game sets them
+    return int(value) if value.is_integer() else value
+
+
+def save_state(sim, extra=b''):
+    # Between steps the force field is empty and the step's events have been handed over,
+    # so neither is saved
+    boss = sim.boss if sim.boss_active else {'pos': (0, 0), 'size': 0, 'speed': 0, 'health': 0, 'phase': 0}
+    boss_prev = sim.boss_prev if sim.boss_active else (0, 0)
+    queue = [entry for entry in sim.scheduler.queue if entry[2] is not None]
+    unlocks = list(sim.achievements.values()) + list(sim.missions.values())
+    parts = [SCALARS.pack(
+        sim.screen_width, sim.screen_height, sim.seed, sim.frame_count, sim.score, sim.lives, sim.credits,
+        sim.asteroids_destroyed, sim.bosses_spawned, sim.bosses_defeated,
+        sim.game_time, sim.time_without_shield, *sim.player_pos, *sim.player_prev,
+        GUNS.index(sim.current_gun), sim.shoot_ready, sim.dash_ready, sim.emp_ready, sim.overcharge_ready,
+        sim.asteroid_spawn_rate, sim.star_spawn_rate, sim.power_up_spawn_rate, sim.black_hole_spawn_rate,
+        sim.speed_factor,
+        bits(getattr(sim, name) for name in FLAG_EFFECTS), sim.player_speed, sim.score_multiplier, bits(unlocks),
+        sim.endless_mode, *(sim.upgrades[key] for key in UPGRADE_KEYS),
+        sim.boss_active, *boss['pos'], *boss_prev, boss['size'], boss['speed'], boss['health'], boss['phase'],
+        sim.scheduler.seq, len(queue))]
+    _, state, gauss = sim.rng.getstate()
+    parts.append(RNG.pack(*state, gauss is not None, gauss or 0.0))
+    for tick, seq, action, args in queue:
+        parts.append(EVENT.pack(tick, seq, ACTIONS.index(action), ARGS.index(args[0]) if args else NO_ARG))
+    for name in STORES:
+        store = getattr(sim, name)
+        n, used, free = store.count, store.slots_used, store.free_count
+        parts.append(STORE.pack(n, used, free))
+        parts += [getattr(store, column)[:n].tobytes() for column in store.COLUMNS]
+        parts += [store.slot_row[:used].tobytes(), store.generation[:used].tobytes(), store.free_slots[:free].tobytes()]
+    parts += [BLOB.pack(len(extra)), extra]
+    body = b''.join(parts)
+    return HEADER.pack(MAGIC, VERSION, zlib.crc32(body)) + body
+
+
+def load_state(sim, data):
+    # Puts sim into the saved state and returns the caller's blob. The sim must have the
+    # same screen size as the one that was saved.
+    if len(data) < HEADER.size:
+        raise ValueError("snapshot is truncated")
+    magic, version, crc = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a Space Dodger snapshot (or an unsupported version)")
+    body = memoryview(data)[HEADER.size:]
+    if zlib.crc32(body) != crc:
+        raise ValueError("snapshot is corrupt")
+    values = SCALARS.unpack_from(body)
+    (width, height, seed, frame_count, score, lives, saved_credits, destroyed, spawned, defeated,
+     game_time, without_shield, px, py, ppx, ppy,
+     gun, shoot_ready, dash_ready, emp_ready, overcharge_ready, asteroid_rate, star_rate, power_up_rate, hole_rate,
+     speed_factor, effect_bits, player_speed, multiplier, unlock_bits, endless, *rest) = values
+    upgrades, rest = rest[:3], rest[3:]
+    boss_active, bx, by, bpx, bpy, boss_size, boss_speed, boss_health, boss_phase, seq, queue_length = rest
+    if (width, height) != (sim.screen_width, sim.screen_height):
+        raise ValueError(f"snapshot is for a {width}x{height} screen")
+
+    sim.reset(seed)
+    sim.frame_count, sim.score, sim.lives, sim.credits = frame_count, score, lives, saved_credits
+    sim.asteroids_destroyed, sim.bosses_spawned, sim.bosses_defeated = destroyed, spawned, defeated
+    sim.game_time, sim.time_without_shield = game_time, without_shield
+    sim.player_pos, sim.player_prev = [px, py], [ppx, ppy]
+    sim.current_gun = GUNS[gun]
+    sim.shoot_ready, sim.dash_ready, sim.emp_ready, sim.overcharge_ready = shoot_ready, dash_ready, emp_ready, overcharge_ready
+    sim.asteroid_spawn_rate, sim.star_spawn_rate, sim.power_up_spawn_rate, sim.black_hole_spawn_rate = map(
+        number, (asteroid_rate, star_rate, power_up_rate, hole_rate))
+    sim.speed_factor = speed_factor
+    for i, name in enumerate(FLAG_EFFECTS):
+        setattr(sim, name, bool(effect_bits >> i & 1))
+    sim.player_speed, sim.score_multiplier = number(player_speed), number(multiplier)
+    for i, (table, name) in enumerate([(sim.achievements, name) for name in sim.achievements] +
+                                      [(sim.missions, name) for name in sim.missions]):
+        table[name] = bool(unlock_bits >> i & 1)
+    sim.endless_mode = bool(endless)
+    sim.upgrades.update(zip(UPGRADE_KEYS, map(number, upgrades)))
+    sim.boss_active = bool(boss_active)
+    if boss_active:
+        sim.boss = {'pos': [bx, by], 'size': number(boss_size), 'speed': number(boss_speed),
+                    'health': number(boss_health), 'phase': boss_phase}
+        sim.boss_prev = [bpx, bpy]
+    offset = SCALARS.size
+
+    *state, has_gauss, gauss = RNG.unpack_from(body, offset)
+    sim.rng.setstate((3, tuple(state), gauss if has_gauss else None))
+    offset += RNG.size
+
+    for _ in range(queue_length):
+        tick, entry_seq, action, arg = EVENT.unpack_from(body, offset)
+        offset += EVENT.size
+        args = () if arg == NO_ARG else (ARGS[arg],)
+        sim.scheduler.queue.append([tick, entry_seq, ACTIONS[action], args])
+    # Cancelled entries were left out, so the saved order may no longer be a valid heap
+    heapq.heapify(sim.scheduler.queue)
+    sim.scheduler.seq = seq
+    for entry in sim.scheduler.queue:
+        if entry[2] == 'expire':
+            sim.expiries[entry[3][0]] = entry
+
+    for name in STORES:
+        store = getattr(sim, name)
+        n, used, free = STORE.unpack_from(body, offset)
+        offset += STORE.size
+        store.reserve(max(n, used))
+        for column in store.COLUMNS:
+            array = getattr(store, column)
+            size = array[:n].nbytes
+            array[:n] = np.frombuffer(body, array.dtype, array[:n].size, offset).reshape(array[:n].shape)
+            offset += size
+        for array, count in ((store.slot_row, used), (store.generation, used), (store.free_slots, free)):
+            array[:count] = np.frombuffer(body, np.int64, count, offset)
+            offset += count * 8
+        store.slot_row[used:] = -1
+        store.generation[used:] = 0
+        store.count, store.slots_used, store.free_count = n, used, free
+    (length,) = BLOB.unpack_from(body, offset)
+    offset += BLOB.size
+    return bytes(body[offset:offset + length])
+
@@ -0,0 +1,104 @@
+import math
+
+import numpy as np
+
+# Cell coordinates are offset so entities slightly off-screen (negative x/y) still hash cleanly
+OFFSET = 1 << 20
+STRIDE = 1 << 21
+
+
+class SpatialGrid:
+    # Uniform-grid spatial hash over the rows of an EntityStore, rebuilt once per frame.
+    # Entries are sorted by cell key so every cell is a contiguous run found with searchsorted.
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+        self.pos = np.zeros((0, 2))
+        self.count = 0
+        self.keys = np.zeros(0, np.int64)
+        self.order = np.zeros(0, np.int64)
+        self.bounds = (0, 0, 0, 0)
+
+    def cell_of(self, pos):
+        return np.floor(pos / self.cell_size).astype(np.int64) + OFFSET
+
+    def build(self, pos, count):
+        self.pos = pos
+        self.count = count
+        cells = self.cell_of(pos[:count])
+        keys = cells[:, 0] * STRIDE + cells[:, 1]
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+        if count:
+            lo, hi = cells.min(axis=0), cells.max(axis=0)
+            self.bounds = (int(lo[0]), int(lo[1]), int(hi[0]), int(hi[1]))
+
+    def cell_range(self, cx0, cy0, cx1, cy1):
+        # Row indices of every entry whose cell lies in the inclusive cell box
+        if not self.count:
+            return np.zeros(0, np.int64)
+        bx0, by0, bx1, by1 = self.bounds
+        cx0, cy0, cx1, cy1 = max(cx0, bx0), max(cy0, by0), min(cx1, bx1), min(cy1, by1)
+        if cx0 > cx1 or cy0 > cy1:
+            return np.zeros(0, np.int64)
+        # Each column of cells is one contiguous key range
+        columns = np.arange(cx0, cx1 + 1, dtype=np.int64) * STRIDE
+        starts = np.searchsorted(self.keys, columns + cy0, 'left').tolist()
+        ends = np.searchsorted(self.keys, columns + cy1, 'right').tolist()
+        if len(starts) == 1:
+            return self.order[starts[0]:ends[0]]
+        return np.concatenate([self.order[s:e] for s, e in zip(starts, ends)])
+
+    def candidates(self, x, y, radius):
+        # Row indices of every entry in a cell the circle touches; callers do the exact test.
+        # Called once per area effect, so the cell box is worked out without NumPy.
+        size = self.cell_size
+        return self.cell_range(math.floor((x - radius) / size) + OFFSET, math.floor((y - radius) / size) + OFFSET,
+                               math.floor((x + radius) / size) + OFFSET, math.floor((y + radius) / size) + OFFSET)
+
+    def nearest(self, x, y):
+        # Grow the search box ring by ring until the best hit is provably the closest
+        if not self.count:
+            return -1
+        (cx, cy), = self.cell_of(np.array([[x, y]]))
+        bx0, by0, bx1, by1 = self.bounds
+        reach = max(abs(cx - bx0), abs(cx - bx1), abs(cy - by0), abs(cy - by1))
+        ring = 0
+        while True:
+            idx = self.cell_range(cx - ring, cy - ring, cx + ring, cy + ring)
+            if idx.size:
+                d = self.pos[idx] - (x, y)
+                d2 = np.einsum('ij,ij->i', d, d)
+                best = int(np.argmin(d2))
+                # Anything outside the box is at least `ring` whole cells away
+                if ring >= reach or d2[best] <= (ring * self.cell_size) ** 2:
+                    return int(idx[best])
+            if ring >= reach:
+                return -1
+            ring += 1
+
+    def overlaps(self, points, radius):
+        # All (point, entry) pairs with the point inside the entry's circle. Entry radii
+        # must not exceed cell_size so only the 3x3 neighbourhood needs checking.
+        if not self.count or not len(points):
+            return np.zeros(0, np.int64), np.zeros(0, np.int64)
+        cells = self.cell_of(points)
+        queries, starts, ends = [], [], []
+        for dx in (-1, 0, 1):
+            column = (cells[:, 0] + dx) * STRIDE + cells[:, 1]
+            starts.append(np.searchsorted(self.keys, column - 1, 'left'))
+            ends.append(np.searchsorted(self.keys, column + 1, 'right'))
+            queries.append(np.arange(len(points)))
+        starts, ends, queries = np.concatenate(starts), np.concatenate(ends), np.concatenate(queries)
+        lengths = ends - starts
+        total = int(lengths.sum())
+        if not total:
+            return np.zeros(0, np.int64), np.zeros(0, np.int64)
+        # Expand every [start, end) run into flat (query, entry) candidate pairs
+        q = np.repeat(queries, lengths)
+        run_offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        e = self.order[np.repeat(starts, lengths) + run_offsets]
+        d = points[q] - self.pos[e]
+        inside = np.einsum('ij,ij->i', d, d) < radius[e] ** 2
+        q, e = q[inside], e[inside]
+        order = np.lexsort((e, q))
+        return q[order], e[order]
@@ -0,0 +1,121 @@
+from collections import OrderedDict
+
+import pygame
+
+
+# Builders return (surface, anchor): the anchor is the pixel that lands on the entity position
+def finish(surface, anchor):
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert_alpha()
+    return surface, anchor
+
+
+def build_disc(size, color, alpha):
+    surface = pygame.Surface((size * 2 + 1, size * 2 + 1), pygame.SRCALPHA)
+    pygame.draw.circle(surface, (*color, 255 if alpha is None else alpha), (size, size), size)
+    return finish(surface, (size, size))
+
+
+def build_ring(size, color, variant):
+    width, alpha = variant
+    surface = pygame.Surface((size * 2 + 1, size * 2 + 1), pygame.SRCALPHA)
+    pygame.draw.circle(surface, (*color, alpha), (size, size), size, width)
+    return finish(surface, (size, size))
+
+
+# For asteroids and bolts the variant says whether to draw the glow ring
+def build_asteroid(size, color, glow_ring):
+    glow = size + 2
+    surface = pygame.Surface((glow * 2 + 1, glow * 2 + 1), pygame.SRCALPHA)
+    pygame.draw.circle(surface, color, (glow, glow), size)
+    if glow_ring:
+        pygame.draw.circle(surface, (255, 150, 0, 50), (glow, glow), glow, 1)
+    return finish(surface, (glow, glow))
+
+
+def build_bolt(size, color, glow_ring):
+    # Projectile body hangs below its position; the glow ring is centred on it
+    glow = size + 2
+    surface = pygame.Surface((glow * 2 + 1, max(glow * 2 + 1, glow + size * 2)), pygame.SRCALPHA)
+    pygame.draw.rect(surface, color, (glow - size//2, glow, size, size * 2))
+    if glow_ring:
+        pygame.draw.circle(surface, (255, 255, 255, 50), (glow, glow), glow, 1)
+    return finish(surface, (glow, glow))
+
+
+def build_ship(size, color, shape):
+    half = size//2
+    surface = pygame.Surface((half * 2 + 1, half * 2 + 1), pygame.SRCALPHA)
+    if shape == 'triangle':
+        pygame.draw.polygon(surface, color, [(half, 0), (0, half * 2), (half * 2, half * 2)])
+    else:
+        pygame.draw.circle(surface, color, (half, half), half)
+    pygame.draw.circle(surface, (255, 255, 255), (half, half - size//4), 5)
+    return finish(surface, (half, half))
+
+
+def build_hole(size, color, variant):
+    surface = pygame.Surface((size * 2 + 1, size * 2 + 1), pygame.SRCALPHA)
+    pygame.draw.circle(surface, (0, 0, 0), (size, size), size)
+    pygame.draw.circle(surface, color, (size, size), size, 2)
+    return finish(surface, (size, size))
+
+
+BUILDERS = {
+    'disc': build_disc,
+    'ring': build_ring,
+    'asteroid': build_asteroid,
+    'bolt': build_bolt,
+    'ship': build_ship,
+    'hole': build_hole,
+}
+
+
+class SpriteCache:
+    # Pre-rendered per-pixel-alpha sprites keyed by (kind, size, color, variant), LRU-evicted.
+    # place() takes positions and sizes in game coordinates and applies the render scale.
+    # A frame that evicts drew more distinct keys than fit (tall screens have more asteroid sizes,
+    # each with its trail discs), so end_frame() grows the capacity by what it evicted, up to limit.
+    def __init__(self, capacity=512, scale=1.0, limit=8192):
+        self.capacity = capacity
+        self.limit = limit
+        self.scale = scale
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.frame_evictions = 0
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def get(self, kind, size, color, variant=None):
+        key = (kind, size, color, variant)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+        self.misses += 1
+        sprite = self.sprites[key] = BUILDERS[kind](size, color, variant)
+        if len(self.sprites) > self.capacity:
+            self.sprites.popitem(last=False)
+            self.evictions += 1
+            self.frame_evictions += 1
+        return sprite
+
+    def end_frame(self):
+        # Every key this frame evicted was needed within the frame, so that much more room keeps
+        # the next one from rebuilding them
+        if self.frame_evictions:
+            self.capacity = min(self.limit, self.capacity + self.frame_evictions)
+            self.frame_evictions = 0
+
+    def place(self, kind, x, y, size, color, variant=None):
+        # (surface, topleft) ready for Surface.blits
+        scale = self.scale
+        surface, (ax, ay) = self.get(kind, int(size * scale), color, variant)
+        return surface, (int(x * scale) - ax, int(y * scale) - ay)
+
+    def clear(self):
+        self.sprites.clear()
@@ -0,0 +1,188 @@
+import heapq
+import json
+import logging
+import os
+import threading
+
+# Persistent progression: scores, credits, upgrades and unlocked achievements/missions.
+# Everything is loaded once at startup; saves go through an AtomicWriter, so the game loop
+# never waits on storage.
+
+VERSION = 1
+log = logging.getLogger(__name__)
+LEGACY_HIGH_SCORE = "highscore.txt"
+LEGACY_LEADERBOARD = "leaderboard.txt"
+
+
+class ProgressStore:
+    def __init__(self, path="progress.json", leaderboard_size=5):
+        self.path = path
+        self.leaderboard_size = leaderboard_size
+        self.high_score = 0
+        self.leaderboard = []  # Min-heap of the best leaderboard_size scores
+        self.credits = 0
+        self.upgrades = {}
+        self.achievements = {}
+        self.missions = {}
+        self.saver = AtomicWriter(path, "progress-writer")
+        self.writable = True  # Off when a file we couldn't read is still in the way
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            self.load_legacy()
+            return
+        except (OSError, ValueError) as e:
+            self.set_aside(e)
+            return
+        if not isinstance(data, dict) or data.get('version') != VERSION:
+            version = data.get('version') if isinstance(data, dict) else None
+            self.set_aside(f"version {version!r}, expected {VERSION}")
+            return
+        self.high_score = data.get('high_score', 0)
+        self.credits = data.get('credits', 0)
+        self.upgrades = data.get('upgrades', {})
+        self.achievements = data.get('achievements', {})
+        self.missions = data.get('missions', {})
+        for score in data.get('leaderboard', []):
+            self.submit(score)
+
+    def set_aside(self, reason):
+        # A file we can't use may still be the player's progress (e.g. from a newer version of the
+        # game): move it to a backup rather than save defaults over it, and don't save if we can't
+        try:
+            os.replace(self.path, self.path + ".bak")
+        except OSError as e:
+            log.warning("Can't use %s (%s) or move it aside (%s); progress won't be saved", self.path, reason, e)
+            self.writable = False
+        else:
+            log.warning("Can't use %s (%s); moved it to %s.bak", self.path, reason, self.path)
+
+    def load_legacy(self):
+        # Scores from the old plain-text files, picked up the first time the store is used
+        try:
+            with open(LEGACY_HIGH_SCORE) as f:
+                self.high_score = int(f.read())
+        except (OSError, ValueError):
+            pass
+        try:
+            with open(LEGACY_LEADERBOARD) as f:
+                for line in f:
+                    self.submit(int(line))
+        except (OSError, ValueError):
+            pass
+
+    def submit(self, score):
+        if len(self.leaderboard) < self.leaderboard_size:
+            heapq.heappush(self.leaderboard, score)
+        elif score > self.leaderboard[0]:
+            heapq.heapreplace(self.leaderboard, score)
+
+    def top_scores(self):
+        return sorted(self.leaderboard, reverse=True)
+
+    def apply(self, sim):
+        # Hand saved progression to a new simulation
+        sim.credits = self.credits
+        for key, value in self.upgrades.items():
+            if key in sim.upgrades:
+                sim.upgrades[key] = value
+
+    def update_progress(self, sim):
+        self.credits = sim.credits
+        self.upgrades = dict(sim.upgrades)
+        # Unlocks are permanent: a run can add to them but never take one away
+        for saved, run in ((self.achievements, sim.achievements), (self.missions, sim.missions)):
+            for name, unlocked in run.items():
+                saved[name] = saved.get(name, False) or unlocked
+        self.save()
+
+    def record_run(self, sim):
+        self.high_score = max(self.high_score, sim.score)
+        self.submit(sim.score)
+        self.update_progress(sim)
+
+    def snapshot(self):
+        return {'version': VERSION, 'high_score': self.high_score, 'leaderboard': self.top_scores(),
+                'credits': self.credits, 'upgrades': dict(self.upgrades),
+                'achievements': dict(self.achievements), 'missions': dict(self.missions)}
+
+    def save(self):
+        if not self.writable:
+            return
+        self.saver.save(json.dumps(self.snapshot()).encode())
+
+    def close(self):
+        self.saver.close()
+
+
+class AtomicWriter:
+    # Writes whole files on a background thread. Only the newest data matters: data saved while
+    # a write is in flight replaces any still waiting. Each write goes to a sibling temp file
+    # that is synced and swapped in, so a crash never leaves a torn file. discard() removes the
+    # file, in order with the saves before it.
+    def __init__(self, path, name="atomic-writer"):
+        self.path = path
+        self.name = name
+        self.pending = None
+        self.closing = False
+        self.condition = threading.Condition()
+        self.writer = None
+
+    def read(self):
+        # The last data written, or None if there is none
+        try:
+            with open(self.path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def save(self, data):
+        self.queue(data)
+
+    def discard(self):
+        self.queue(b'')
+
+    def queue(self, data):
+        with self.condition:
+            self.pending = data
+            if self.writer is None:
+                self.writer = threading.Thread(target=self.write_loop, name=self.name, daemon=True)
+                self.writer.start()
+            self.condition.notify()
+
+    def write_loop(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closing:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                data, self.pending = self.pending, None
+            self.write(data)
+
+    def write(self, data):
+        try:
+            if not data:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return
+            tmp = self.path + ".tmp"
+            with open(tmp, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except OSError as e:
+            log.warning("Couldn't write %s: %s", self.path, e)
+
+    def close(self):
+        # Flush anything still pending and stop the writer
+        with self.condition:
+            self.closing = True
+            self.condition.notify()
+        if self.writer is not None:
+            self.writer.join()
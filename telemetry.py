@@ -0,0 +1,237 @@
+import argparse
+import json
+import logging
+import os
+import struct
+import threading
+
+import numpy as np
+
+from quality import TIERS
+from simulation import (ASTEROID_DESTROYED, BOSS_DEFEATED, BOSS_PHASE, BOSS_SPAWNED, FPS, GUNS, LIFE_LOST, POWER_UP,
+                        POWER_UP_TYPES, RUN_END, RUN_START, UNLOCK, UNLOCKS)
+
+# Gameplay telemetry: fixed-layout records (tick, code, arg, two float values) packed into a
+# preallocated ring buffer on the game thread, flushed in batches by a background thread to a
+# size-capped file that rotates like a log (telemetry.bin, .1, .2, ...). Run as a script, it
+# aggregates those files offline. Codes below 32 come from the simulation; the rest from here.
+log = logging.getLogger(__name__)
+MAGIC = b'SDTM'
+VERSION = 1
+FILE_HEADER = struct.Struct('<4sBH')  # magic, version, record size
+RECORD = struct.Struct('<IBBff')
+RECORD_DTYPE = np.dtype([('tick', '<u4'), ('code', 'u1'), ('arg', 'u1'), ('a', '<f4'), ('b', '<f4')])
+FRAME = 32         # quality tier; work ms, frame ms
+QUALITY_TIER = 33  # new tier
+DROPPED = 34       # -; records overwritten before they could be written
+LIVES_LOST_TO = ['asteroid', 'boss']
+SHOOTERS = GUNS + ['boss']  # By projectile kind
+
+
+class Telemetry:
+    # log() is the hot path: one pack_into into the ring and a counter bump, with no allocation.
+    # The writer wakes every `batch` records or `interval` seconds, whichever comes first. If
+    # the ring laps the writer, the oldest records are lost and a DROPPED record says how many.
+    def __init__(self, path="telemetry.bin", capacity=4096, batch=512, interval=2.0,
+                 max_bytes=256 * 1024, backups=3):
+        self.path = path
+        self.capacity = capacity
+        self.batch = batch
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.ring = bytearray(capacity * RECORD.size)
+        self.written = 0  # Records logged so far; only the game thread changes it
+        self.flushed = 0  # Records handed to the file so far; only the writer changes it
+        self.wake_at = batch
+        self.failing = False  # So a file that can't be written is reported once, not every flush
+        self.file = None
+        self.closing = False
+        self.condition = threading.Condition()
+        self.writer = threading.Thread(target=self.write_loop, name="telemetry-writer", daemon=True)
+        self.writer.start()
+
+    def log(self, tick, code, arg=0, a=0.0, b=0.0):
+        n = self.written
+        RECORD.pack_into(self.ring, n % self.capacity * RECORD.size, tick, code, arg, a, b)
+        self.written = n + 1
+        if n + 1 >= self.wake_at:
+            self.wake_at = n + 1 + self.batch
+            with self.condition:
+                self.condition.notify()
+
+    def take(self):
+        # Bytes of the records logged since the last take, oldest first
+        end = self.written
+        start = max(self.flushed, end - self.capacity)
+        lost = start - self.flushed
+        size = RECORD.size
+        first, last = start % self.capacity * size, end % self.capacity * size
+        if end - start == self.capacity or (end > start and last <= first):
+            chunk = self.ring[first:] + self.ring[:last]
+        else:
+            chunk = self.ring[first:last]
+        # Records the game thread lapped while they were being copied are garbled: skip them.
+        # log() packs a record before counting it, so the slot of record `written` may be
+        # half-overwritten already.
+        lapped = min(end - start, max(0, self.written + 1 - self.capacity - start))
+        if lapped:
+            chunk = chunk[lapped * size:]
+            lost += lapped
+        self.flushed = end
+        if lost:
+            chunk += RECORD.pack(0, DROPPED, 0, lost, 0)
+        return chunk
+
+    def write_loop(self):
+        while True:
+            with self.condition:
+                if not self.closing:
+                    self.condition.wait(self.interval)
+                closing = self.closing
+            if self.written != self.flushed:
+                self.write(self.take())
+            if closing:
+                if self.file is not None:
+                    self.file.close()
+                return
+
+    def write(self, data):
+        try:
+            if self.file is None:
+                self.file = open(self.path, 'ab')
+            if self.file.tell() and self.file.tell() + len(data) > self.max_bytes:
+                self.rotate()
+            if not self.file.tell():
+                self.file.write(FILE_HEADER.pack(MAGIC, VERSION, RECORD.size))
+            self.file.write(data)
+            self.file.flush()
+            self.failing = False
+        except OSError as e:
+            if not self.failing:
+                log.warning("Couldn't write telemetry to %s: %s", self.path, e)
+            self.failing = True
+            self.file = None
+
+    def rotate(self):
+        self.file.close()
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        self.file = open(self.path, 'wb')
+
+    def close(self):
+        # Write out everything logged so far and stop the writer
+        with self.condition:
+            self.closing = True
+            self.condition.notify()
+        self.writer.join()
+
+
+def rotated_files(path):
+    # path and its backups, oldest first
+    backups = []
+    i = 1
+    while os.path.exists(f"{path}.{i}"):
+        backups.append(f"{path}.{i}")
+        i += 1
+    return backups[::-1] + ([path] if os.path.exists(path) else [])
+
+
+def read_records(paths):
+    parts = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < FILE_HEADER.size:
+            continue
+        magic, version, size = FILE_HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION or size != RECORD_DTYPE.itemsize:
+            raise ValueError(f"{path} is not a telemetry file (or an unsupported version)")
+        # A record cut short by a crash or full disk is dropped
+        count = (len(data) - FILE_HEADER.size) // size
+        parts.append(np.frombuffer(data, RECORD_DTYPE, count, FILE_HEADER.size))
+    return np.concatenate(parts) if parts else np.zeros(0, RECORD_DTYPE)
+
+
+def tally(records, code, names):
+    args = records['arg'][records['code'] == code]
+    counts = np.bincount(args, minlength=len(names))
+    return {name: int(count) for name, count in zip(names, counts)}
+
+
+def aggregate(records):
+    code = records['code']
+    ends = records[code == RUN_END]
+    frames = records[code == FRAME]
+    survival = ends['tick'] / FPS
+    phases = records['arg'][code == BOSS_PHASE]
+    summary = {
+        'records': len(records),
+        'dropped': int(records['a'][code == DROPPED].sum()),
+        'runs': {'started': int(np.count_nonzero(code == RUN_START)), 'finished': len(ends)},
+        'destroyed_by': tally(records, ASTEROID_DESTROYED, SHOOTERS),
+        'power_ups': tally(records, POWER_UP, POWER_UP_TYPES),
+        'lives_lost_to': tally(records, LIFE_LOST, LIVES_LOST_TO),
+        'boss': {'spawned': int(np.count_nonzero(code == BOSS_SPAWNED)),
+                 'reached_phase_2': int(np.count_nonzero(phases == 2)),
+                 'reached_phase_3': int(np.count_nonzero(phases == 3)),
+                 'defeated': int(np.count_nonzero(code == BOSS_DEFEATED))},
+        'unlocks': tally(records, UNLOCK, UNLOCKS),
+        'quality_changes': int(np.count_nonzero(code == QUALITY_TIER)),
+    }
+    if len(ends):
+        summary['survival_s'] = {'mean': float(survival.mean()), 'p10': float(np.percentile(survival, 10)),
+                                 'p50': float(np.percentile(survival, 50)), 'p90': float(np.percentile(survival, 90))}
+        summary['score'] = {'mean': float(ends['a'].mean()), 'max': float(ends['a'].max())}
+    if len(frames):
+        work, frame = frames['a'], frames['b']
+        summary['frame_ms'] = {'samples': len(frames), 'p50': float(np.percentile(frame, 50)),
+                               'p95': float(np.percentile(frame, 95)), 'p99': float(np.percentile(frame, 99)),
+                               'work_p95': float(np.percentile(work, 95))}
+        summary['quality_share'] = {name: count / len(frames) for name, count in
+                                    tally(frames, FRAME, [tier['name'] for tier in TIERS]).items()}
+    return summary
+
+
+def print_report(summary):
+    runs = summary['runs']
+    print(f"{summary['records']} records ({summary['dropped']} dropped), "
+          f"{runs['started']} runs started, {runs['finished']} finished")
+    if 'survival_s' in summary:
+        survival, score = summary['survival_s'], summary['score']
+        print(f"  survival   mean {survival['mean']:.1f}s  p10 {survival['p10']:.1f}s  "
+              f"p50 {survival['p50']:.1f}s  p90 {survival['p90']:.1f}s")
+        print(f"  score      mean {score['mean']:.0f}  max {score['max']:.0f}")
+    for key, label in (('destroyed_by', 'destroyed'), ('power_ups', 'power-ups'), ('lives_lost_to', 'lives lost'),
+                       ('unlocks', 'unlocks')):
+        print(f"  {label:<10} " + "  ".join(f"{name} {count}" for name, count in summary[key].items()))
+    boss = summary['boss']
+    print(f"  boss       spawned {boss['spawned']}  phase 2 {boss['reached_phase_2']}  "
+          f"phase 3 {boss['reached_phase_3']}  defeated {boss['defeated']}")
+    if 'frame_ms' in summary:
+        frame = summary['frame_ms']
+        print(f"  frame      p50 {frame['p50']:.1f}ms  p95 {frame['p95']:.1f}ms  p99 {frame['p99']:.1f}ms  "
+              f"({frame['samples']} samples, work p95 {frame['work_p95']:.1f}ms)")
+        print("  quality    " + "  ".join(f"{name} {share:.0%}" for name, share in summary['quality_share'].items())
+              + f"  ({summary['quality_changes']} changes)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarise telemetry files written by the game")
+    parser.add_argument('paths', nargs='*', help="telemetry files; default telemetry.bin and its rotated backups")
+    parser.add_argument('--json', metavar='PATH', help="also write the summary")
+    args = parser.parse_args()
+    paths = args.paths or rotated_files("telemetry.bin")
+    if not paths:
+        parser.error("no telemetry files found")
+    try:
+        summary = aggregate(read_records(paths))
+    except ValueError as e:
+        parser.error(str(e))
+    print_report(summary)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
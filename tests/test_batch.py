@@ -0,0 +1,54 @@
+import pytest
+
+from batch import SIM_SETTINGS, apply_overrides, parse_overrides, settings
+from simulation import PLASMA, SpaceDodgerSim
+
+
+def test_parse_overrides():
+    assert parse_overrides(['asteroid_spawn_rate=40', 'upgrades.projectile_speed=1.4']) == {
+        'asteroid_spawn_rate': 40, 'upgrades.projectile_speed': 1.4}
+    assert parse_overrides(None) == {}
+
+
+def test_overrides_reach_boss_and_guns():
+    sim = SpaceDodgerSim(1080, 2400, seed=1)
+    apply_overrides(sim, {'boss_settings.health': 20, 'boss_settings.phase_2_health': 15,
+                          'gun_settings.plasma.damage': 3, 'gun_settings.plasma.cooldown': 5,
+                          'upgrades.projectile_speed': 2.0, 'asteroid_spawn_rate': 40})
+    assert sim.asteroid_spawn_rate == 40
+
+    sim.spawn_boss()
+    assert sim.boss['health'] == 20
+    sim.hit_boss(5)
+    assert sim.boss['phase'] == 2
+
+    sim.current_gun = 'plasma'
+    sim.spawn_projectile()
+    p = sim.projectiles
+    assert p.count == 1 and p.kind[0] == PLASMA
+    assert p.damage[0] == 3 and p.speed[0] == 16
+    assert sim.shoot_ready == sim.frame_count + 5
+
+
+def test_settings_are_per_sim():
+    tuned = SpaceDodgerSim(1080, 2400)
+    apply_overrides(tuned, {'gun_settings.laser.damage': 9})
+    assert SpaceDodgerSim(1080, 2400).gun_settings['laser']['damage'] == 1
+
+
+@pytest.mark.parametrize('name', SIM_SETTINGS)
+def test_sim_settings_outlast_the_first_tick(name):
+    default, tuned = SpaceDodgerSim(1080, 2400, seed=1), SpaceDodgerSim(1080, 2400, seed=1)
+    apply_overrides(tuned, {name: getattr(default, name) + 7})
+    default.step()
+    tuned.step()
+    assert getattr(tuned, name) != getattr(default, name)
+
+
+@pytest.mark.parametrize('name', ['boss_settings.armour', 'gun_settings.laser', 'gun_settings.rail.damage',
+                                  'upgrades.luck', 'player_pos', 'seed', 'frame_count', 'score', 'nope'])
+def test_unknown_settings_are_rejected(name):
+    sim = SpaceDodgerSim(1080, 2400)
+    with pytest.raises(ValueError, match="valid settings are: .*boss_settings.health"):
+        apply_overrides(sim, {name: 1})
+    assert name not in settings(sim)
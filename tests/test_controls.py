@@ -0,0 +1,63 @@
+import pygame
+import pytest
+
+from controls import MOUSE, Controls
+from simulation import SpaceDodgerSim
+
+W, H = 1080, 2400
+
+
+@pytest.fixture
+def controls():
+    pygame.display.init()
+    pygame.event.clear()
+    yield Controls(W, H, upgrade_count=3)
+    pygame.display.quit()
+
+
+def finger(kind, finger_id, x, y):
+    pygame.event.post(pygame.event.Event(kind, finger_id=finger_id, touch_id=0, x=x / W, y=y / H, dx=0, dy=0))
+
+
+def test_motion_is_coalesced_to_the_steering_finger(controls):
+    sim = SpaceDodgerSim(W, H, seed=1)
+    px, py = sim.player_pos
+    finger(pygame.FINGERDOWN, 7, px, py)         # On the ship: steers
+    finger(pygame.FINGERDOWN, 8, px, py - 600)   # Ahead of it: fires
+    assert controls.poll('playing', sim) == [('fire',)]
+    assert controls.drag_finger == 7
+
+    for step in range(1, 6):
+        finger(pygame.FINGERMOTION, 7, px + 10 * step, py - 5 * step)
+        finger(pygame.FINGERMOTION, 8, 100, 100)  # The firing finger moving doesn't steer
+    assert controls.poll('playing', sim) == [('drag', int(px + 50), int(py - 25))]
+
+    finger(pygame.FINGERUP, 8, 100, 100)
+    finger(pygame.FINGERMOTION, 7, px + 60, py)
+    assert controls.poll('playing', sim) == [('drag', int(px + 60), int(py))]
+
+    finger(pygame.FINGERUP, 7, px + 60, py)
+    finger(pygame.FINGERMOTION, 7, px + 70, py)
+    assert controls.poll('playing', sim) == []
+    assert controls.drag_finger is None
+
+
+def test_emulated_mouse_events_from_touch_are_ignored(controls):
+    sim = SpaceDodgerSim(W, H, seed=1)
+    px, py = sim.player_pos
+    pos = (int(px), int(py))
+    pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1, touch=True))
+    assert controls.poll('playing', sim) == [] and controls.drag_finger is None
+    pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1, touch=False))
+    for x in (10, 20, 30):
+        pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=(pos[0] + x, pos[1]), rel=(10, 0), buttons=(1, 0, 0),
+                                             touch=False))
+    assert controls.poll('playing', sim) == [('drag', pos[0] + 30, pos[1])]
+    assert controls.drag_finger == MOUSE
+
+
+def test_taps_resolve_through_regions(controls):
+    sim = SpaceDodgerSim(W, H, seed=1)
+    finger(pygame.FINGERDOWN, 1, W / 2, H * 0.05)
+    finger(pygame.FINGERDOWN, 2, W * 0.9, H * 0.05)
+    assert controls.poll('playing', sim) == [('emp',), ('pause',)]
@@ -0,0 +1,51 @@
+import numpy as np
+
+from entities import EntityStore
+
+
+def test_add_and_remove_keep_order():
+    store = EntityStore(capacity=4)
+    for i in range(6):
+        store.add(i, 10 * i, size=i)
+    assert store.count == 6 and store.capacity == 8
+    store.remove_at([1, 4])
+    assert store.pos[:store.count, 0].tolist() == [0, 2, 3, 5]
+    assert store.size[:store.count].tolist() == [0, 2, 3, 5]
+
+
+def test_handles_follow_rows_through_compaction():
+    store = EntityStore()
+    handles = [int(store.handle[store.add(i, 0)]) for i in range(5)]
+    store.remove_at([0, 2])
+    rows = store.resolve(handles)
+    assert rows.tolist() == [-1, 0, -1, 1, 2]
+    assert store.pos[rows[rows >= 0], 0].tolist() == [1, 3, 4]
+
+
+def test_reused_slot_does_not_revive_stale_handle():
+    store = EntityStore()
+    old = int(store.handle[store.add(1, 1)])
+    store.clear()
+    new = int(store.handle[store.add(2, 2)])
+    assert new & 0xFFFFFFFF == old & 0xFFFFFFFF  # Same slot, next generation
+    assert store.resolve([old, new, -1]).tolist() == [-1, 0, -1]
+
+
+def test_extend_fills_defaults_and_handles():
+    store = EntityStore(capacity=2)
+    store.add(9, 9)
+    start = store.extend(3, pos=np.array([[1, 2], [3, 4], [5, 6]]), size=7)
+    assert start == 1 and store.count == 4
+    assert store.prev[1:4].tolist() == store.pos[1:4].tolist()
+    assert store.target[1:4].tolist() == [-1, -1, -1]
+    assert (store.size[1:4] == 7).all()
+    assert store.resolve(store.handle[:4]).tolist() == [0, 1, 2, 3]
+
+
+def test_move_and_below():
+    store = EntityStore()
+    store.add(0, 0, vx=1, vy=2, size=5)
+    store.add(0, 100, vy=2, size=5)
+    store.move(np.array([1.0, 0.5]))
+    assert store.pos[:2].tolist() == [[1, 2], [0, 101]]
+    assert store.below(95).tolist() == [False, True]
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from entities import DISABLED
+from forces import ASTEROID, PLAYER, ForceField
+from spatial import SpatialGrid
+
+
+def bounded_field(rng):
+    field = ForceField()
+    for x, y in rng.uniform(0, 1000, (5, 2)):
+        field.add(x, y, radius=100, push=(0, 5), bodies=(ASTEROID,))
+    field.add(*rng.uniform(0, 1000, 2), radius=200, flags=DISABLED, bodies=(ASTEROID,))
+    field.add(*rng.uniform(0, 1000, 2), radius=150, pull=2)
+    field.add(500, 500, pull=(3, 3, 2))  # Unbounded
+    return field
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_grid_sampling_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(-50, 1050, (400, 2))
+    # Some points exactly on cell edges and on a source's rim
+    points[:20] = np.round(points[:20] / 64) * 64
+    field = bounded_field(rng)
+    points[20] = field.pos[0] + (100, 0)
+    grid = SpatialGrid(64)
+    grid.build(points, len(points))
+    moved, flags = field.sample(points, ASTEROID, grid)
+    exact_moved, exact_flags = field.sample(points, ASTEROID)
+    assert np.allclose(moved, exact_moved)
+    assert flags.tolist() == exact_flags.tolist()
+    assert flags.any() and moved.any()
+
+
+def test_bounded_only_counts_sources_for_that_body():
+    field = ForceField()
+    assert not field.bounded(ASTEROID)
+    field.add(0, 0, pull=3)
+    field.add(0, 0, radius=100, push=(0, 5), bodies=(ASTEROID,))
+    assert field.bounded(ASTEROID) and not field.bounded(PLAYER)
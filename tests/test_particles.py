@@ -0,0 +1,39 @@
+import numpy as np
+
+from particles import ParticlePool
+
+
+def state(pool):
+    # Live particles as a set of (pos, vel, size, color) rows
+    n = pool.count
+    return {(tuple(p), tuple(v), s, tuple(c)) for p, v, s, c in
+            zip(pool.pos[:n].tolist(), pool.vel[:n].tolist(), pool.size[:n].tolist(), pool.color[:n].tolist())}
+
+
+def test_expired_particles_are_swap_removed():
+    pool = ParticlePool(16, decay=1.0)
+    sizes = [5, 1, 5, 1, 5, 5, 1, 5, 1, 5]  # The size 1 particles expire on the next update
+    for i, size in enumerate(sizes):
+        pool.emit_trail(10 * i, i, 1, -i, size, (i, 2 * i, 3 * i))
+    expected = {((10 * i + 1, 0), (1, -i), size - 1, (i, 2 * i, 3 * i)) for i, size in enumerate(sizes) if size > 1}
+    pool.update()
+    assert pool.count == 6
+    assert state(pool) == expected
+
+
+def test_everything_expires():
+    pool = ParticlePool(8, decay=1.0)
+    for i in range(5):
+        pool.emit_trail(i, i, 0, 0, 1, (0, 0, 0))
+    pool.update()
+    assert pool.count == 0 and pool.cursor == 0
+
+
+def test_full_pool_overwrites_round_robin():
+    pool = ParticlePool(4, rng=np.random.default_rng(0))
+    pool.emit(0, 0, 4, 3, 1, (1, 1, 1))
+    pool.emit(50, 50, 2, 7, 1, np.array([2, 2, 2], np.uint8))
+    assert pool.count == 4
+    assert pool.size.tolist() == [7, 7, 3, 3]
+    pool.emit(60, 60, 3, 9, 1, (3, 3, 3))
+    assert pool.size.tolist() == [9, 7, 9, 9]
@@ -0,0 +1,58 @@
+import numpy as np
+
+from quality import TIERS, QualityGovernor
+
+BUDGET = 16.7
+
+
+def run(governor, cost, frames, seed=0):
+    # cost(tier) is a frame's mean work in ms; each frame gets +-25% jitter. Returns the tier per frame.
+    rng = np.random.default_rng(seed)
+    tiers = []
+    for _ in range(frames):
+        governor.update(cost(governor.tier) * rng.uniform(0.75, 1.25))
+        tiers.append(governor.tier)
+    return tiers
+
+
+def test_borderline_device_settles_on_one_tier():
+    # High misses the budget; medium fits but not by enough to try high again
+    costs = [20, 13, 8, 5]
+    governor = QualityGovernor(BUDGET)
+    tiers = run(governor, costs.__getitem__, 6000)
+    assert governor.changes == 1
+    assert set(tiers[200:]) == {1}
+
+
+def test_steps_down_until_the_budget_fits():
+    costs = [40, 30, 20, 12]
+    governor = QualityGovernor(BUDGET)
+    tiers = run(governor, costs.__getitem__, 3000)
+    assert tiers[-1] == len(TIERS) - 1 and governor.changes == 3
+    # At most one step per settle period
+    assert tiers.index(1) >= 119 and tiers.index(2) - tiers.index(1) >= 120
+
+
+def test_steps_back_up_only_after_a_long_quiet_stretch():
+    governor = QualityGovernor(BUDGET)
+    before = run(governor, [30, 12, 8, 5].__getitem__, 300)
+    changed = before.index(1)
+    assert set(before[changed:]) == {1}
+    # The load drops: high is tried again only `recover` frames after the last change
+    after = run(governor, lambda tier: 5, 1000)
+    first_up = len(before) + after.index(0)
+    assert first_up - changed >= governor.recover
+    assert set(after[after.index(0):]) == {0}
+
+
+def test_a_spike_does_not_change_tier():
+    governor = QualityGovernor(BUDGET)
+    for frame in range(1000):
+        governor.update(50 if 300 <= frame < 303 else 8)
+    assert governor.changes == 0
+
+
+def test_fixed_quality_never_changes():
+    governor = QualityGovernor(BUDGET, tier=2, adaptive=False)
+    run(governor, lambda tier: 100, 1000)
+    assert governor.tier == 2 and governor.changes == 0
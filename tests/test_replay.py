@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from replay import DIGEST, DRAG, HEADER, MAGIC, RECORD, InputRecorder, read_recording, replay
+from simulation import SpaceDodgerSim
+
+
+def record(seed, upgrades=None, ticks=2000):
+    sim = SpaceDodgerSim(1080, 2400, seed=seed)
+    sim.upgrades.update(upgrades or {})
+    sim.recorder = InputRecorder()
+    rng = random.Random(seed)
+    while not sim.game_over and sim.frame_count < ticks:
+        inputs = [('drag', rng.randint(0, 1080), rng.randint(1200, 2400))]
+        if rng.random() < 0.3:
+            inputs.append((rng.choice(['fire', 'fire', 'switch_gun', 'dash', 'emp', 'overcharge']),))
+        sim.step(inputs)
+    return sim, sim.recorder.close(sim)
+
+
+@pytest.mark.parametrize('upgrades', [
+    {},
+    {'projectile_speed': 1.2, 'skill_cooldown': 0.9},
+    {'projectile_speed': 1.4, 'shield_duration': 7},
+])
+def test_replay_stays_in_sync(upgrades):
+    sim, data = record(3, upgrades)
+    replayed, desync = replay(data)
+    assert desync is None
+    assert replayed.upgrades == sim.upgrades
+    assert (replayed.frame_count, replayed.score, replayed.lives) == (sim.frame_count, sim.score, sim.lives)
+    assert replayed.state_digest() == sim.state_digest()
+
+
+def test_header_round_trips():
+    sim, data = record(7, {'projectile_speed': 1.2}, ticks=10)
+    header, records = read_recording(data)
+    assert header == {'seed': 7, 'width': 1080, 'height': 2400, 'endless_mode': False,
+                      'upgrades': sim.upgrades}
+    assert records[-1][0] == sim.frame_count
+
+
+def test_changed_input_is_reported_as_desync():
+    _, data = record(5)
+    data = bytearray(data)
+    # Move the first drag somewhere else; the first checkpoint after it must disagree. The
+    # recording opens with the tick 0 checkpoint, then the drag's record and its position.
+    first_drag = HEADER.size + RECORD.size + DIGEST.size + RECORD.size
+    data[first_drag:first_drag + DRAG.size] = DRAG.pack(0, 1200)
+    _, desync = replay(bytes(data))
+    assert desync is not None
+
+
+def test_rejects_other_formats():
+    with pytest.raises(ValueError):
+        read_recording(b'nope')
+    with pytest.raises(ValueError):
+        read_recording(MAGIC + bytes([1]) + bytes(HEADER.size))
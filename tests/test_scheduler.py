@@ -0,0 +1,43 @@
+from scheduler import Scheduler
+
+
+def test_due_fires_in_tick_then_scheduling_order():
+    s = Scheduler()
+    s.schedule(5, 'b')
+    s.schedule(3, 'a', 1)
+    s.schedule(5, 'c')
+    s.schedule(9, 'd')
+    assert list(s.due(2)) == []
+    assert list(s.due(5)) == [('a', (1,)), ('b', ()), ('c', ())]
+    assert len(s) == 1
+    assert list(s.due(100)) == [('d', ())]
+
+
+def test_cancelled_entries_are_skipped():
+    s = Scheduler()
+    keep = s.schedule(1, 'keep')
+    drop = s.schedule(1, 'drop')
+    s.cancel(drop)
+    s.cancel(None)
+    assert list(s.due(1)) == [('keep', ())]
+    s.cancel(keep)  # Already fired: harmless
+    assert len(s) == 0
+
+
+def test_rescheduling_after_cancel():
+    # How an effect timer is restarted: the old expiry is cancelled and a later one queued
+    s = Scheduler()
+    first = s.schedule(10, 'expire', 'shield')
+    s.cancel(first)
+    s.schedule(20, 'expire', 'shield')
+    assert list(s.due(15)) == []
+    assert list(s.due(20)) == [('expire', ('shield',))]
+
+
+def test_clear_resets_sequence():
+    s = Scheduler()
+    s.schedule(1, 'a')
+    s.schedule(2, 'b')
+    s.clear()
+    assert len(s) == 0 and s.seq == 0
+    assert s.schedule(1, 'c') == [1, 0, 'c', ()]
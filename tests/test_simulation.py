@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+import simulation
+from entities import DISABLED
+from simulation import SpaceDodgerSim
+
+
+def test_emp_disarms_an_overlapping_asteroid_on_the_same_tick():
+    sim = SpaceDodgerSim(1080, 2400, seed=1)
+    px, py = sim.player_pos
+    sim.asteroids.add(px, py - 10, vy=3, size=100, speed=3)
+    sim.asteroids.add(px, py - 500, vy=3, size=100, speed=3)  # Out of range
+    sim.step([('emp',)])
+    assert sim.lives == 3
+    a = sim.asteroids
+    assert a.count == 2
+    assert (a.flags[:2] & DISABLED).tolist() == [DISABLED, 0]
+    assert a.pos[0, 1] == py - 10  # Disarmed asteroids don't move
+
+
+def test_asteroid_hits_without_emp():
+    sim = SpaceDodgerSim(1080, 2400, seed=1)
+    px, py = sim.player_pos
+    sim.asteroids.add(px, py - 10, vy=3, size=100, speed=3)
+    sim.step([])
+    assert sim.lives == 2
+
+
+def crowded_run(seed):
+    # Every gun in turn, including gravity bursts, plus EMP pulses, so both pair checks see hits
+    sim = SpaceDodgerSim(1080, 2400, seed=seed)
+    sim.asteroid_spawn_rate = sim.black_hole_spawn_rate = 20
+    sim.invincibility = True
+    rng = random.Random(seed)
+    trace = []
+    for tick in range(600):
+        inputs = [('drag', rng.randint(0, 1080), rng.randint(1200, 2400)), ('fire',)]
+        if tick % 50 == 0:
+            inputs.append(('switch_gun',))
+        if tick % 200 == 0:
+            inputs.append(('emp',))
+        sim.shoot_ready = 0
+        sim.step(inputs)
+        trace.append((sim.state_digest(), sim.score))
+    return trace
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_brute_force_and_grid_paths_agree(monkeypatch, seed):
+    monkeypatch.setattr(simulation, 'BRUTE_FORCE_PAIRS', 10 ** 9)
+    brute = crowded_run(seed)
+    monkeypatch.setattr(simulation, 'BRUTE_FORCE_PAIRS', 0)
+    assert crowded_run(seed) == brute
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from simulation import SpaceDodgerSim
+from snapshot import HEADER, load_state, save_state
+
+
+def play(sim, rng, ticks):
+    for _ in range(ticks):
+        if sim.game_over:
+            return
+        inputs = [('drag', rng.randint(0, 1080), rng.randint(1200, 2400))]
+        if rng.random() < 0.3:
+            inputs.append((rng.choice(['fire', 'fire', 'switch_gun', 'dash', 'emp', 'overcharge']),))
+        sim.step(inputs)
+
+
+@pytest.fixture(scope='module')
+def saved():
+    sim = SpaceDodgerSim(1080, 2400, seed=5)
+    sim.upgrades['projectile_speed'] = 1.2
+    play(sim, random.Random(1), 900)
+    return sim, save_state(sim, b'look')
+
+
+def test_restored_run_continues_identically(saved):
+    sim, data = saved
+    restored = SpaceDodgerSim(1080, 2400, seed=99)
+    assert load_state(restored, data) == b'look'
+    assert restored.state_digest() == sim.state_digest()
+    play(sim, random.Random(2), 600)
+    play(restored, random.Random(2), 600)
+    assert (restored.frame_count, restored.score, restored.lives) == (sim.frame_count, sim.score, sim.lives)
+    assert restored.state_digest() == sim.state_digest()
+
+
+def test_round_trip_is_byte_identical():
+    sim = SpaceDodgerSim(1080, 2400, seed=8)
+    play(sim, random.Random(3), 400)
+    sim.spawn_boss()
+    data = save_state(sim, b'extra')
+    restored = SpaceDodgerSim(1080, 2400)
+    load_state(restored, data)
+    assert save_state(restored, b'extra') == data
+
+
+def test_corrupt_snapshot_is_rejected(saved):
+    data = bytearray(saved[1])
+    data[HEADER.size + 40] ^= 0xFF
+    with pytest.raises(ValueError, match="corrupt"):
+        load_state(SpaceDodgerSim(1080, 2400), bytes(data))
+
+
+@pytest.mark.parametrize('cut', [0, HEADER.size - 1, HEADER.size + 100])
+def test_truncated_snapshot_is_rejected(saved, cut):
+    with pytest.raises(ValueError):
+        load_state(SpaceDodgerSim(1080, 2400), saved[1][:cut])
+
+
+def test_foreign_data_is_rejected():
+    with pytest.raises(ValueError, match="not a Space Dodger snapshot"):
+        load_state(SpaceDodgerSim(1080, 2400), b'PK\x03\x04' + bytes(100))
+
+
+def test_snapshot_for_another_screen_is_rejected(saved):
+    with pytest.raises(ValueError, match="1080x2400"):
+        load_state(SpaceDodgerSim(720, 1600), saved[1])
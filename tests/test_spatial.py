@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from spatial import SpatialGrid
+
+CELL = 64
+
+
+def layout(seed, n):
+    # Random entries, a quarter of them snapped onto cell corners and edges, some off-screen
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(-200, 1200, (n, 2))
+    snapped = rng.random(n) < 0.25
+    pos[snapped] = np.round(pos[snapped] / CELL) * CELL
+    size = rng.uniform(1, CELL, n)
+    return rng, pos, size
+
+
+def brute_nearest(pos, x, y):
+    d2 = ((pos - (x, y)) ** 2).sum(1)
+    return d2, int(np.argmin(d2))
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_nearest_matches_brute_force(seed):
+    rng, pos, _ = layout(seed, int(np.random.default_rng(seed).integers(1, 200)))
+    grid = SpatialGrid(CELL)
+    grid.build(pos, len(pos))
+    queries = np.concatenate([rng.uniform(-600, 1600, (40, 2)),       # Many land in empty cells
+                              np.round(rng.uniform(-200, 1200, (10, 2)) / CELL) * CELL,
+                              pos[:5]])
+    for x, y in queries.tolist():
+        d2, best = brute_nearest(pos, x, y)
+        found = grid.nearest(x, y)
+        # Ties may pick either entry; the distance must be the minimum
+        assert d2[found] == d2[best]
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_overlaps_match_brute_force(seed):
+    rng, pos, size = layout(seed, 300)
+    grid = SpatialGrid(CELL)
+    grid.build(pos, len(pos))
+    points = np.concatenate([rng.uniform(-300, 1300, (200, 2)),
+                             np.round(rng.uniform(-200, 1200, (50, 2)) / CELL) * CELL,
+                             pos[:20] + np.column_stack((size[:20] * 0.999, np.zeros(20)))])  # Just inside an edge
+    q, e = grid.overlaps(points, size)
+    d2 = ((points[:, None] - pos[None]) ** 2).sum(-1)
+    bq, be = np.nonzero(d2 < size[None] ** 2)  # Row-major: sorted by point, then entry
+    assert q.tolist() == bq.tolist() and e.tolist() == be.tolist()
+    assert len(q)
+
+
+def test_candidates_cover_every_entry_in_the_circle():
+    rng, pos, _ = layout(3, 300)
+    grid = SpatialGrid(CELL)
+    grid.build(pos, len(pos))
+    for (x, y), r in zip(rng.uniform(-200, 1200, (30, 2)).tolist(), rng.uniform(1, 300, 30).tolist()):
+        inside = np.flatnonzero(((pos - (x, y)) ** 2).sum(1) < r * r)
+        assert set(inside.tolist()) <= set(grid.candidates(x, y, r).tolist())
+
+
+def test_only_live_rows_are_indexed():
+    pos = np.array([[0.0, 0.0], [500.0, 500.0], [10.0, 10.0]])
+    grid = SpatialGrid(CELL)
+    grid.build(pos, 2)
+    assert grid.nearest(12, 12) == 0
+    q, e = grid.overlaps(np.array([[10.0, 10.0]]), np.full(3, 20.0))
+    assert e.tolist() == [0]
+
+
+def test_empty_grid():
+    grid = SpatialGrid(CELL)
+    grid.build(np.zeros((4, 2)), 0)
+    assert grid.nearest(5, 5) == -1
+    q, e = grid.overlaps(np.array([[5.0, 5.0]]), np.ones(4))
+    assert len(q) == len(e) == 0
+    assert len(grid.candidates(5, 5, 100)) == 0
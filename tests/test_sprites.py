@@ -0,0 +1,34 @@
+from sprites import SpriteCache
+
+
+def draw_frame(cache, sizes):
+    for size in sizes:
+        cache.get('disc', size, (255, 255, 255))
+    cache.end_frame()
+
+
+def test_capacity_grows_to_the_frame_working_set():
+    cache = SpriteCache(capacity=8)
+    draw_frame(cache, range(1, 21))
+    assert cache.evictions == 12 and cache.capacity == 20
+    misses = cache.misses
+    # The evicted keys are rebuilt once, then every later frame is all hits
+    draw_frame(cache, range(1, 21))
+    draw_frame(cache, range(1, 21))
+    assert cache.misses == misses + 12
+    draw_frame(cache, range(1, 21))
+    assert cache.misses == misses + 12 and cache.evictions == 12
+
+
+def test_working_set_that_fits_is_left_alone():
+    cache = SpriteCache(capacity=8)
+    for _ in range(3):
+        draw_frame(cache, range(1, 9))
+    assert cache.capacity == 8 and cache.evictions == 0 and cache.misses == 8
+
+
+def test_growth_stops_at_limit():
+    cache = SpriteCache(capacity=4, limit=10)
+    for _ in range(3):
+        draw_frame(cache, range(1, 31))
+    assert cache.capacity == 10 and len(cache) == 10
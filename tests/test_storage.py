@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from simulation import SpaceDodgerSim
+from storage import VERSION, AtomicWriter, ProgressStore
+
+
+@pytest.fixture(autouse=True)
+def in_tmp(tmp_path, monkeypatch):
+    # Legacy score files are looked up in the working directory
+    monkeypatch.chdir(tmp_path)
+
+
+def test_progress_round_trips(tmp_path):
+    path = str(tmp_path / "progress.json")
+    store = ProgressStore(path)
+    sim = SpaceDodgerSim(1080, 2400, seed=1)
+    sim.score, sim.credits = 250, 40
+    sim.upgrades['projectile_speed'] = 1.2
+    sim.achievements['destroy_10'] = True
+    store.record_run(sim)
+    store.close()
+
+    loaded = ProgressStore(path)
+    assert loaded.high_score == 250 and loaded.top_scores() == [250]
+    fresh = SpaceDodgerSim(1080, 2400)
+    loaded.apply(fresh)
+    assert fresh.credits == 40 and fresh.upgrades['projectile_speed'] == 1.2
+    assert loaded.achievements['destroy_10']
+
+
+@pytest.mark.parametrize('content', [
+    json.dumps({'version': VERSION + 1, 'credits': 900}),
+    json.dumps([1, 2, 3]),
+    "{not json",
+])
+def test_unusable_file_is_kept(tmp_path, caplog, content):
+    path = tmp_path / "progress.json"
+    path.write_text(content)
+    store = ProgressStore(str(path))
+    assert "progress.json.bak" in caplog.text
+    store.save()
+    store.close()
+    assert (tmp_path / "progress.json.bak").read_text() == content
+    assert json.loads(path.read_text())['version'] == VERSION
+
+
+def test_no_save_when_unusable_file_cannot_be_moved(tmp_path, monkeypatch):
+    path = tmp_path / "progress.json"
+    content = json.dumps({'version': VERSION + 1})
+    path.write_text(content)
+
+    def refuse(*args):
+        raise PermissionError("read-only")
+    monkeypatch.setattr('storage.os.replace', refuse)
+    store = ProgressStore(str(path))
+    store.save()
+    store.close()
+    assert path.read_text() == content
+
+
+def test_write_failure_is_logged(tmp_path, caplog):
+    writer = AtomicWriter(str(tmp_path / "missing" / "data.bin"))
+    writer.save(b'abc')
+    writer.close()
+    assert "Couldn't write" in caplog.text
+
+
+def test_atomic_writer_keeps_newest_and_discards(tmp_path):
+    path = str(tmp_path / "data.bin")
+    writer = AtomicWriter(path)
+    for i in range(50):
+        writer.save(bytes([i]) * 10)
+    writer.close()
+    assert AtomicWriter(path).read() == bytes([49]) * 10
+
+    writer = AtomicWriter(path)
+    writer.save(b'abc')
+    writer.discard()
+    writer.close()
+    assert writer.read() is None
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from simulation import ASTEROID_DESTROYED, RUN_END, RUN_START
+from telemetry import DROPPED, RECORD, RECORD_DTYPE, Telemetry, aggregate, read_records, rotated_files
+
+
+@pytest.fixture
+def telemetry(tmp_path):
+    # The writer only wakes on close(), so the tests decide when records are taken
+    t = Telemetry(str(tmp_path / "telemetry.bin"), capacity=4, batch=1000, interval=60)
+    yield t
+    t.close()
+
+
+def records(chunk):
+    return np.frombuffer(bytes(chunk), RECORD_DTYPE)
+
+
+def test_take_returns_new_records_in_order(telemetry):
+    for tick in range(3):
+        telemetry.log(tick, RUN_START)
+    assert records(telemetry.take())['tick'].tolist() == [0, 1, 2]
+    telemetry.log(3, RUN_START)
+    telemetry.log(4, RUN_START)
+    assert records(telemetry.take())['tick'].tolist() == [3, 4]
+    assert len(telemetry.take()) == 0
+
+
+def test_lapped_records_are_counted_as_dropped(telemetry):
+    for tick in range(10):
+        telemetry.log(tick, RUN_START)
+    taken = records(telemetry.take())
+    # The slot after the newest record is the next one log() will overwrite, so it's skipped too
+    assert taken['tick'][:-1].tolist() == [7, 8, 9]
+    assert taken[-1]['code'] == DROPPED and taken[-1]['a'] == 7
+
+
+def test_record_being_logged_is_not_taken(telemetry):
+    for tick in range(4):
+        telemetry.log(tick, RUN_START)
+    # The game thread has packed record 4 over record 0 but not counted it yet
+    RECORD.pack_into(telemetry.ring, 0, 99, RUN_END, 0, 0, 0)
+    taken = records(telemetry.take())
+    assert taken['tick'][:-1].tolist() == [1, 2, 3]
+    assert taken[-1]['code'] == DROPPED and taken[-1]['a'] == 1
+
+
+def test_records_round_trip_through_file(tmp_path):
+    path = str(tmp_path / "telemetry.bin")
+    t = Telemetry(path, capacity=64, batch=8, interval=60)
+    t.log(0, RUN_START)
+    for tick in range(1, 21):
+        t.log(tick, ASTEROID_DESTROYED, 1, tick, 0)
+    t.log(600, RUN_END, 0, 150, 0)
+    t.close()
+    assert rotated_files(path) == [path]
+    summary = aggregate(read_records([path]))
+    assert summary['records'] == 22 and summary['dropped'] == 0
+    assert summary['runs'] == {'started': 1, 'finished': 1}
+    assert summary['destroyed_by']['plasma'] == 20
+    assert summary['survival_s']['mean'] == 10 and summary['score']['max'] == 150
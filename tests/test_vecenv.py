@@ -0,0 +1,61 @@
+import numpy as np
+
+from vecenv import MOVES, OBS_SIZE, SKILLS, VecDodgerEnv
+
+
+def actions(rng, n):
+    return np.column_stack((rng.integers(0, len(MOVES), n), rng.integers(0, 2, n),
+                            rng.integers(0, len(SKILLS), n) * (rng.random(n) < 0.05)))
+
+
+def rollout(seed, steps=300, n=4):
+    env = VecDodgerEnv(n, seed=seed)
+    rng = np.random.default_rng(seed)
+    observations = [env.reset()]
+    rewards = []
+    for _ in range(steps):
+        obs, reward, _, _ = env.step(actions(rng, n))
+        observations.append(obs)
+        rewards.append(reward)
+    return np.stack(observations), np.stack(rewards)
+
+
+def test_shapes():
+    env = VecDodgerEnv(5, seed=0)
+    obs = env.reset()
+    assert OBS_SIZE == 75
+    assert obs.shape == (5, 75) and obs.dtype == np.float32
+    obs, reward, done, info = env.step(actions(np.random.default_rng(0), 5))
+    assert obs.shape == (5, 75) and reward.shape == (5,) and done.shape == (5,)
+    assert done.dtype == bool and not done.any()
+    assert all(info[key].shape == (5,) for key in ('score', 'lives', 'ticks', 'truncated'))
+
+
+def test_finished_games_restart_in_place():
+    env = VecDodgerEnv(3, seed=0, max_ticks=50)
+    env.reset()
+    idle = np.zeros((3, 3), np.int64)
+    for _ in range(10):
+        env.step(idle)
+    env.lives[1] = 0  # As if the last life had just been lost
+    _, _, done, info = env.step(idle)
+    assert done.tolist() == [False, True, False]
+    assert info['lives'][1] == 0 and not info['truncated'][1]
+    assert env.lives[1] == 3 and env.ticks[1] == 0 and not env.asteroid_alive[1].any()
+    assert env.ticks[0] == env.ticks[2] == 11
+
+    for _ in range(38):
+        _, _, done, info = env.step(idle)
+    assert done.tolist() == [False, False, False]
+    _, _, done, info = env.step(idle)  # Tick 50 for rows 0 and 2
+    assert done.tolist() == [True, False, True]
+    assert info['truncated'].tolist() == [True, False, True] and info['ticks'][0] == 50
+    assert env.ticks.tolist() == [0, 39, 0]
+
+
+def test_same_seed_same_rollout():
+    obs_a, rewards_a = rollout(7)
+    obs_b, rewards_b = rollout(7)
+    assert np.array_equal(obs_a, obs_b) and np.array_equal(rewards_a, rewards_b)
+    obs_c, _ = rollout(8)
+    assert not np.array_equal(obs_a, obs_c)
@@ -0,0 +1,339 @@
+import argparse
+import time
+
+import numpy as np
+
+from simulation import EFFECTS, FPS
+
+# N independent games advanced in lock-step with batched array maths, for training and
+# evaluating automated players. Every entity type lives in fixed-size (N, slots) arrays with
+# an alive mask, so a step is the same handful of NumPy operations whatever N is.
+#
+# The rules follow SpaceDodgerSim: the same spawn schedule, movement, collisions, black-hole
+# pull, power-ups, skills and boss. Three simplifications keep it array-shaped: the laser is the
+# only gun; effects that queue several things in one tick resolve together rather than in
+# sequence (e.g. two shots can share one asteroid, holes pull from pre-tick positions); and the
+# boss fires no phase-3 shots. In SpaceDodgerSim those fly up from inside the boss like the
+# ship's shots, so they mostly wear down its own health: a phase-3 boss lasts longer here.
+
+MOVES = np.array([(0, 0), (-1, 0), (1, 0), (0, -1), (0, 1)], np.float64)  # noop, left, right, up, down
+SKILLS = ['none', 'dash', 'emp', 'overcharge']
+EFFECT_NAMES = list(EFFECTS)
+SHIELD, SPEED, MULTIPLIER, TIME_SLOW, INVINCIBILITY, CLONE, OVERCHARGE = range(len(EFFECT_NAMES))
+POWER_UP_COUNT = 6  # Power-ups are the first six effects; overcharge only comes from the skill
+NEAREST_ASTEROIDS = 8
+NEAREST_POWER_UPS = 2
+NEAREST_HOLES = 2
+# Layout of one observation row
+OBS_SIZE = (2 + 1 + 4 + len(EFFECT_NAMES) + NEAREST_ASTEROIDS * 5 + NEAREST_POWER_UPS * 4 + NEAREST_HOLES * 4 + 5)
+
+
+def live_width(alive):
+    # One past the last slot in use in any row
+    used = np.flatnonzero(alive.any(0))
+    return used[-1] + 1 if used.size else 0
+
+
+class VecDodgerEnv:
+    def __init__(self, num_envs, width=1080, height=2400, seed=None, endless_mode=False, max_ticks=36000,
+                 max_asteroids=64, max_projectiles=32, max_stars=8, max_power_ups=8, max_holes=4,
+                 move_step=100, death_penalty=0):
+        self.num_envs = n = num_envs
+        self.width = width
+        self.height = height
+        self.endless_mode = endless_mode
+        self.max_ticks = max_ticks
+        self.move_step = move_step  # How far ahead of the ship a move action drags it
+        self.death_penalty = death_penalty
+        self.rng = np.random.default_rng(seed)
+        self.player_size = int(height * 0.07)
+        self.upgrades = {'projectile_speed': 1.0, 'shield_duration': 5, 'skill_cooldown': 1.0}
+        durations = [self.upgrades['shield_duration'] if spec[3] is None else spec[3] for spec in EFFECTS.values()]
+        self.effect_ticks = np.array([int(seconds * FPS) + 1 for seconds in durations])
+        self.rows = np.arange(n)
+
+        def slots(count, width=None):
+            return np.zeros((n, count) if width is None else (n, count, width))
+
+        self.player = slots(1, 2)[:, 0]
+        self.asteroid_pos, self.asteroid_speed, self.asteroid_size = slots(max_asteroids, 2), slots(max_asteroids), slots(max_asteroids)
+        self.asteroid_alive = np.zeros((n, max_asteroids), bool)
+        self.asteroid_disabled = np.zeros((n, max_asteroids), bool)
+        self.shot_pos = slots(max_projectiles, 2)
+        self.shot_speed, self.shot_damage = slots(max_projectiles), slots(max_projectiles)
+        self.shot_alive = np.zeros((n, max_projectiles), bool)
+        self.star_pos = slots(max_stars, 2)
+        self.star_alive = np.zeros((n, max_stars), bool)
+        self.power_up_pos = slots(max_power_ups, 2)
+        self.power_up_kind = np.zeros((n, max_power_ups), np.int64)
+        self.power_up_alive = np.zeros((n, max_power_ups), bool)
+        self.hole_pos, self.hole_life = slots(max_holes, 2), slots(max_holes)
+        self.hole_alive = np.zeros((n, max_holes), bool)
+        self.boss_pos = slots(1, 2)[:, 0]
+        self.boss_health, self.boss_phase, self.boss_speed = np.zeros(n), np.zeros(n, np.int64), np.zeros(n)
+        self.boss_active = np.zeros(n, bool)
+        self.effects = np.zeros((n, len(EFFECT_NAMES)), np.int64)  # Ticks left on each effect
+        self.ready = np.zeros((n, 4), np.int64)  # Tick each of shoot, dash, emp, overcharge is usable again
+        self.next_spawn = np.zeros((n, 5), np.int64)  # Next asteroid, star, power-up, black hole, boss tick
+        self.spawn_rate = np.zeros(n, np.int64)
+        self.ticks = np.zeros(n, np.int64)
+        self.lives = np.zeros(n, np.int64)
+        self.score = np.zeros(n, np.int64)
+
+    def reset(self, mask=None):
+        # Start new games in the rows where mask is True (all rows by default)
+        rows = self.rows if mask is None else np.flatnonzero(mask)
+        self.player[rows] = (self.width // 2, self.height * 0.8)
+        for alive in (self.asteroid_alive, self.asteroid_disabled, self.shot_alive, self.star_alive,
+                      self.power_up_alive, self.hole_alive):
+            alive[rows] = False
+        self.boss_active[rows] = False
+        self.effects[rows] = 0
+        self.ready[rows] = 0
+        self.spawn_rate[rows] = 60
+        self.next_spawn[rows] = (60, 120, 300, 600, self.boss_interval())
+        self.ticks[rows] = 0
+        self.lives[rows] = 3
+        self.score[rows] = 0
+        return self.observe()
+
+    def boss_interval(self):
+        return 1800 if self.endless_mode else 3600
+
+    def free_slots(self, alive, due):
+        # (rows, slots) of the first free slot in each row where due; full rows are skipped
+        free = ~alive
+        rows = np.flatnonzero(due & free.any(1))
+        return rows, free[rows].argmax(1)
+
+    def spawn(self, speed_factor):
+        rng, h = self.rng, self.height
+        # Asteroids come faster from tick 1 and every 1800 ticks (900 in endless mode) after
+        tighten = (self.ticks - 1) % (1800 // (2 if self.endless_mode else 1)) == 0
+        self.spawn_rate = np.where(tighten, np.maximum(20, self.spawn_rate - (5 if self.endless_mode else 2)),
+                                   self.spawn_rate)
+        due = self.next_spawn <= self.ticks[:, None]
+
+        rows, cols = self.free_slots(self.asteroid_alive, due[:, 0])
+        size = rng.integers(int(h * 0.03), int(h * 0.08) + 1, rows.size)
+        self.asteroid_pos[rows, cols] = np.column_stack((rng.integers(0, self.width - size + 1), -size))
+        self.asteroid_size[rows, cols] = size
+        self.asteroid_speed[rows, cols] = rng.uniform(2, 4, rows.size)
+        self.asteroid_alive[rows, cols] = True
+        self.asteroid_disabled[rows, cols] = False
+
+        rows, cols = self.free_slots(self.star_alive, due[:, 1])
+        size = int(h * 0.02)
+        self.star_pos[rows, cols] = np.column_stack((rng.integers(0, self.width - size + 1, rows.size),
+                                                     np.full(rows.size, -size)))
+        self.star_alive[rows, cols] = True
+
+        rows, cols = self.free_slots(self.power_up_alive, due[:, 2])
+        size = int(h * 0.03)
+        self.power_up_pos[rows, cols] = np.column_stack((rng.integers(0, self.width - size + 1, rows.size),
+                                                         np.full(rows.size, -size)))
+        self.power_up_kind[rows, cols] = rng.integers(0, POWER_UP_COUNT, rows.size)
+        self.power_up_alive[rows, cols] = True
+
+        rows, cols = self.free_slots(self.hole_alive, due[:, 3])
+        size = rng.integers(30, 51, rows.size)
+        self.hole_pos[rows, cols] = np.column_stack((rng.integers(size, self.width - size + 1), -size))
+        self.hole_life[rows, cols] = 300
+        self.hole_alive[rows, cols] = True
+
+        boss = due[:, 4] & ~self.boss_active
+        self.boss_pos[boss] = (self.width // 2, -100)
+        self.boss_health[boss], self.boss_phase[boss], self.boss_speed[boss] = 10, 1, 1
+        self.boss_active |= boss
+
+        # Reschedule whatever fired, measuring from this tick
+        rates = np.column_stack((self.spawn_rate, np.full(self.num_envs, 120), np.full(self.num_envs, 300),
+                                 np.full(self.num_envs, 600)))
+        nxt = self.ticks[:, None] + np.maximum(1, (rates * speed_factor[:, None]).astype(np.int64))
+        self.next_spawn[:, :4] = np.where(due[:, :4], nxt, self.next_spawn[:, :4])
+        self.next_spawn[:, 4] = np.where(due[:, 4], self.ticks + self.boss_interval(), self.next_spawn[:, 4])
+
+    def fire(self, want, offset_x=0):
+        rows, cols = self.free_slots(self.shot_alive, want & (self.ready[:, 0] <= self.ticks))
+        over = self.effects[rows, OVERCHARGE] > 0
+        self.shot_pos[rows, cols] = self.player[rows] + (offset_x, -self.player_size)
+        self.shot_speed[rows, cols] = 5 * self.upgrades['projectile_speed']
+        self.shot_damage[rows, cols] = np.where(over, 2, 1)
+        self.shot_alive[rows, cols] = True
+        self.ready[rows, 0] = self.ticks[rows] + np.where(over, 10, 20)
+
+    def touching(self, pos, alive, size):
+        d = pos - self.player[:, None]
+        return alive & (np.einsum('nij,nij->ni', d, d) < (self.player_size / 2 + size) ** 2)
+
+    def pull(self, pos, strength):
+        # Summed pull of every live black hole on the points in pos (n, k, 2)
+        kh = live_width(self.hole_alive)
+        d = self.hole_pos[:, :kh, None] - pos[:, None]
+        dist = np.maximum(1, np.sqrt(np.einsum('nhki,nhki->nhk', d, d)))
+        weight = self.hole_alive[:, :kh, None] * (strength / dist)
+        return np.einsum('nhki,nhk->nki', d, weight)
+
+    def step(self, actions):
+        # actions: (N, 3) ints of move (MOVES index), fire (0/1) and skill (SKILLS index)
+        actions = np.asarray(actions)
+        move, fire, skill = actions[:, 0], actions[:, 1].astype(bool), actions[:, 2]
+        score_before, lives_before = self.score.copy(), self.lives.copy()
+        now = self.ticks
+        cooldown = self.upgrades['skill_cooldown']
+
+        # Inputs, applied before the tick like SpaceDodgerSim.apply_input
+        speed = np.where(self.effects[:, SPEED] > 0, 2, 1)
+        self.player += MOVES[move] * self.move_step * speed[:, None] * 0.1
+        self.fire(fire)
+        dash = (skill == 1) & (self.ready[:, 1] <= now)
+        self.player[dash, 0] += np.where(self.player[dash, 0] > self.width // 2, -100, 100)
+        self.ready[dash, 1] = now[dash] + int(600 * cooldown)
+        emp = (skill == 2) & (self.ready[:, 2] <= now)
+        d = self.asteroid_pos - self.player[:, None]
+        self.asteroid_disabled |= emp[:, None] & self.asteroid_alive & (np.einsum('nij,nij->ni', d, d) < 200 ** 2)
+        self.ready[emp, 2] = now[emp] + int(900 * cooldown)
+        over = (skill == 3) & (self.ready[:, 3] <= now)
+        self.effects[over, OVERCHARGE] = self.effect_ticks[OVERCHARGE]
+        self.ready[over, 3] = now[over] + int(1200 * cooldown)
+
+        speed_factor = np.where(self.effects[:, TIME_SLOW] > 0, 0.5, 1.0)
+        half = self.player_size // 2
+        np.clip(self.player[:, 0], -half, self.width + half, out=self.player[:, 0])
+        np.clip(self.player[:, 1], half, self.height - half, out=self.player[:, 1])
+        self.ticks += 1
+        self.spawn(speed_factor)
+        self.effects = np.maximum(0, self.effects - 1)
+        protected = (self.effects[:, SHIELD] > 0) | (self.effects[:, INVINCIBILITY] > 0)
+        multiplier = np.where(self.effects[:, MULTIPLIER] > 0, 2, 1)
+
+        # Falling objects and what the ship runs into
+        moving = self.asteroid_alive & ~self.asteroid_disabled
+        self.asteroid_pos[..., 1] += np.where(moving, self.asteroid_speed * speed_factor[:, None], 0)
+        gone = self.asteroid_pos[..., 1] > self.height + self.asteroid_size
+        hit = self.touching(self.asteroid_pos, moving & ~gone, self.asteroid_size) & ~protected[:, None]
+        self.lives -= hit.sum(1)
+        self.asteroid_alive &= ~(gone | hit)
+
+        self.star_pos[..., 1] += 3 * speed_factor[:, None]
+        star_size = int(self.height * 0.02)
+        gone = self.star_pos[..., 1] > self.height + star_size
+        hit = self.touching(self.star_pos, self.star_alive & ~gone, star_size)
+        self.score += 10 * multiplier * hit.sum(1)
+        self.star_alive &= ~(gone | hit)
+
+        self.power_up_pos[..., 1] += 2 * speed_factor[:, None]
+        power_up_size = int(self.height * 0.03)
+        gone = self.power_up_pos[..., 1] > self.height + power_up_size
+        hit = self.touching(self.power_up_pos, self.power_up_alive & ~gone, power_up_size)
+        picked = np.zeros((self.num_envs, POWER_UP_COUNT), bool)
+        rows, cols = np.nonzero(hit)
+        picked[rows, self.power_up_kind[rows, cols]] = True
+        self.effects[:, :POWER_UP_COUNT] = np.where(picked, self.effect_ticks[:POWER_UP_COUNT], self.effects[:, :POWER_UP_COUNT])
+        self.power_up_alive &= ~(gone | hit)
+
+        boss = self.boss_active
+        self.boss_pos[boss, 1] += (self.boss_speed * speed_factor)[boss]
+        self.boss_active &= self.boss_pos[:, 1] <= self.height + 100
+        d = self.boss_pos - self.player
+        rammed = self.boss_active & (np.einsum('ni,ni->n', d, d) < (self.player_size / 2 + 100) ** 2) & ~protected
+        self.lives -= rammed
+        self.boss_health -= rammed
+        self.defeat_bosses(multiplier)
+
+        # Black holes drift down, age, and pull asteroids, the boss and the ship
+        self.hole_pos[..., 1] += 1
+        self.hole_life -= 1
+        self.hole_alive &= self.hole_life > 0
+        self.asteroid_pos += self.pull(self.asteroid_pos, 3)
+        self.boss_pos += np.where(self.boss_active[:, None], self.pull(self.boss_pos[:, None], 3)[:, 0], 0)
+        self.player += self.pull(self.player[:, None], 2)[:, 0]
+
+        # Shots fly, then each one takes the first standing asteroid it overlaps, or the boss
+        self.shot_pos[..., 1] -= self.shot_speed
+        self.shot_alive &= self.shot_pos[..., 1] >= 0
+        # Only the columns some game is using; slots fill from the front so that is a prefix
+        ka, kp = live_width(self.asteroid_alive), live_width(self.shot_alive)
+        dx = self.shot_pos[:, :kp, None, 0] - self.asteroid_pos[:, None, :ka, 0]
+        dy = self.shot_pos[:, :kp, None, 1] - self.asteroid_pos[:, None, :ka, 1]
+        overlap = ((dx * dx + dy * dy < self.asteroid_size[:, None, :ka] ** 2) & self.shot_alive[:, :kp, None]
+                   & (self.asteroid_alive & ~self.asteroid_disabled)[:, None, :ka])
+        spent = np.zeros_like(self.shot_alive)
+        spent[:, :kp] = overlap.any(2)
+        rows, shots = np.nonzero(spent)
+        if rows.size:
+            self.asteroid_alive[rows, overlap[rows, shots].argmax(1)] = False
+        self.score += ((np.where(self.shot_damage <= 1, 5, 10) * spent).sum(1) * multiplier)
+        d = self.shot_pos - self.boss_pos[:, None]
+        boss_hits = self.shot_alive & ~spent & self.boss_active[:, None] & (np.einsum('npi,npi->np', d, d) < 100 ** 2)
+        self.boss_health -= (self.shot_damage * boss_hits).sum(1)
+        self.shot_alive &= ~(spent | boss_hits)
+        phase_two = self.boss_active & (self.boss_phase == 1) & (self.boss_health <= 7)
+        self.boss_phase[phase_two], self.boss_speed[phase_two] = 2, 2
+        self.boss_phase[self.boss_active & (self.boss_phase == 2) & (self.boss_health <= 3)] = 3
+        self.defeat_bosses(multiplier)
+        self.fire(self.effects[:, CLONE] > 0, offset_x=50)
+
+        dead = self.lives <= 0
+        truncated = ~dead & (self.ticks >= self.max_ticks)
+        reward = (self.score - score_before) - self.death_penalty * (lives_before - self.lives)
+        info = {'score': self.score.copy(), 'lives': self.lives.copy(), 'ticks': self.ticks.copy(),
+                'truncated': truncated}
+        done = dead | truncated
+        if done.any():
+            self.reset(done)
+        return self.observe(), reward.astype(np.float32), done, info
+
+    def defeat_bosses(self, multiplier):
+        beaten = self.boss_active & (self.boss_health <= 0)
+        self.score += 50 * multiplier * beaten
+        self.boss_active &= ~beaten
+
+    def nearest(self, pos, alive, count):
+        # Relative offsets of the `count` closest live entities, nearest first, plus their indices and presence
+        d = pos - self.player[:, None]
+        dist = np.where(alive, np.einsum('nij,nij->ni', d, d), np.inf)
+        order = np.argsort(dist, axis=1)[:, :count]
+        present = np.take_along_axis(alive, order, 1)
+        offsets = np.take_along_axis(d, order[..., None], 1) * present[..., None]
+        return offsets, order, present
+
+    def observe(self):
+        # Fixed-shape float32 rows; positions and offsets are scaled by the screen size
+        n, scale = self.num_envs, np.array([self.width, self.height])
+        parts = [self.player / scale, self.lives[:, None] / 3,
+                 np.maximum(0, self.ready - self.ticks[:, None]) / np.array([40, 600, 900, 1200]),
+                 self.effects / self.effect_ticks]
+        offsets, order, present = self.nearest(self.asteroid_pos, self.asteroid_alive, NEAREST_ASTEROIDS)
+        parts.append(np.concatenate([offsets / scale, np.take_along_axis(self.asteroid_size, order, 1)[..., None] / self.height,
+                                     np.take_along_axis(self.asteroid_disabled, order, 1)[..., None],
+                                     present[..., None]], 2).reshape(n, -1))
+        offsets, order, present = self.nearest(self.power_up_pos, self.power_up_alive, NEAREST_POWER_UPS)
+        parts.append(np.concatenate([offsets / scale, np.take_along_axis(self.power_up_kind, order, 1)[..., None] / POWER_UP_COUNT,
+                                     present[..., None]], 2).reshape(n, -1))
+        offsets, order, present = self.nearest(self.hole_pos, self.hole_alive, NEAREST_HOLES)
+        parts.append(np.concatenate([offsets / scale, np.take_along_axis(self.hole_life, order, 1)[..., None] / 300,
+                                     present[..., None]], 2).reshape(n, -1))
+        parts.append(np.column_stack([self.boss_active, (self.boss_pos - self.player) / scale * self.boss_active[:, None],
+                                      self.boss_health / 10 * self.boss_active, self.boss_phase / 3 * self.boss_active]))
+        return np.concatenate(parts, 1).astype(np.float32)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Step N vectorized games with random actions and report throughput")
+    parser.add_argument('--envs', type=int, default=256)
+    parser.add_argument('--steps', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    env = VecDodgerEnv(args.envs, seed=args.seed)
+    obs = env.reset()
+    rng = np.random.default_rng(args.seed)
+    episodes = 0
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        actions = np.column_stack((rng.integers(0, len(MOVES), args.envs), rng.integers(0, 2, args.envs),
+                                   rng.integers(0, len(SKILLS), args.envs) * (rng.random(args.envs) < 0.02)))
+        obs, reward, done, info = env.step(actions)
+        episodes += int(done.sum())
+    duration = time.perf_counter() - start
+    print(f"obs {obs.shape} episodes={episodes} env_steps_per_sec={args.envs * args.steps / duration:.0f}")